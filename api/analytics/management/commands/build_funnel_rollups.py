@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from analytics.rollups import build_funnel_rollups
+
+
+class Command(BaseCommand):
+    help = "Alimente de façon incrémentale les agrégats journaliers du funnel de recrutement"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=parse_date,
+                            help="Recalculer à partir de ce jour (AAAA-MM-JJ) au lieu du dernier passage")
+        parser.add_argument('--full', action='store_true',
+                            help="Recalculer tout l'historique")
+
+    def handle(self, *args, **options):
+        since, count = build_funnel_rollups(since=options['since'], full=options['full'])
+        start = since.isoformat() if since else "le début"
+        self.stdout.write(self.style.SUCCESS(f"{count} agrégat(s) recalculé(s) depuis {start}"))
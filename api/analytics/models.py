@@ -0,0 +1,39 @@
+from django.db import models
+
+from positions.models import Department, Position
+from recruitment_process.models import RecruitmentStage
+
+
+class StageFunnelRollup(models.Model):
+    """
+    Agrégat journalier du funnel de recrutement par (département, position, stage, jour).
+    Alimenté par la commande build_funnel_rollups, seule source des requêtes analytiques.
+    """
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='funnel_rollups')
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name='funnel_rollups')
+    stage = models.ForeignKey(RecruitmentStage, on_delete=models.CASCADE, related_name='funnel_rollups')
+    day = models.DateField()
+    entered = models.IntegerField(default=0, help_text="Candidatures arrivées à ce stage")
+    advanced = models.IntegerField(default=0, help_text="Candidatures passées au stage suivant")
+    rejected = models.IntegerField(default=0, help_text="Candidatures rejetées à ce stage")
+    
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'position', 'stage', 'day'], name='unique_funnel_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'department'], name='funnel_rollup_day_dept_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.position} - {self.stage} ({self.day})"
+
+
+class RollupWatermark(models.Model):
+    """Date de la dernière alimentation incrémentale d'un agrégat"""
+    name = models.CharField(max_length=50, unique=True)
+    built_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.name} : {self.built_at}"
@@ -0,0 +1,133 @@
+# analytics/rollups.py
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from positions.models import Position, StageTransition
+from recruitment_process.models import Application
+
+from .models import RollupWatermark, StageFunnelRollup
+
+
+FUNNEL_WATERMARK = 'stage_funnel'
+
+
+def build_funnel_rollups(since=None, full=False):
+    """
+    Recalcule les agrégats du funnel pour tous les jours à partir de `since`
+    (par défaut le jour du précédent passage, tout l'historique avec `full`).
+    Les jours antérieurs ne sont pas relus. Retourne (jour de départ, lignes écrites).
+    """
+    started_at = timezone.now()
+
+    if full:
+        since = None
+    elif since is None:
+        watermark = RollupWatermark.objects.filter(name=FUNNEL_WATERMARK).first()
+        since = timezone.localdate(watermark.built_at) if watermark else None
+
+    start = timezone.make_aware(datetime.combine(since, time.min)) if since else None
+    counts = defaultdict(lambda: [0, 0, 0])  # (position, stage, jour) -> [entered, advanced, rejected]
+
+    _count_received(counts, start)
+    _count_transitions(counts, start)
+    _count_rejections(counts, start)
+
+    departments = dict(Position.objects.values_list('id', 'department_id'))
+    rollups = [
+        StageFunnelRollup(
+            department_id=departments[position_id],
+            position_id=position_id,
+            stage_id=stage_id,
+            day=day,
+            entered=entered,
+            advanced=advanced,
+            rejected=rejected,
+        )
+        for (position_id, stage_id, day), (entered, advanced, rejected) in counts.items()
+        if position_id in departments and stage_id
+    ]
+
+    with transaction.atomic():
+        stale = StageFunnelRollup.objects.all()
+        if since:
+            stale = stale.filter(day__gte=since)
+        stale.delete()
+        StageFunnelRollup.objects.bulk_create(rollups, batch_size=1000)
+        RollupWatermark.objects.update_or_create(name=FUNNEL_WATERMARK, defaults={'built_at': started_at})
+
+    return since, len(rollups)
+
+
+def _since(queryset, field, start):
+    return queryset.filter(**{f'{field}__gte': start}) if start else queryset
+
+
+def _count_received(counts, start):
+    """Chaque candidature reçue entre au stage de sa position au moment du dépôt"""
+    timelines = _stage_timelines()
+    applications = _since(Application.objects.all(), 'applied_at', start)
+
+    for position_id, applied_at in applications.values_list('position_id', 'applied_at').iterator(chunk_size=5000):
+        stage_id = _stage_at(timelines, position_id, applied_at)
+        counts[(position_id, stage_id, timezone.localdate(applied_at))][0] += 1
+
+
+def _count_transitions(counts, start):
+    rows = (
+        _since(StageTransition.objects.all(), 'created_at', start)
+        .annotate(day=TruncDate('created_at'))
+        .values('position_id', 'from_stage_id', 'to_stage_id', 'day')
+        .annotate(approved=Sum('approved_count'))
+        .order_by()
+    )
+    for row in rows:
+        counts[(row['position_id'], row['to_stage_id'], row['day'])][0] += row['approved']
+        counts[(row['position_id'], row['from_stage_id'], row['day'])][1] += row['approved']
+
+
+def _count_rejections(counts, start):
+    """Par jour du rejet ; updated_at seulement pour les rejets antérieurs à rejected_at"""
+    rejected = Application.objects.filter(is_active=False, rejection_stage__isnull=False)
+    if start:
+        rejected = rejected.filter(Q(rejected_at__gte=start) | Q(rejected_at__isnull=True, updated_at__gte=start))
+    rows = (
+        rejected
+        .annotate(day=TruncDate(Coalesce('rejected_at', 'updated_at')))
+        .values('position_id', 'rejection_stage_id', 'day')
+        .annotate(rejected=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        counts[(row['position_id'], row['rejection_stage_id'], row['day'])][2] += row['rejected']
+
+
+def _stage_timelines():
+    """position -> (dates des passages, stages successifs, stage courant)"""
+    timelines = {
+        position_id: ([], [], current_stage_id)
+        for position_id, current_stage_id in Position.objects.values_list('id', 'current_stage_id')
+    }
+    transitions = StageTransition.objects.order_by('created_at').values_list(
+        'position_id', 'created_at', 'from_stage_id', 'to_stage_id'
+    )
+    for position_id, created_at, from_stage_id, to_stage_id in transitions:
+        if position_id in timelines:
+            dates, stages, _ = timelines[position_id]
+            if not stages:
+                stages.append(from_stage_id)
+            dates.append(created_at)
+            stages.append(to_stage_id)
+    return timelines
+
+
+def _stage_at(timelines, position_id, moment):
+    dates, stages, current_stage_id = timelines.get(position_id, ([], [], None))
+    if not stages:
+        return current_stage_id
+    return stages[bisect_right(dates, moment)]
@@ -0,0 +1,24 @@
+# analytics/serializers.py
+from rest_framework import serializers
+
+
+class FunnelFilterSerializer(serializers.Serializer):
+    """Filtres de /api/analytics/funnel/ (?department=&position=&from=&to=)"""
+    department = serializers.IntegerField(required=False)
+    position = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError("La date de début doit précéder la date de fin.")
+        return data
+
+
+class FunnelStageSerializer(serializers.Serializer):
+    stage = serializers.IntegerField(source='stage_id')
+    stage_name = serializers.CharField(source='stage__name')
+    order = serializers.IntegerField(source='stage__order')
+    entered = serializers.IntegerField()
+    advanced = serializers.IntegerField()
+    rejected = serializers.IntegerField()
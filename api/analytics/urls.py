@@ -0,0 +1,13 @@
+# analytics/urls.py
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import FunnelViewSet
+
+
+router = DefaultRouter()
+
+router.register(r'analytics/funnel', FunnelViewSet, basename='funnel')
+
+urlpatterns = [
+    path('', include(router.urls))
+]
@@ -0,0 +1,51 @@
+from django.db.models import Sum
+from rest_framework import viewsets, permissions
+from rest_framework.response import Response
+
+from recruitment_process.permissions import IsStaffOrRH
+
+from .models import StageFunnelRollup
+from .serializers import FunnelFilterSerializer, FunnelStageSerializer
+
+
+class FunnelViewSet(viewsets.ViewSet):
+    """Funnel de recrutement par stage, lu uniquement depuis les agrégats journaliers"""
+    permission_classes = [permissions.IsAuthenticated, IsStaffOrRH]
+    
+    def list(self, request):
+        params = request.query_params
+        filters = FunnelFilterSerializer(data={
+            key: value for key, value in {
+                'department': params.get('department'),
+                'position': params.get('position'),
+                'date_from': params.get('from'),
+                'date_to': params.get('to'),
+            }.items() if value
+        })
+        filters.is_valid(raise_exception=True)
+        data = filters.validated_data
+        
+        rollups = StageFunnelRollup.objects.all()
+        if 'department' in data:
+            rollups = rollups.filter(department_id=data['department'])
+        if 'position' in data:
+            rollups = rollups.filter(position_id=data['position'])
+        if 'date_from' in data:
+            rollups = rollups.filter(day__gte=data['date_from'])
+        if 'date_to' in data:
+            rollups = rollups.filter(day__lte=data['date_to'])
+        
+        stages = (
+            rollups
+            .values('stage_id', 'stage__name', 'stage__order')
+            .annotate(entered=Sum('entered'), advanced=Sum('advanced'), rejected=Sum('rejected'))
+            .order_by('stage__order')
+        )
+        
+        return Response({
+            'department': data.get('department'),
+            'position': data.get('position'),
+            'from': data.get('date_from'),
+            'to': data.get('date_to'),
+            'stages': FunnelStageSerializer(stages, many=True).data,
+        })
@@ -0,0 +1,87 @@
+# api/exports.py
+import csv
+import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import FastJSONRenderer
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """
+    Rend `?format=csv` acceptable par la négociation DRF. Les exports
+    renvoient directement un StreamingHttpResponse ; ce renderer ne sert
+    qu'aux réponses d'erreur, rendues en JSON.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(data)
+
+
+class NDJSONStreamRenderer(CSVStreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class _Echo:
+    """Tampon minimal pour csv.writer : retourne la ligne au lieu de l'écrire"""
+
+    def write(self, value):
+        return value
+
+
+# début de cellule interprété comme une formule par Excel et LibreOffice
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # texte saisi par les candidats : neutralisé pour le tableur (injection de formule)
+        return "'" + value
+    return value
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff'  # BOM : accents corrects à l'ouverture dans Excel
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(row[column]) for column in columns])
+
+
+def _ndjson_lines(columns, rows):
+    renderer = FastJSONRenderer()
+    for row in rows:
+        yield renderer.render({column: row[column] for column in columns}) + b'\n'
+
+
+def streaming_export(rows, columns, export_format, filename):
+    """
+    Réponse streamée (CSV ou NDJSON) ; `rows` est un itérateur de dicts,
+    typiquement `.values().iterator(chunk_size=EXPORT_CHUNK_SIZE)`, pour
+    une mémoire constante quel que soit le nombre de lignes.
+    """
+    if export_format == 'ndjson':
+        response = StreamingHttpResponse(_ndjson_lines(columns, rows), content_type='application/x-ndjson')
+    else:
+        export_format = 'csv'
+        response = StreamingHttpResponse(_csv_lines(columns, rows), content_type='text/csv; charset=utf-8')
+
+    stamp = timezone.localdate().strftime('%Y%m%d')
+    response['Content-Disposition'] = f'attachment; filename="{filename}-{stamp}.{export_format}"'
+    return response
@@ -0,0 +1,85 @@
+# api/fast_serializers.py
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F
+from rest_framework.fields import empty
+from rest_framework.relations import RelatedField
+from rest_framework.serializers import SerializerMethodField
+
+
+# valeur introuvable (relation intermédiaire nulle) : défaut du champ ou champ omis, comme DRF
+MISSING = object()
+
+
+class ValuesSerializer:
+    """
+    Lecture seule d'un serializer DRF à partir de lignes `.values()`.
+
+    La requête ne sélectionne que les colonnes utiles : `columns` associe un
+    champ à un chemin ou une expression, les champs simples du modèle sont
+    lus directement. Les valeurs passent par le `to_representation` des
+    champs de `serializer_class` pour un JSON identique. Une méthode
+    `get_<champ>(row)` transforme la valeur ou la calcule depuis les autres
+    colonnes (MISSING si introuvable). Les champs de `deferred` (relations
+    imbriquées) sont remplis par l'appelant.
+    """
+    serializer_class = None
+    columns = {}
+    extra = ()
+    deferred = ()
+
+    def __init__(self):
+        self.fields = self.serializer_class().fields
+        self.model = self.serializer_class.Meta.model
+
+    def get_columns(self):
+        return dict(self.columns)
+
+    def values(self, queryset):
+        columns = self.get_columns()
+        plain = list(self.extra)
+        for name, field in self.fields.items():
+            if name in columns or name in self.deferred or hasattr(self, f'get_{name}'):
+                continue
+            if field.source != name or not self._is_concrete(name):
+                raise ImproperlyConfigured(f"{type(self).__name__} : colonne manquante pour le champ '{name}'.")
+            plain.append(name)
+
+        expressions = {name: F(column) if isinstance(column, str) else column for name, column in columns.items()}
+        return queryset.values(*plain, **expressions)
+
+    def to_representation(self, row):
+        ret = {}
+        for name, field in self.fields.items():
+            if name in self.deferred:
+                ret[name] = None
+                continue
+
+            getter = getattr(self, f'get_{name}', None)
+            value = getter(row) if getter else row[name]
+
+            if value is MISSING:
+                if field.default is not empty:
+                    value = field.get_default()
+                elif field.allow_null:
+                    value = None
+                else:
+                    continue
+
+            if value is None:
+                ret[name] = None
+            elif isinstance(field, (SerializerMethodField, RelatedField)):
+                # valeur calculée en SQL ; clé primaire pour les relations
+                ret[name] = value
+            else:
+                ret[name] = field.to_representation(value)
+        return ret
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def _is_concrete(self, name):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete
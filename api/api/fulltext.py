@@ -0,0 +1,325 @@
+# api/fulltext.py
+import re
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import Lookup, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# poids des colonnes, sur l'échelle de ts_rank (A > B > C > D), repris par bm25
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+# au-delà, les termes de la recherche sont ignorés
+MAX_TERMS = 10
+
+# configuration PostgreSQL : français sans accents, ou français seul sans l'extension unaccent
+PG_CONFIG = 'fr_unaccent'
+PG_FALLBACK_CONFIG = 'french'
+
+_TERM = re.compile(r'\w+')
+
+indexes = {}
+
+
+def max_results():
+    return getattr(settings, 'FULLTEXT_MAX_RESULTS', 1000)
+
+
+def search_terms(query):
+    return _TERM.findall((query or '').lower())[:MAX_TERMS]
+
+
+# Tous les termes doivent être présents ; le dernier, en cours de saisie, est
+# un préfixe. Les autres sont des mots entiers : un préfixe long n'est pas
+# couvert par l'index de préfixes et oblige FTS5 à fusionner les listes de
+# tous les mots correspondants.
+
+def fts5_query(terms):
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def tsquery(terms):
+    return ' & '.join(terms) + ':*'
+
+
+class FullTextIndex:
+    """
+    Index plein texte des colonnes `fields` (nom, poids A à D) d'un modèle,
+    tenu à jour par des triggers :
+
+    - SQLite : table virtuelle FTS5 à contenu externe (tokenizer unicode61
+      sans diacritiques, index de préfixes de 2 et 3 caractères), classement
+      bm25 ;
+    - PostgreSQL : table (rowid, document tsvector) indexée en GIN, alimentée
+      par un trigger plpgsql, classement ts_rank.
+
+    La table est exposée à l'ORM par un modèle non géré dont la clé primaire
+    est un OneToOne vers le modèle indexé (colonne rowid, `relation` côté
+    modèle indexé) et un SearchDocumentField `document`. Sur les autres
+    backends, la recherche se rabat sur des icontains.
+
+    Le classement coûte un calcul de pertinence par ligne trouvée : seules
+    les FULLTEXT_MAX_RESULTS correspondances les plus récentes (rowid les
+    plus grands) qui passent les autres filtres du queryset sont retenues,
+    ce qui borne le coût d'un terme fréquent. Une correspondance plus
+    ancienne n'est donc jamais classée, même plus pertinente : truncated()
+    permet de le signaler au client.
+    """
+
+    def __init__(self, model, fields, relation='search_entry'):
+        self.model_label = model
+        self.fields = fields
+        self.relation = relation
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def table(self):
+        return f'{self.model._meta.db_table}_fts'
+
+    @property
+    def entry_model(self):
+        return self.model._meta.get_field(self.relation).related_model
+
+    @property
+    def columns(self):
+        return [name for name, _ in self.fields]
+
+    def weights(self):
+        return [WEIGHTS[weight] for _, weight in self.fields]
+
+    # --- Recherche ---
+
+    def search(self, queryset, query):
+        """Filtre `queryset` sur `query` : tous les termes, le dernier en préfixe"""
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        if not self.supported(queryset):
+            return queryset.filter(reduce(or_, (
+                Q(**{f'{column}__icontains': term}) for column in self.columns for term in terms
+            )))
+        match = {f'{self.relation}__document__match': terms}
+        # rowid de la plus ancienne correspondance retenue parmi celles qui passent
+        # les autres filtres de `queryset` (0 s'il y en a moins que la limite)
+        limit = max_results()
+        rowid = f'{self.relation}__pk'
+        window = queryset.filter(**match).order_by(f'-{rowid}').values(rowid)[limit - 1:limit]
+        return queryset.filter(**match, **{f'{rowid}__gte': Coalesce(Subquery(window), 0)})
+
+    def truncated(self, queryset, query):
+        """Vrai si search(queryset, query) écarte des correspondances (plus de FULLTEXT_MAX_RESULTS)"""
+        terms = search_terms(query)
+        if not terms or not self.supported(queryset):
+            return False
+        rowid = f'{self.relation}__pk'
+        matches = queryset.filter(**{f'{self.relation}__document__match': terms}).order_by(f'-{rowid}')
+        return matches.values(rowid)[max_results():].exists()
+
+    def rank(self, queryset, query):
+        """
+        Annote `search_rank` (croissant = plus pertinent) sur un queryset
+        filtré par search(). Sous SQLite, bm25 est refusé dans un GROUP BY :
+        pas d'agrégat sur le même queryset.
+        """
+        terms = search_terms(query)
+        if not terms or not self.supported(queryset):
+            return queryset.annotate(search_rank=Value(0.0))
+        document = models.F(f'{self.relation}__document')
+        return queryset.annotate(search_rank=SearchRank(document, terms, self.weights()))
+
+    def supported(self, queryset):
+        return connections[queryset.db].vendor in ('sqlite', 'postgresql')
+
+    # --- Installation ---
+
+    def install(self, using='default', rebuild=False):
+        """Crée la table et les triggers s'ils manquent ; `rebuild` les recrée et réindexe tout"""
+        connection = connections[using]
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                self._install_sqlite(connection, cursor, rebuild)
+            elif connection.vendor == 'postgresql':
+                self._install_postgresql(connection, cursor, rebuild)
+
+    def _install_sqlite(self, connection, cursor, rebuild):
+        qn = connection.ops.quote_name
+        table, source = self.table, self.model._meta.db_table
+        pk = self.model._meta.pk.column
+        exists = table in connection.introspection.table_names(cursor)
+        if rebuild:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {qn(f"{table}_{suffix}")}')
+            cursor.execute(f'DROP TABLE IF EXISTS {qn(table)}')
+            exists = False
+
+        columns = ', '.join(qn(column) for column in self.columns)
+        new = ', '.join(f'new.{qn(column)}' for column in self.columns)
+        old = ', '.join(f'old.{qn(column)}' for column in self.columns)
+        if not exists:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {qn(table)} USING fts5({columns}, content={qn(source)}, "
+                f"content_rowid={qn(pk)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        insert = f'INSERT INTO {qn(table)}(rowid, {columns}) VALUES (new.{qn(pk)}, {new});'
+        delete = f"INSERT INTO {qn(table)}({qn(table)}, rowid, {columns}) VALUES ('delete', old.{qn(pk)}, {old});"
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {qn(f"{table}_ai")} AFTER INSERT ON {qn(source)} BEGIN {insert} END')
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {qn(f"{table}_ad")} AFTER DELETE ON {qn(source)} BEGIN {delete} END')
+        cursor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {qn(f"{table}_au")} AFTER UPDATE OF {qn(pk)}, {columns} ON {qn(source)} '
+            f'BEGIN {delete} {insert} END'
+        )
+        if not exists:
+            cursor.execute(f"INSERT INTO {qn(table)}({qn(table)}) VALUES ('rebuild')")
+
+    def _install_postgresql(self, connection, cursor, rebuild):
+        qn = connection.ops.quote_name
+        table, source = self.table, self.model._meta.db_table
+        pk = self.model._meta.pk.column
+        config = pg_config(cursor)
+        function = qn(f'{table}_sync')
+        if rebuild:
+            cursor.execute(f'DROP TABLE IF EXISTS {qn(table)}')
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {qn(table)} ('
+            f'rowid bigint PRIMARY KEY REFERENCES {qn(source)} ({qn(pk)}) ON DELETE CASCADE, '
+            f'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {qn(f"{table}_document")} ON {qn(table)} USING gin (document)')
+
+        cursor.execute(
+            f'CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$ BEGIN '
+            f'INSERT INTO {qn(table)} (rowid, document) VALUES (NEW.{qn(pk)}, {self._tsvector(connection, config, "NEW.")}) '
+            f'ON CONFLICT (rowid) DO UPDATE SET document = EXCLUDED.document; '
+            f'RETURN NULL; END $$ LANGUAGE plpgsql'
+        )
+        columns = ', '.join(qn(column) for column in self.columns)
+        cursor.execute(f'DROP TRIGGER IF EXISTS {qn(f"{table}_sync")} ON {qn(source)}')
+        cursor.execute(
+            f'CREATE TRIGGER {qn(f"{table}_sync")} AFTER INSERT OR UPDATE OF {columns} ON {qn(source)} '
+            f'FOR EACH ROW EXECUTE FUNCTION {function}()'
+        )
+        # lignes absentes de l'index (table créée après coup, rebuild)
+        cursor.execute(
+            f'INSERT INTO {qn(table)} (rowid, document) '
+            f'SELECT {qn(pk)}, {self._tsvector(connection, config)} FROM {qn(source)} '
+            f'ON CONFLICT (rowid) DO NOTHING'
+        )
+
+    def _tsvector(self, connection, config, prefix=''):
+        qn = connection.ops.quote_name
+        return ' || '.join(
+            f"setweight(to_tsvector('{config}', coalesce({prefix}{qn(column)}, '')), '{weight}')"
+            for column, weight in self.fields
+        )
+
+
+def pg_config(cursor):
+    """Crée la configuration française sans accents si l'extension unaccent est disponible"""
+    cursor.execute('SELECT 1 FROM pg_ts_config WHERE cfgname = %s', [PG_CONFIG])
+    if cursor.fetchone():
+        return PG_CONFIG
+    try:
+        with transaction.atomic(using=cursor.db.alias):
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+            cursor.execute(f'CREATE TEXT SEARCH CONFIGURATION {PG_CONFIG} (COPY = french)')
+            cursor.execute(
+                f'ALTER TEXT SEARCH CONFIGURATION {PG_CONFIG} '
+                f'ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem'
+            )
+    except Exception:
+        return PG_FALLBACK_CONFIG
+    return PG_CONFIG
+
+
+def register(index):
+    indexes[index.model_label] = index
+    return index
+
+
+def install_indexes(sender, using='default', **kwargs):
+    """Receiver post_migrate : tables et triggers des index de l'application migrée"""
+    if not router.allow_migrate(using, sender.label):
+        return
+    for index in indexes.values():
+        if index.model._meta.app_label == sender.label:
+            index.install(using)
+
+
+# --- ORM ---
+
+class SearchDocumentField(models.Field):
+    """
+    Document indexé de la table plein texte : tsvector sous PostgreSQL ;
+    sous SQLite, la colonne cachée de la table FTS5 (du nom de la table).
+    N'est utilisable qu'avec le lookup `match` et SearchRank.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def db_type(self, connection):
+        return 'tsvector' if connection.vendor == 'postgresql' else None
+
+
+def _fts5_column(col, compiler, connection):
+    # colonne cachée du nom de la table FTS5, qualifiée par l'alias de jointure
+    qn = compiler.quote_name_unless_alias
+    return f'{qn(col.alias)}.{connection.ops.quote_name(col.target.model._meta.db_table)}'
+
+
+_configs = {}
+
+
+def _pg_config(connection):
+    # lue une fois par base : la configuration ne change qu'à l'installation
+    if connection.alias not in _configs:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_ts_config WHERE cfgname = %s', [PG_CONFIG])
+            _configs[connection.alias] = PG_CONFIG if cursor.fetchone() else PG_FALLBACK_CONFIG
+    return _configs[connection.alias]
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    """document__match=[termes] : tous les termes, le dernier en préfixe"""
+    lookup_name = 'match'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return f"{lhs} @@ to_tsquery('{_pg_config(connection)}', %s)", [*lhs_params, tsquery(self.rhs)]
+
+    def as_sqlite(self, compiler, connection):
+        return f'{_fts5_column(self.lhs, compiler, connection)} MATCH %s', [fts5_query(self.rhs)]
+
+
+class SearchRank(models.Func):
+    """Pertinence : bm25 sous SQLite, -ts_rank sous PostgreSQL (croissant = plus pertinent)"""
+    output_field = models.FloatField()
+
+    def __init__(self, document, terms, weights):
+        super().__init__(document)
+        self.terms = terms
+        self.weights = weights
+
+    def as_sql(self, compiler, connection, **extra_context):
+        document, params = compiler.compile(self.source_expressions[0])
+        # ts_rank attend les poids dans l'ordre {D, C, B, A}
+        weights = ', '.join(str(WEIGHTS[letter]) for letter in 'DCBA')
+        return (
+            f"-ts_rank('{{{weights}}}', {document}, to_tsquery('{_pg_config(connection)}', %s))",
+            [*params, tsquery(self.terms)],
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        col = self.source_expressions[0]
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return f'bm25({_fts5_column(col, compiler, connection)}, {weights})', []
@@ -0,0 +1,155 @@
+# api/http_cache.py
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+VERSION_CACHE_KEY = 'http_cache:version:{}'
+MODIFIED_CACHE_KEY = 'http_cache:modified:{}'
+RESPONSE_CACHE_KEY = 'http_cache:response:{}'
+
+# durée de vie des versions en cache : délai maximal de propagation d'une
+# écriture aux autres workers quand le cache est local au process (LocMemCache)
+VERSION_CACHE_TIMEOUT = 30
+
+
+def get_versions(labels):
+    """
+    Version de chaque modèle et date (s) de sa dernière écriture connue.
+    La version est un compteur incrémenté à chaque écriture : deux écritures
+    dans la même seconde, ou sur des workers aux horloges décalées, donnent
+    toujours des versions différentes. Une entrée absente (premier accès,
+    expiration, éviction) est recréée à partir de l'horodatage courant en
+    ns, jamais atteint par un ancien compteur, ce qui revient à considérer
+    le modèle comme modifié : avec un cache local au process, une écriture
+    servie par un autre worker est prise en compte au plus tard après
+    VERSION_CACHE_TIMEOUT secondes.
+    """
+    keys = {label: (VERSION_CACHE_KEY.format(label), MODIFIED_CACHE_KEY.format(label)) for label in labels}
+    found = cache.get_many([key for pair in keys.values() for key in pair])
+    versions, modified = {}, {}
+    for label, (version_key, modified_key) in keys.items():
+        if found.get(version_key) is None:
+            # version recréée : le modèle a pu changer ailleurs depuis la date connue
+            cache.set(modified_key, time.time(), timeout=VERSION_CACHE_TIMEOUT)
+            found.pop(modified_key, None)
+        versions[label] = _get_or_add(found, version_key, time.time_ns)
+        modified[label] = _get_or_add(found, modified_key, time.time)
+    return versions, modified
+
+
+def _get_or_add(found, key, default):
+    value = found.get(key)
+    if value is None:
+        cache.add(key, default(), timeout=VERSION_CACHE_TIMEOUT)
+        value = cache.get(key)
+    return value
+
+
+def bump_version(label):
+    key = VERSION_CACHE_KEY.format(label)
+    cache.set(MODIFIED_CACHE_KEY.format(label), time.time(), timeout=VERSION_CACHE_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=VERSION_CACHE_TIMEOUT)
+
+
+def bump_model_version(sender, **kwargs):
+    # après le commit, pour ne pas mettre en cache l'ancien état sous la nouvelle version
+    label = sender._meta.label
+    transaction.on_commit(lambda: bump_version(label))
+
+
+def versions_receiver(*models):
+    """Receiver qui publie une nouvelle version des modèles donnés (écritures en masse)"""
+    def receiver(sender, **kwargs):
+        for model in models:
+            bump_model_version(model)
+    return receiver
+
+
+def watch_model(model):
+    """Nouvelle version de `model` à chaque save/delete d'une instance"""
+    uid = f'http_cache_{model._meta.label_lower}'
+    post_save.connect(bump_model_version, sender=model, dispatch_uid=f'{uid}_save')
+    post_delete.connect(bump_model_version, sender=model, dispatch_uid=f'{uid}_delete')
+
+
+def cached_response(*models, max_age=0, daily=False, timeout=300):
+    """
+    GET conditionnel et cache serveur pour une action de ViewSet en lecture.
+
+    L'ETag (fort) dérive de l'URL, du type de contenu négocié, des versions
+    des modèles dont dépend la réponse (et de la date avec `daily`, pour les
+    champs calculés sur aujourd'hui). Un If-None-Match identique renvoie 304
+    sans requête ni sérialisation ; sinon les données sont servies depuis le
+    cache tant que les versions ne changent pas. If-Modified-Since, à la
+    seconde près, ne sert qu'en l'absence d'If-None-Match, et Last-Modified
+    n'est envoyé qu'une fois la seconde de la dernière écriture écoulée. Les
+    versions sont publiées dans le cache Django : partagé entre les workers
+    (Redis, Memcached...), il propage aussitôt les écritures ; local au
+    process, il les propage à l'expiration des versions (VERSION_CACHE_TIMEOUT).
+    """
+    labels = [model._meta.label for model in models]
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            versions, modified = get_versions(labels)
+            etag, last_modified = _validators(request, versions, modified, daily)
+
+            if _not_modified(request, etag, last_modified):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                key = RESPONSE_CACHE_KEY.format(etag.strip('"'))
+                data = cache.get(key)
+                if data is None:
+                    response = method(view, request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    cache.set(key, response.data, timeout=timeout)
+                else:
+                    response = Response(data)
+
+            response['ETag'] = etag
+            # une écriture dans la seconde en cours ne changerait pas Last-Modified
+            if last_modified < int(time.time()):
+                response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, public=True, max_age=max_age, must_revalidate=True)
+            patch_vary_headers(response, ['Accept'])
+            return response
+        return wrapper
+    return decorator
+
+
+def _validators(request, versions, modified, daily):
+    parts = [request.build_absolute_uri(), request.accepted_media_type or '']
+    parts += [f'{label}={versions[label]}' for label in sorted(versions)]
+    if daily:
+        parts.append(timezone.localdate().isoformat())
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+    last_modified = int(max(modified.values())) if modified else int(time.time())
+    if daily:
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        last_modified = max(last_modified, int(midnight.timestamp()))
+    return quote_etag(digest), last_modified
+
+
+def _not_modified(request, etag, last_modified):
+    # If-None-Match prioritaire (RFC 9110) : If-Modified-Since est ignoré s'il est présent
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
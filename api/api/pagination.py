@@ -0,0 +1,173 @@
+# api/pagination.py
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetLimitOffsetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination par défaut ; le client passe en pagination par clé
+    (keyset) en ajoutant `?cursor=` (vide pour la première page).
+
+    En mode keyset, la page suivante est lue avec un prédicat
+    `(a, id) > (dernière valeur)` sur l'ordre du queryset, complété par `id`
+    pour le rendre total : pas d'OFFSET ni de COUNT(*), chaque page coûte le
+    même temps quelle que soit sa profondeur. Le total n'est calculé que sur
+    demande avec `?count=exact`, ou estimé par le planificateur avec
+    `?count=estimate` (PostgreSQL ; calcul exact sur les autres backends).
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Curseur invalide.'
+
+    keyset = False
+    keyset_only = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_only or self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = self.get_keyset_count(queryset, request)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        results = results[:self.limit]
+        self.next_position = self.get_position(results[-1]) if results and self.has_next else None
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_cursor_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering:
+            return ['id']
+        last = ordering[-1].lstrip('-')
+        if last not in ('id', 'pk'):
+            # départage par id dans le sens du dernier champ
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    def keyset_filter(self, position):
+        """(a, b, id) après (va, vb, vid) en tenant compte du sens de chaque champ"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, obj):
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(obj, dict):
+            return [obj[name] for name in names]
+        return [_follow(obj, name) for name in names]
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, default=_encode_value)
+        return b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [_to_python(model, field.lstrip('-'), value) for field, value in zip(self.ordering, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_keyset_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+
+class KeysetPagination(KeysetLimitOffsetPagination):
+    """Pagination par clé seulement (`?cursor=` facultatif, pas d'offset)"""
+    keyset_only = True
+
+
+def _follow(obj, name):
+    """Valeur d'un champ d'ordre, relations comprises (user__last_name)"""
+    for part in name.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, part)
+    return obj
+
+
+def _to_python(model, name, value):
+    *relations, name = name.split('__')
+    try:
+        for part in relations:
+            model = model._meta.get_field(part).related_model
+        if name == 'pk':
+            return model._meta.pk.to_python(value)
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # annotation (rang de recherche...) : valeur JSON telle quelle
+        return value
+    return field.to_python(value)
+
+
+def _encode_value(value):
+    # isoformat complet : DjangoJSONEncoder tronque les microsecondes
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def estimate_count(queryset):
+    """Nombre de lignes estimé par le planificateur PostgreSQL, exact ailleurs"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,117 @@
+# api/payload_cache.py
+import threading
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+
+
+# durée de vie des jetons dans un cache local au process (LocMemCache) : délai
+# maximal de prise en compte d'une invalidation faite par un autre worker
+LOCAL_TOKEN_TIMEOUT = 30
+
+class PayloadCache:
+    """
+    Cache des données sérialisées, objet par objet, dans l'alias CACHES `alias`.
+
+    Chaque objet a un jeton de version et le cache entier une génération ; la
+    clé d'un fragment contient les deux. Invalider revient à changer un jeton,
+    après le commit : un fragment calculé pendant une écriture concurrente est
+    rangé sous l'ancien jeton et n'est jamais relu. L'éviction (LRU pour
+    LocMemCache) est celle du backend configuré.
+
+    Les jetons n'atteignent que les workers qui partagent le cache : avec
+    LocMemCache, ils expirent après LOCAL_TOKEN_TIMEOUT secondes, ce qui
+    borne la durée pendant laquelle un autre worker sert un fragment périmé.
+    """
+
+    def __init__(self, name, alias='payloads', daily=False, timeout=None):
+        self.name = name
+        self.alias = alias
+        self.daily = daily  # fragments dépendant de la date du jour
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_many(self, pks, load):
+        """
+        Fragments des objets `pks`, dans cet ordre. `load(pks manquants)`
+        retourne {pk: données} pour les objets absents du cache.
+        """
+        pks = list(pks)
+        tokens = self._tokens([self._generation_key()] + [self._version_key(pk) for pk in pks])
+        generation = tokens[self._generation_key()]
+        keys = {self._payload_key(generation, tokens[self._version_key(pk)], pk): pk for pk in pks}
+
+        payloads = {keys[key]: data for key, data in self.cache.get_many(list(keys)).items()}
+        missing = [pk for pk in pks if pk not in payloads]
+        with self._lock:
+            self.hits += len(payloads)
+            self.misses += len(missing)
+
+        if missing:
+            fresh = load(missing)
+            by_pk = {pk: key for key, pk in keys.items()}
+            self.cache.set_many({by_pk[pk]: data for pk, data in fresh.items()}, timeout=self.timeout)
+            payloads.update(fresh)
+
+        return [payloads[pk] for pk in pks if pk in payloads]
+
+    def invalidate(self, *pks):
+        keys = [self._version_key(pk) for pk in pks if pk is not None]
+        if keys:
+            transaction.on_commit(lambda: self._renew(keys))
+
+    def invalidate_all(self):
+        transaction.on_commit(lambda: self._renew([self._generation_key()]))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'backend': self.cache.__class__.__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+            }
+
+    def _renew(self, keys):
+        self.cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=self._token_timeout())
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def _tokens(self, keys):
+        tokens = self.cache.get_many(keys)
+        missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+        if missing:
+            # jeton absent ou évincé : les fragments déjà stockés deviennent inaccessibles
+            timeout = self._token_timeout()
+            for key, token in missing.items():
+                self.cache.add(key, token, timeout=timeout)
+            tokens.update(self.cache.get_many(list(missing)))
+        return tokens
+
+    def _token_timeout(self):
+        return LOCAL_TOKEN_TIMEOUT if isinstance(self.cache, LocMemCache) else None
+
+    def _generation_key(self):
+        return f'{self.name}:generation'
+
+    def _version_key(self, pk):
+        return f'{self.name}:version:{pk}'
+
+    def _payload_key(self, generation, version, pk):
+        key = f'{self.name}:{generation}:{version}:{pk}'
+        if self.daily:
+            key += f':{timezone.localdate().isoformat()}'
+        return key
@@ -0,0 +1,13 @@
+# api/processes.py
+
+
+def init_django():
+    """
+    Initializer des ProcessPoolExecutor : sous spawn/forkserver, les
+    processus fils n'ont pas encore chargé Django (sous fork, rien à faire).
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
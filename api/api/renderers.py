@@ -0,0 +1,41 @@
+# api/renderers.py
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : pip install orjson
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encodé par orjson quand il est installé, sinon identique au
+    renderer DRF.
+
+    La sortie reproduit celle de DRF avec les réglages par défaut (compact,
+    UTF-8, U+2028/U+2029 échappés) : dates et datetimes passent par
+    l'encodeur DRF (même format), tout comme Decimal, les chaînes traduites
+    et les autres types qu'orjson ne connaît pas. Le rendu indenté (API
+    navigable, `; indent=`) et les erreurs d'encodage (entiers hors 64
+    bits...) retombent sur le rendu standard.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSON sous-ensemble strict de javascript, comme JSONRenderer
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
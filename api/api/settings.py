@@ -55,9 +55,12 @@ INSTALLED_APPS = [
     'candidates',    
     'positions',    
     'recruitment_process',    
+    'analytics',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -149,14 +152,82 @@ CORS_ALLOWED_ORIGINS = [
 AUTH_USER_MODEL = 'authentication.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetLimitOffsetPagination',
     'PAGE_SIZE': 100,
+    # orjson si installé (pip install orjson), sinon équivalents DRF
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication sans lecture de l'utilisateur en base (authentication/backends.py)
+        'authentication.backends.StatelessJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ]
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # fragments sérialisés Position/Department (api/payload_cache.py), éviction LRU ;
+    # local au process, une invalidation n'atteint les autres workers qu'après
+    # LOCAL_TOKEN_TIMEOUT secondes : FileBasedCache ('LOCATION': chemin d'un
+    # répertoire) ou Redis pour les partager entre workers
+    'payloads': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'payloads',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Compteurs du dashboard RH maintenus par signaux (positions/stats.py).
+# Après activation, initialiser avec : python manage.py rebuild_stats
+STATS_COUNTERS_ENABLED = False
+
+# Mesures par requête (monitoring/middleware.py) : en-tête Server-Timing,
+# agrégats par route sur /api/monitoring/metrics/, alerte au-delà de N
+# exécutions d'une même requête SQL (N+1)
+MONITORING_ENABLED = True
+MONITORING_SERVER_TIMING = True
+MONITORING_N_PLUS_ONE_THRESHOLD = 10
+
+# Journal des requêtes SQL lentes (monitoring/slow_queries.py), résumé par
+# python manage.py slow_query_report ; None pour le désactiver
+MONITORING_SLOW_QUERY_MS = 200
+MONITORING_SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.jsonl'
+MONITORING_SLOW_QUERY_EXPLAIN = True
+
+# Recherche plein texte (api/fulltext.py) : seules les N correspondances les
+# plus récentes, après les autres filtres de la liste, sont classées et
+# retournées, ce qui borne le coût d'un terme présent dans une grande partie
+# des lignes ; les réponses portent alors `truncated: true`
+FULLTEXT_MAX_RESULTS = 1000
+
+# Index TF-IDF des profils candidats pour /api/positions/{id}/shortlist/
+# (recruitment_process.matching), reconstruit par rebuild_matching_index
+MATCHING_INDEX_PATH = BASE_DIR / 'data' / 'matching_index.bin'
+
+# Documents stockés par empreinte de contenu (candidates/storage.py) : un blob
+# sans référence n'est supprimé par collect_blobs qu'après ce délai (secondes)
+DOCUMENT_BLOB_GRACE = 24 * 3600
+
+# Envois de documents reprenables (/api/uploads/, candidates/uploads.py) :
+# taille maximale d'un document et d'une requête PATCH, expiration des
+# sessions inactives (supprimées par expire_uploads)
+DOCUMENT_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+DOCUMENT_UPLOAD_MAX_CHUNK = 16 * 1024 * 1024
+DOCUMENT_UPLOAD_EXPIRY = 24 * 3600
+
+# Import synchrone de candidats (POST /api/candidates/import/) : nombre
+# maximal de lignes par fichier ; au-delà, utiliser la commande import_candidates
+CANDIDATE_IMPORT_MAX_ROWS = 5000
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5, hours=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
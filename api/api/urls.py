@@ -21,6 +21,8 @@ import authentication.urls
 import candidates.urls
 import positions.urls
 import recruitment_process.urls
+import analytics.urls
+import monitoring.urls
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -28,4 +30,6 @@ urlpatterns = [
     path('api/', include(candidates.urls)),
     path('api/', include(positions.urls)),
     path('api/', include(recruitment_process.urls)),
+    path('api/', include(analytics.urls)),
+    path('api/', include(monitoring.urls)),
 ]
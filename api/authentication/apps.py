@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed, post_save, pre_save
+        from api.http_cache import watch_model
+        from .backends import detect_role_change, revoke_changed_user_tokens, revoke_group_change_tokens
+        from .models import User
+
+        watch_model(User)  # nom du créateur dans les listes de positions
+        # rôles et activation lus dans les jetons : toute modification révoque ceux déjà émis
+        pre_save.connect(detect_role_change, sender=User, dispatch_uid='detect_role_change')
+        post_save.connect(revoke_changed_user_tokens, sender=User, dispatch_uid='revoke_inactive_user_tokens')
+        m2m_changed.connect(revoke_group_change_tokens, sender=User.groups.through, dispatch_uid='revoke_group_change_tokens')
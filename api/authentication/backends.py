@@ -0,0 +1,189 @@
+# authentication/backends.py
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .roles import ROLES_CLAIM, add_role_claims
+
+
+TOKEN_VERSION_CLAIM = 'ver'
+TOKEN_VERSION_CACHE_KEY = 'authentication:token_version:{}'
+
+# durée de vie de la version en cache : délai maximal de propagation d'une
+# révocation aux autres workers quand le cache est local au process
+TOKEN_VERSION_CACHE_TIMEOUT = 30
+
+
+def get_token_version(user_id):
+    """Version courante des jetons d'un utilisateur, lue dans le cache puis en base"""
+    key = TOKEN_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        from .models import User
+
+        version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, timeout=TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def revoke_user_tokens(user):
+    """Invalide tous les jetons déjà émis pour l'utilisateur (déconnexion partout)"""
+    revoke_tokens_of([user.pk])
+
+
+def revoke_tokens_of(user_ids):
+    """Comme revoke_user_tokens(), pour des identifiants d'utilisateurs"""
+    from .models import User
+
+    User.objects.filter(pk__in=user_ids).update(token_version=F('token_version') + 1)
+    cache.delete_many([TOKEN_VERSION_CACHE_KEY.format(pk) for pk in user_ids])
+
+
+# champs copiés dans les claims du jeton (roles.py) : les modifier révoque les jetons
+ROLE_FIELDS = ('group', 'is_staff', 'is_superuser')
+
+
+def detect_role_change(sender, instance, update_fields=None, **kwargs):
+    """Receiver pre_save de User : note si les rôles portés par les jetons changent"""
+    instance._roles_changed = False
+    if instance.pk is None or instance._state.adding:
+        return
+    fields = ROLE_FIELDS if update_fields is None else [name for name in ROLE_FIELDS if name in update_fields]
+    if not fields:
+        return
+    stored = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._roles_changed = stored is not None and any(stored[name] != getattr(instance, name) for name in fields)
+
+
+def revoke_changed_user_tokens(sender, instance, created, **kwargs):
+    # le chemin sans requête ne voit ni is_active ni les rôles à jour : les jetons émis avant sont révoqués
+    if not created and (not instance.is_active or getattr(instance, '_roles_changed', False)):
+        _revoke_instance(instance)
+
+
+def revoke_group_change_tokens(sender, instance, action, reverse, pk_set, **kwargs):
+    """Receiver m2m_changed de User.groups (depuis l'utilisateur ou depuis le groupe)"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _revoke_instance(instance)
+        return
+    if action == 'pre_clear':
+        # post_clear ne fournit pas les utilisateurs retirés du groupe
+        instance._cleared_user_ids = list(instance.user_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_user_ids', ())
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if pk_set:
+        revoke_tokens_of(list(pk_set))
+
+
+def revoke_candidate_change_tokens(sender, instance, created=True, **kwargs):
+    """Receiver post_save/post_delete de Candidate : le claim `candidate` des jetons change"""
+    if created:
+        revoke_tokens_of([instance.user_id])
+
+
+def _revoke_instance(user):
+    revoke_user_tokens(user)
+    # sans quoi un save() complet ultérieur réécrirait l'ancienne version
+    user.token_version = type(user).objects.filter(pk=user.pk).values_list('token_version', flat=True).first()
+
+
+def add_auth_claims(token, user):
+    """Claims nécessaires à l'authentification sans requête"""
+    token['email'] = user.email
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    add_role_claims(token, user)
+    return token
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Utilisateur construit depuis les claims d'un jeton vérifié.
+
+    id, pk, email, group et is_staff sont lus dans le jeton ; tout autre
+    attribut (ou un isinstance, par ex. pour affecter une ForeignKey) charge
+    l'instance User complète depuis la base, une seule fois.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, user_id, claims):
+        from .models import User
+
+        self.__dict__['_claims'] = dict(claims, id=user_id, pk=user_id)
+        super().__init__(lambda: User.objects.get(pk=user_id))
+
+    def _claim(name):
+        def getter(self):
+            if self._wrapped is empty:
+                return self._claims[name]
+            return getattr(self._wrapped, name)
+        return property(getter)
+
+    id = _claim('id')
+    pk = _claim('pk')
+    email = _claim('email')
+    group = _claim('group')
+    is_staff = _claim('is_staff')
+
+    del _claim
+
+    def __str__(self):
+        return self.email
+
+    def __repr__(self):
+        return f'<ClaimsUser: {self.email}>'
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans lecture de la table des utilisateurs.
+
+    Les jetons émis par UserLoginView portent email, rôles et version : la
+    requête reçoit un ClaimsUser. Les jetons sans ces claims suivent le chemin
+    standard (chargement en base). Dans les deux cas, la version du jeton est
+    comparée à User.token_version, gardée dans le cache Django, pour que
+    revoke_user_tokens() déconnecte l'utilisateur partout. Avec un cache
+    local au process, la révocation n'atteint les autres workers qu'après
+    expiration de leur entrée (TOKEN_VERSION_CACHE_TIMEOUT secondes) : un
+    cache partagé la rend immédiate.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        roles = validated_token.get(ROLES_CLAIM)
+        stateless = (
+            user_id is not None
+            and isinstance(roles, dict)
+            and 'email' in validated_token
+            and TOKEN_VERSION_CLAIM in validated_token
+        )
+        if not stateless:
+            user = super().get_user(validated_token)
+            self.check_version(validated_token, user.pk, user.token_version)
+            return user
+
+        from .models import User
+
+        user_id = User._meta.pk.to_python(user_id)
+        self.check_version(validated_token, user_id, get_token_version(user_id))
+        return ClaimsUser(user_id, {
+            'email': validated_token['email'],
+            'group': roles.get('group'),
+            'is_staff': roles.get('staff', False),
+        })
+
+    def check_version(self, validated_token, user_id, current_version):
+        if current_version is None:
+            raise AuthenticationFailed("Utilisateur introuvable.", code='user_not_found')
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != current_version:
+            raise AuthenticationFailed("Ce jeton a été révoqué.", code='token_revoked')
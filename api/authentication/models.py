@@ -14,6 +14,8 @@ class User(AbstractUser):
     username = None
     email = models.EmailField("email address", unique=True)
     group = models.CharField(max_length=20, choices=ROLE_CHOICES, default='Candidat',null=False, blank=False)
+    # incrémenté pour révoquer tous les jetons JWT déjà émis (voir backends.py)
+    token_version = models.PositiveIntegerField(default=0)
     
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -0,0 +1,95 @@
+# authentication/roles.py
+from django.db.models import Exists, OuterRef
+
+
+ROLES_CLAIM = 'roles'
+
+
+class Roles:
+    """Rôles d'un utilisateur : champ `group`, groupes Django, profil candidat"""
+
+    def __init__(self, group=None, groups=(), is_candidate=False, is_staff=False):
+        self.group = group
+        self.groups = frozenset(groups)
+        self.is_candidate = is_candidate
+        self.is_staff = is_staff
+
+    def in_group(self, name):
+        return name in self.groups
+
+    def as_claim(self):
+        return {
+            'group': self.group,
+            'groups': sorted(self.groups),
+            'candidate': self.is_candidate,
+            'staff': self.is_staff,
+        }
+
+    @classmethod
+    def from_claim(cls, claim):
+        return cls(
+            group=claim.get('group'),
+            groups=claim.get('groups', ()),
+            is_candidate=claim.get('candidate', False),
+            is_staff=claim.get('staff', False),
+        )
+
+
+ANONYMOUS = Roles()
+
+
+def load_roles(user):
+    """Groupes et existence du profil candidat en une seule requête"""
+    from candidates.models import Candidate
+    from .models import User
+
+    rows = (
+        User.objects.filter(pk=user.pk)
+        .annotate(is_candidate=Exists(Candidate.objects.filter(user=OuterRef('pk'))))
+        .values_list('is_candidate', 'groups__name')
+    )
+    is_candidate = False
+    groups = []
+    for is_candidate, group_name in rows:
+        if group_name:
+            groups.append(group_name)
+    return Roles(group=user.group, groups=groups, is_candidate=is_candidate, is_staff=user.is_staff)
+
+
+def get_roles(request):
+    """
+    Rôles de l'utilisateur de la requête, résolus une seule fois par requête.
+
+    Ils sont lus dans le claim `roles` du jeton JWT quand il existe (aucune
+    requête SQL), sinon chargés depuis la base puis gardés sur la requête.
+    Les claims reflètent l'état au moment de l'émission du jeton ; modifier
+    group, is_staff ou les groupes d'un utilisateur révoque ses jetons
+    (authentication/backends.py).
+    """
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return ANONYMOUS
+
+    http_request = getattr(request, '_request', request)
+    cached = getattr(http_request, '_roles', None)
+    if cached and cached[0] == user.pk:
+        return cached[1]
+
+    claim = _token_claim(getattr(request, 'auth', None))
+    roles = Roles.from_claim(claim) if claim is not None else load_roles(user)
+    http_request._roles = (user.pk, roles)
+    return roles
+
+
+def _token_claim(token):
+    if token is None or not hasattr(token, 'get'):
+        return None
+    claim = token.get(ROLES_CLAIM)
+    return claim if isinstance(claim, dict) else None
+
+
+def add_role_claims(token, user):
+    """Ajoute les rôles au jeton ; le jeton d'accès dérivé d'un refresh en hérite"""
+    token['group'] = user.group
+    token[ROLES_CLAIM] = load_roles(user).as_claim()
+    return token
@@ -5,6 +5,7 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import AccessToken
 
 from .models import User
+from .backends import add_auth_claims
 from candidates.models import Candidate
 
 
@@ -80,11 +81,12 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        add_auth_claims(token, user)
         
         access = AccessToken.for_user(user)
         access['full_name'] = user.get_full_name()
         access['email'] = user.email
-        access['group'] = user.role
+        add_auth_claims(access, user)
         
         token['access'] = str(access) 
         
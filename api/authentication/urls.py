@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import UserRegisterView, UserLoginView
+from .views import UserRegisterView, UserLoginView, LogoutAllView
 
 urlpatterns = [
     path('register/', UserRegisterView.as_view(), name='register'),
     path('login/', UserLoginView.as_view(), name='login'),
+    path('logout-all/', LogoutAllView.as_view(), name='logout_all'),
     path('token/', TokenObtainPairView.as_view(), name='tokain_obtain'),
     path('token/refresh/', TokenRefreshView.as_view(), name='tokain_refresh'),
 ]
\ No newline at end of file
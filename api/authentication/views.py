@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from rest_framework import status
+from rest_framework import permissions, status
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 
 from .serializers import CandidateRegisterSerializer, UserLoginSerializer, CustomTokenObtainPairSerializer
 from .models import User
+from .backends import add_auth_claims, revoke_user_tokens
 
 
 class UserRegisterView(GenericAPIView):
@@ -38,7 +39,7 @@ class UserLoginView(GenericAPIView):
         user = serializer.validated_data['user']
         
         refresh = RefreshToken().for_user(user)
-        refresh['group'] = user.group 
+        add_auth_claims(refresh, user)  # authentification et permissions sans requête
         
         return Response({
             'access': str(refresh.access_token),
@@ -46,5 +47,15 @@ class UserLoginView(GenericAPIView):
         })
 
 
+class LogoutAllView(GenericAPIView):
+    """Révoque tous les jetons de l'utilisateur, sur tous ses appareils"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        revoke_user_tokens(request.user)
+        
+        return Response({'detail': 'Toutes les sessions ont été fermées'})
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
\ No newline at end of file
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class CadidatesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'candidates'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_migrate, post_save
+        from api.fulltext import install_indexes
+        from api.http_cache import watch_model
+        from authentication.backends import revoke_candidate_change_tokens
+        from . import search  # noqa: F401 (enregistre l'index)
+        from .models import Candidate, Document, DocumentType, UploadSession
+        from .storage import release_document
+        from .uploads import remove_part
+        
+        watch_model(DocumentType)
+        # profil candidat lu dans les jetons (IsNotCandidate) : sa création ou sa suppression révoque ceux déjà émis
+        post_save.connect(revoke_candidate_change_tokens, sender=Candidate, dispatch_uid='revoke_candidate_save_tokens')
+        post_delete.connect(revoke_candidate_change_tokens, sender=Candidate, dispatch_uid='revoke_candidate_delete_tokens')
+        post_delete.connect(release_document, sender=Document, dispatch_uid='document_blob_release')
+        post_delete.connect(remove_part, sender=UploadSession, dispatch_uid='upload_part_remove')
+        # table plein texte et triggers, hors migrations
+        post_migrate.connect(install_indexes, sender=self, dispatch_uid='fulltext_candidates')
@@ -0,0 +1,21 @@
+# candidates/exports.py
+from django.db.models import Count, F
+
+from api.exports import EXPORT_CHUNK_SIZE
+
+
+CANDIDATE_EXPORT_COLUMNS = [
+    'id', 'last_name', 'first_name', 'email', 'phone', 'nationality', 'birthdate',
+    'address', 'specialties', 'experience', 'applications_count',
+]
+
+
+def candidate_export_rows(queryset):
+    """Lignes d'export des candidats, lues par lots côté serveur"""
+    return queryset.order_by('user__last_name', 'user__first_name', 'id').values(
+        'id', 'phone', 'nationality', 'birthdate', 'address', 'specialties', 'experience',
+        last_name=F('user__last_name'),
+        first_name=F('user__first_name'),
+        email=F('user__email'),
+        applications_count=Count('applications'),
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
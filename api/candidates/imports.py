@@ -0,0 +1,329 @@
+# candidates/imports.py
+import csv
+import io
+import json
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from api.processes import init_django
+from authentication.models import User
+from positions.models import Position
+from positions.signals import applications_imported
+from recruitment_process.models import Application
+
+from .models import Candidate
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+# mêmes colonnes que l'export des candidats (les colonnes inconnues sont ignorées),
+# plus un mot de passe optionnel et les positions auxquelles candidater
+IMPORT_COLUMNS = [
+    'email', 'first_name', 'last_name', 'password', 'phone', 'nationality', 'birthdate',
+    'address', 'specialties', 'experience', 'positions',
+]
+
+PROFILE_FIELDS = ['phone', 'address', 'nationality', 'birthdate', 'experience', 'specialties']
+
+
+class PositionIdsField(serializers.ListField):
+    """Identifiants de positions : liste JSON ou chaîne "3;7" en CSV"""
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [part for part in re.split(r'[;,|\s]+', data) if part]
+        elif isinstance(data, int):
+            data = [data]
+        return list(dict.fromkeys(super().to_internal_value(data)))
+
+
+class CandidateImportSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    password = serializers.CharField(required=False, trim_whitespace=False)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+    nationality = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    birthdate = serializers.DateField(required=False, allow_null=True)
+    experience = serializers.CharField(required=False, allow_blank=True)
+    specialties = serializers.CharField(required=False, allow_blank=True)
+    positions = PositionIdsField(required=False)
+
+
+# --- Lecture ---
+
+def guess_format(filename):
+    return 'ndjson' if filename.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def read_rows(stream, import_format):
+    """
+    Itère sur (numéro de ligne, ligne, erreur) depuis un fichier binaire
+    CSV ou NDJSON, sans le charger en mémoire. En CSV, les cellules vides
+    sont considérées absentes.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if import_format == 'ndjson':
+            for number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield number, {}, {'non_field_errors': [f'JSON invalide : {exc}']}
+                    continue
+                if isinstance(row, dict):
+                    yield number, row, None
+                else:
+                    yield number, {}, {'non_field_errors': ['Un objet JSON est attendu.']}
+        else:
+            reader = csv.DictReader(text)
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if key and value}, None
+    finally:
+        # le flux reste ouvert pour l'appelant (relecture après comptage des lignes)
+        text.detach()
+
+
+def count_rows(stream, import_format, limit):
+    """Nombre de lignes du fichier, compté jusqu'à `limit` + 1 ; le flux est rembobiné"""
+    rows = read_rows(stream, import_format)
+    try:
+        count = sum(1 for _ in islice(rows, limit + 1))
+    finally:
+        rows.close()
+    stream.seek(0)
+    return count
+
+
+# --- Rejets ---
+
+class RejectFile:
+    """Fichier de rejets au format de l'import, avec le numéro de ligne et les erreurs"""
+
+    def __init__(self, stream, import_format):
+        self.stream = stream
+        self.import_format = import_format
+        self.writer = None
+
+    def write(self, line, row, errors):
+        if self.import_format == 'ndjson':
+            self.stream.write(json.dumps({'line': line, 'errors': errors, 'row': row}, default=str) + '\n')
+            return
+        if self.writer is None:
+            self.writer = csv.writer(self.stream)
+            self.writer.writerow(['line', 'errors', *IMPORT_COLUMNS])
+        self.writer.writerow([line, format_errors(errors), *(_csv_value(row.get(column)) for column in IMPORT_COLUMNS)])
+
+
+class RejectList:
+    """Rejets conservés en mémoire (réponse de l'API), limités aux `limit` premiers"""
+
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.rows = []
+
+    def write(self, line, row, errors):
+        if len(self.rows) < self.limit:
+            self.rows.append({'line': line, 'email': row.get('email'), 'errors': errors})
+
+
+def format_errors(errors):
+    return ' ; '.join(
+        f"{field}: {' '.join(str(message) for message in messages)}" for field, messages in errors.items()
+    )
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ';'.join(str(item) for item in value)
+    return '' if value is None else value
+
+
+# --- Mots de passe ---
+
+class PasswordHasher:
+    """
+    Hache les mots de passe d'un lot, dans un pool de processus si
+    `workers` > 1 (le hachage, volontairement lent, domine sinon l'import).
+    Sans mot de passe, le compte est inutilisable jusqu'à réinitialisation.
+    """
+
+    def __init__(self, workers=1):
+        self.executor = ProcessPoolExecutor(workers, initializer=init_django) if workers > 1 else None
+        self.workers = workers
+
+    def hash(self, passwords):
+        given = [password for password in passwords if password]
+        if self.executor and len(given) > 1:
+            hashed = self.executor.map(make_password, given, chunksize=max(1, len(given) // (self.workers * 4)))
+        else:
+            hashed = map(make_password, given)
+        hashed = iter(hashed)
+        return [next(hashed) if password else make_password(None) for password in passwords]
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown()
+
+
+# --- Import ---
+
+class CandidateImporter:
+    """
+    Import en masse de candidats (utilisateur + profil) et de leurs
+    candidatures, par lots de `chunk_size` lignes : validation du lot
+    (format, emails en double dans le fichier ou déjà en base, positions
+    inconnues), hachage des mots de passe, puis bulk_create dans une
+    transaction par lot. Les lignes invalides sont envoyées à `rejects`.
+
+    `passwords` : 'hash' (mot de passe fourni, soumis aux validateurs de
+    AUTH_PASSWORD_VALIDATORS, sinon compte inutilisable) ou 'unusable'
+    (tous les comptes doivent réinitialiser leur mot de passe).
+    """
+
+    def __init__(self, rejects=None, passwords='hash', workers=1, chunk_size=IMPORT_CHUNK_SIZE):
+        self.rejects = rejects
+        self.passwords = passwords
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.serializer = CandidateImportSerializer()
+        self.seen_emails = {}
+        self.result = {'rows': 0, 'candidates': 0, 'applications': 0, 'rejected': 0}
+
+    def run(self, rows):
+        hasher = PasswordHasher(self.workers if self.passwords == 'hash' else 1)
+        try:
+            rows = iter(rows)
+            while chunk := list(islice(rows, self.chunk_size)):
+                self.import_chunk(chunk, hasher)
+        finally:
+            hasher.close()
+        return self.result
+
+    def import_chunk(self, chunk, hasher):
+        self.result['rows'] += len(chunk)
+        valid = []
+        for line, row, errors in chunk:
+            if errors is None:
+                data, errors = self.validate_row(line, row)
+            if errors:
+                self.reject(line, row, errors)
+            else:
+                valid.append((line, row, data))
+
+        valid = self.validate_batch(valid)
+        if not valid:
+            return
+
+        if self.passwords == 'hash':
+            passwords = hasher.hash([data.get('password') for _, _, data in valid])
+        else:
+            passwords = [make_password(None) for _ in valid]
+
+        try:
+            with transaction.atomic():
+                self.write(valid, passwords)
+        except IntegrityError:
+            # email créé entre-temps : on reprend le lot ligne par ligne
+            for entry, password in zip(valid, passwords):
+                try:
+                    with transaction.atomic():
+                        self.write([entry], [password])
+                except IntegrityError as exc:
+                    self.reject(entry[0], entry[1], {'non_field_errors': [f'Erreur d\'intégrité : {exc}']})
+
+    def validate_row(self, line, row):
+        try:
+            data = self.serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            return None, exc.detail if isinstance(exc.detail, dict) else {'non_field_errors': exc.detail}
+
+        data['email'] = User.objects.normalize_email(data['email'])
+        first_line = self.seen_emails.setdefault(data['email'].lower(), line)
+        if first_line != line:
+            return None, {'email': [f'Email en double dans le fichier (ligne {first_line}).']}
+        if self.passwords == 'hash' and data.get('password'):
+            user = User(email=data['email'], first_name=data['first_name'], last_name=data['last_name'])
+            try:
+                validate_password(data['password'], user)
+            except DjangoValidationError as exc:
+                return None, {'password': exc.messages}
+        return data, None
+
+    def validate_batch(self, valid):
+        """Contrôles nécessitant la base, en une requête par lot"""
+        emails = [data['email'] for _, _, data in valid]
+        existing = {email.lower() for email in User.objects.filter(email__in=emails).values_list('email', flat=True)}
+        position_ids = {pk for _, _, data in valid for pk in data.get('positions', ())}
+        known_positions = set(Position.objects.filter(pk__in=position_ids).values_list('pk', flat=True))
+
+        accepted = []
+        for line, row, data in valid:
+            errors = {}
+            if data['email'].lower() in existing:
+                errors['email'] = ['Un utilisateur existe déjà avec cet email.']
+            unknown = [pk for pk in data.get('positions', ()) if pk not in known_positions]
+            if unknown:
+                errors['positions'] = [f"Positions inconnues : {', '.join(map(str, unknown))}."]
+            if errors:
+                self.reject(line, row, errors)
+            else:
+                accepted.append((line, row, data))
+        return accepted
+
+    def write(self, valid, passwords):
+        users = User.objects.bulk_create([
+            User(
+                email=data['email'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                password=password,
+                group='Candidat',
+            )
+            for (_, _, data), password in zip(valid, passwords)
+        ])
+        if users and users[0].pk is None:
+            # backends sans RETURNING sur les insertions en masse
+            ids = dict(User.objects.filter(email__in=[user.email for user in users]).values_list('email', 'id'))
+            for user in users:
+                user.pk = ids[user.email]
+
+        candidates = Candidate.objects.bulk_create([
+            Candidate(user=user, **{field: data[field] for field in PROFILE_FIELDS if field in data})
+            for user, (_, _, data) in zip(users, valid)
+        ])
+        if candidates and candidates[0].pk is None:
+            ids = dict(Candidate.objects.filter(user__in=users).values_list('user_id', 'id'))
+            for candidate in candidates:
+                candidate.pk = ids[candidate.user_id]
+
+        applications = Application.objects.bulk_create([
+            Application(candidate=candidate, position_id=position_id)
+            for candidate, (_, _, data) in zip(candidates, valid)
+            for position_id in data.get('positions', ())
+        ], batch_size=self.chunk_size)
+
+        if applications:
+            counts = Counter(application.position_id for application in applications)
+            applications_imported.send(sender=Application, counts=dict(counts))
+
+        self.result['candidates'] += len(candidates)
+        self.result['applications'] += len(applications)
+
+    def reject(self, line, row, errors):
+        self.result['rejected'] += 1
+        if self.rejects is not None:
+            self.rejects.write(line, row, errors)
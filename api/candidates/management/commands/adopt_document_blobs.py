@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from candidates.models import Document
+from candidates.storage import acquire, blob_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Range les documents antérieurs au stockage par empreinte (candidates/{id}/{nom}) dans des blobs "
+        "partagés, par lots"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--delete-originals', action='store_true',
+                            help="Supprimer les anciens fichiers une fois rangés")
+
+    def handle(self, *args, **options):
+        adopted = missing = 0
+        last = 0
+        while True:
+            documents = list(Document.objects.filter(blob__isnull=True, pk__gt=last).order_by('pk')[:options['chunk_size']])
+            if not documents:
+                break
+            for document in documents:
+                last = document.pk
+                original = document.file.name
+                if not original or not blob_storage.exists(original):
+                    missing += 1
+                    continue
+                with transaction.atomic():
+                    with blob_storage.open(original, 'rb') as content:
+                        blob = acquire(content)
+                    document.blob = blob
+                    document.original_name = document.filename()
+                    document.file.name = blob_storage.blob_name(blob.digest)
+                    document.save(update_fields=['blob', 'original_name', 'file'])
+                if options['delete_originals']:
+                    blob_storage.delete(original)
+                adopted += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{adopted} document(s) rangé(s) dans des blobs"))
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing} document(s) sans fichier ignoré(s)"))
@@ -0,0 +1,55 @@
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from candidates.storage import collect, orphan_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime par lots les blobs de documents sans référence depuis DOCUMENT_BLOB_GRACE "
+        "(et, avec --orphans, les fichiers de blobs sans ligne en base)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Blobs supprimés par transaction")
+        parser.add_argument('--pause', type=float, default=0.0, help="Pause entre deux lots (secondes)")
+        parser.add_argument('--grace', type=int, help="Délai avant suppression (secondes, DOCUMENT_BLOB_GRACE par défaut)")
+        parser.add_argument('--interval', type=float,
+                            help="Reprendre la collecte toutes les N secondes au lieu de s'arrêter")
+        parser.add_argument('--orphans', action='store_true', help="Parcourir aussi les fichiers du stockage")
+
+    def handle(self, *args, **options):
+        grace = options['grace'] if options['grace'] is not None else getattr(settings, 'DOCUMENT_BLOB_GRACE', 24 * 3600)
+        try:
+            while True:
+                self.collect(timezone.now() - timedelta(seconds=grace), options)
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt de la collecte")
+
+    def collect(self, older_than, options):
+        total = size = 0
+        while True:
+            count, freed = collect(older_than, options['chunk_size'])
+            total, size = total + count, size + freed
+            if count < options['chunk_size']:
+                break
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"{total} blob(s) supprimé(s), {size / 1024 / 1024:.1f} Mo libérés"))
+
+        if options['orphans']:
+            removed = 0
+            for path in orphan_files(older_than, options['chunk_size']):
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+            self.stdout.write(f"{removed} fichier(s) orphelin(s) supprimé(s)")
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from candidates.uploads import expire_sessions
+
+
+class Command(BaseCommand):
+    help = "Supprime par lots les sessions d'envoi de documents expirées et leurs fichiers partiels"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Sessions supprimées par lot")
+        parser.add_argument('--interval', type=float,
+                            help="Reprendre le nettoyage toutes les N secondes au lieu de s'arrêter")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                now, total = timezone.now(), 0
+                while True:
+                    count = expire_sessions(now, options['chunk_size'])
+                    total += count
+                    if count < options['chunk_size']:
+                        break
+                self.stdout.write(self.style.SUCCESS(f"{total} session(s) d'envoi expirée(s) supprimée(s)"))
+                if options['interval'] is None:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt du nettoyage")
@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidates.imports import IMPORT_CHUNK_SIZE, CandidateImporter, RejectFile, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Importe en masse des candidats et leurs candidatures depuis un fichier CSV ou NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier à importer (.csv, .ndjson ou .jsonl)")
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help="Format du fichier (déduit de l'extension par défaut)")
+        parser.add_argument('--rejects',
+                            help="Fichier des lignes rejetées (par défaut <fichier>.rejects.<format>)")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--passwords', choices=['hash', 'unusable'], default='hash',
+                            help="'unusable' : comptes sans mot de passe, à réinitialiser par les candidats")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Processus de hachage des mots de passe")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or guess_format(path)
+        rejects_path = options['rejects'] or f"{os.path.splitext(path)[0]}.rejects.{import_format}"
+
+        importer = CandidateImporter(
+            passwords=options['passwords'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+        )
+        start = time.perf_counter()
+        try:
+            with open(path, 'rb') as source, open(rejects_path, 'w', encoding='utf-8', newline='') as rejects:
+                importer.rejects = RejectFile(rejects, import_format)
+                result = importer.run(read_rows(source, import_format))
+        except OSError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{result['rows']} ligne(s) lue(s) en {elapsed:.1f} s : {result['candidates']} candidat(s) "
+            f"et {result['applications']} candidature(s) créé(s)"
+        )
+        if result['rejected']:
+            self.stdout.write(self.style.WARNING(f"{result['rejected']} ligne(s) rejetée(s) : voir {rejects_path}"))
+        else:
+            os.remove(rejects_path)
+            self.stdout.write(self.style.SUCCESS("Aucune ligne rejetée"))
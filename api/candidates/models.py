@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
+from api.fulltext import SearchDocumentField
 from authentication.models import User
 
 import os
@@ -21,6 +22,11 @@ class Candidate(models.Model):
     
     class Meta:
         ordering = ['user__last_name', 'user__first_name']
+        indexes = [
+            # filtres d'âge et de nationalité de la recherche de candidats
+            models.Index(fields=['birthdate'], name='candidate_birthdate_idx'),
+            models.Index(fields=['nationality', 'birthdate'], name='candidate_nat_birth_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()}"
@@ -32,6 +38,19 @@ class Candidate(models.Model):
         return self.user.email
 
 
+class CandidateSearchEntry(models.Model):
+    """Ligne de l'index plein texte des candidats (candidates/search.py), hors migrations"""
+    candidate = models.OneToOneField(
+        Candidate, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_entry',
+    )
+    document = SearchDocumentField()
+    
+    class Meta:
+        managed = False
+        db_table = 'candidates_candidate_fts'
+
+
 class DocumentType(models.Model):
     name = models.CharField(max_length=100)
     is_required = models.BooleanField(default=False)
@@ -41,10 +60,38 @@ class DocumentType(models.Model):
         return self.name
 
 
+class Blob(models.Model):
+    """Contenu de fichier partagé par les documents, rangé sous son empreinte (candidates/storage.py)"""
+    digest = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True, help_text="Passage à zéro référence")
+    
+    class Meta:
+        indexes = [
+            # blobs collectables (collect_blobs)
+            models.Index(fields=['released_at'], name='blob_released_idx', condition=models.Q(ref_count=0)),
+        ]
+    
+    def __str__(self):
+        return self.digest
+
+
+def get_blob_storage():
+    from .storage import blob_storage
+    return blob_storage
+
+
 class Document(models.Model):
     candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='documents')
     document_type = models.ForeignKey(DocumentType, on_delete=models.CASCADE, related_name='documents')
-    file = models.FileField(upload_to=candidate_document_path)
+    # documents antérieurs aux blobs : candidates/{id}/{nom}, sans blob
+    file = models.FileField(upload_to=candidate_document_path, storage=get_blob_storage)
+    blob = models.ForeignKey(
+        Blob, on_delete=models.PROTECT, null=True, blank=True, editable=False, related_name='documents'
+    )
+    original_name = models.CharField(max_length=255, blank=True, editable=False)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -53,5 +100,42 @@ class Document(models.Model):
     def __str__(self):
         return f"{self.candidate} - {self.document_type}"
     
+    def save(self, *args, **kwargs):
+        # nouveau fichier : partagé par empreinte, compté dans son blob
+        if not self.file or self.file._committed:
+            return super().save(*args, **kwargs)
+        
+        from .storage import acquire, blob_storage, release
+        
+        previous = self.blob_id
+        with transaction.atomic():
+            blob = acquire(self.file)
+            self.original_name = os.path.basename(self.file.name)[:255]
+            self.blob = blob
+            self.file.name = blob_storage.blob_name(blob.digest)
+            self.file._committed = True
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'blob', 'original_name'}
+            super().save(*args, **kwargs)
+            release(previous)
+    
     def filename(self):
-        return os.path.basename(self.file.name)
\ No newline at end of file
+        return self.original_name or os.path.basename(self.file.name)
+
+
+class UploadSession(models.Model):
+    """Envoi d'un document en plusieurs requêtes PATCH (candidates/uploads.py)"""
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='upload_sessions')
+    document_type = models.ForeignKey(DocumentType, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField(help_text="Taille annoncée (octets)")
+    checksum = models.CharField(max_length=64, blank=True, help_text="SHA-256 annoncé (hexadécimal)")
+    received = models.BigIntegerField(default=0, help_text="Octets reçus depuis le début du fichier")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+    
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
@@ -0,0 +1,34 @@
+# candidates/search.py
+from django.utils import timezone
+
+from api.fulltext import FullTextIndex, register
+
+
+# recherche de profils (/api/candidates/search/) : les spécialités pèsent plus que l'expérience
+candidate_index = register(FullTextIndex('candidates.Candidate', [
+    ('specialties', 'A'),
+    ('experience', 'B'),
+]))
+
+
+def years_ago(today, years):
+    # un 29 février devient le 28 : né le 28/02, on a un an de plus le 28/02 suivant
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def birthdate_range(min_age=None, max_age=None, today=None):
+    """
+    Filtres sur birthdate équivalents à min_age <= âge <= max_age (âge
+    calculé comme CandidateSerializer.get_age), utilisables par l'index.
+    """
+    today = today or timezone.localdate()
+    lookups = {}
+    if min_age is not None:
+        lookups['birthdate__lte'] = years_ago(today, min_age)
+    if max_age is not None:
+        # âge <= max_age : pas encore eu ses max_age + 1 ans
+        lookups['birthdate__gt'] = years_ago(today, max_age + 1)
+    return lookups
@@ -1,8 +1,11 @@
 # positions/serializers.py
+import os
+
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
-from .models import Candidate, Document, DocumentType
+from .models import Candidate, Document, DocumentType, UploadSession
 from authentication.serializers import UserSerializer
 
 
@@ -75,6 +78,19 @@ class CandidateCreateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class CandidateSearchSerializer(serializers.Serializer):
+    """Paramètres de /api/candidates/search/"""
+    q = serializers.CharField(required=False, allow_blank=True)
+    nationality = serializers.CharField(required=False, allow_blank=True)
+    min_age = serializers.IntegerField(required=False, min_value=0, max_value=150)
+    max_age = serializers.IntegerField(required=False, min_value=0, max_value=150)
+    
+    def validate(self, data):
+        if data.get('min_age') is not None and data.get('max_age') is not None and data['min_age'] > data['max_age']:
+            raise serializers.ValidationError({'max_age': "Doit être supérieur ou égal à min_age."})
+        return data
+
+
 class DocumentTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = DocumentType
@@ -91,6 +107,32 @@ class DocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['uploaded_at']
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Session d'envoi reprenable : `offset` est le prochain octet attendu"""
+    offset = serializers.IntegerField(source='received', read_only=True)
+    checksum = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'document_type', 'filename', 'size', 'checksum', 'offset', 'created_at', 'expires_at']
+        read_only_fields = ['created_at', 'expires_at']
+    
+    def validate_filename(self, value):
+        name = os.path.basename(value.replace('\\', '/'))
+        if not name:
+            raise serializers.ValidationError("Nom de fichier invalide.")
+        return name
+    
+    def validate_size(self, value):
+        maximum = getattr(settings, 'DOCUMENT_UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+        if not 0 < value <= maximum:
+            raise serializers.ValidationError(f"La taille doit être comprise entre 1 et {maximum} octets.")
+        return value
+    
+    def validate_checksum(self, value):
+        return value.lower()
+
+
 class BulkStageUpdateSerializer(serializers.Serializer):
     stage_id = serializers.IntegerField()
     global_comment = serializers.CharField(required=False, allow_blank=True)
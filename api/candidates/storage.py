@@ -0,0 +1,177 @@
+# candidates/storage.py
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import LazyObject
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Fichiers rangés sous l'empreinte SHA-256 de leur contenu
+    (blobs/ab/cd/<empreinte>) : un même contenu n'est écrit qu'une fois.
+    Le contenu est haché pendant sa copie, par morceaux, dans un fichier
+    temporaire du même volume puis renommé à sa place.
+    """
+
+    prefix = 'blobs'
+
+    def blob_name(self, digest):
+        return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}'
+
+    def stage(self, content):
+        """Copie `content` dans un fichier temporaire : (chemin, empreinte, taille)"""
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        hasher, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    output.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        return temporary, hasher.hexdigest(), size
+
+    def commit(self, temporary, digest):
+        """Met le fichier temporaire à la place du blob, ou le supprime si le blob existe déjà"""
+        name = self.blob_name(digest)
+        path = self.path(name)
+        if os.path.exists(path):
+            os.unlink(temporary)
+            os.utime(path)  # protège un fichier orphelin réutilisé de orphan_files
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temporary, self.file_permissions_mode)
+        os.replace(temporary, path)
+        return name
+
+    def _save(self, name, content):
+        temporary, digest, _ = self.stage(content)
+        return self.commit(temporary, digest)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+
+class DefaultBlobStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = ContentAddressedStorage()
+
+
+blob_storage = DefaultBlobStorage()
+
+
+def acquire(content):
+    """
+    Enregistre `content` (fichier Django) comme blob et y ajoute une
+    référence ; le fichier est écrit sous le verrou de la ligne Blob, ce qui
+    l'ordonne avec collect_blobs.
+    """
+    temporary, digest, size = blob_storage.stage(content)
+    return acquire_file(temporary, digest, size)
+
+
+def acquire_file(temporary, digest, size):
+    """Comme acquire(), pour un fichier déjà copié et haché sur le volume du stockage (déplacé ou supprimé)"""
+    from .models import Blob
+
+    try:
+        with transaction.atomic():
+            Blob.objects.get_or_create(digest=digest, defaults={'size': size})
+            blob = Blob.objects.select_for_update().get(pk=digest)
+            Blob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1, released_at=None)
+            # après l'incrément : le blob n'est plus collectable, et un fichier
+            # supprimé entre-temps par collect_blobs est remis en place
+            blob_storage.commit(temporary, digest)
+    finally:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+    blob.ref_count += 1
+    return blob
+
+
+def release(digest):
+    """Retire une référence ; le blob devient collectable à 0"""
+    from .models import Blob
+
+    if digest is None:
+        return
+    with transaction.atomic():
+        Blob.objects.filter(pk=digest, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+        Blob.objects.filter(pk=digest, ref_count=0, released_at__isnull=True).update(released_at=timezone.now())
+
+
+def release_document(sender, instance, **kwargs):
+    """Receiver post_delete de Document (suppressions en cascade comprises)"""
+    release(instance.blob_id)
+
+
+def collect(older_than, chunk_size=500):
+    """
+    Supprime un lot de blobs sans référence depuis avant `older_than`
+    (ligne puis fichier, après commit) ; retourne (nombre, octets).
+    """
+    from .models import Blob
+
+    eligible = Blob.objects.filter(ref_count=0, released_at__lt=older_than)
+    with transaction.atomic():
+        candidates = list(eligible.order_by('released_at').values_list('digest', 'size')[:chunk_size])
+        # suppression conditionnelle : un blob référencé entre-temps par acquire() est conservé
+        deleted = [(digest, size) for digest, size in candidates if eligible.filter(pk=digest).delete()[0]]
+        transaction.on_commit(lambda: _unlink_blobs([digest for digest, _ in deleted]))
+    return len(deleted), sum(size for _, size in deleted)
+
+
+def _unlink_blobs(digests):
+    from .models import Blob
+
+    # un blob recréé depuis par acquire() garde son fichier
+    recreated = set(Blob.objects.filter(pk__in=digests).values_list('pk', flat=True))
+    for digest in digests:
+        if digest not in recreated:
+            blob_storage.delete(blob_storage.blob_name(digest))
+
+
+def orphan_files(older_than, chunk_size=500):
+    """
+    Fichiers de blobs sans ligne Blob (écrits par une transaction annulée)
+    ou temporaires abandonnés, modifiés avant `older_than`, par lots.
+    """
+    from .models import Blob
+
+    root = blob_storage.path(blob_storage.prefix)
+    limit = older_than.timestamp()
+    batch = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            try:
+                if os.path.getmtime(path) >= limit:
+                    continue
+            except OSError:
+                continue
+            if filename.startswith('.upload-'):
+                yield path
+                continue
+            batch[filename] = path
+            if len(batch) >= chunk_size:
+                yield from _unknown(Blob, batch)
+                batch = {}
+    if batch:
+        yield from _unknown(Blob, batch)
+
+
+def _unknown(model, batch):
+    known = set(model.objects.filter(pk__in=list(batch)).values_list('pk', flat=True))
+    return [path for digest, path in batch.items() if digest not in known]
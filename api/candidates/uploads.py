@@ -0,0 +1,165 @@
+# candidates/uploads.py
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Document, UploadSession
+from .storage import acquire_file, blob_storage
+
+
+# lectures et écritures par morceaux : mémoire bornée quelle que soit la taille du document
+CHUNK_SIZE = 64 * 1024
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
+
+class UploadError(Exception):
+    """Requête d'envoi refusée ; `status` est le code HTTP de la réponse"""
+    status = 400
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadConflict(UploadError):
+    """La plage envoyée ne commence pas à l'offset reçu (ou envoi incomplet)"""
+    status = 409
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+class UploadExpired(UploadError):
+    status = 410
+
+
+def expiry():
+    return timezone.now() + timedelta(seconds=getattr(settings, 'DOCUMENT_UPLOAD_EXPIRY', 24 * 3600))
+
+
+def part_path(session):
+    # même volume que les blobs : la finalisation déplace le fichier sans le copier
+    return blob_storage.path(f'uploads/{session.pk}.part')
+
+
+def create_part(session):
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+
+
+def parse_content_range(header, size):
+    """Content-Range: bytes <début>-<fin>/<total> -> (début, longueur)"""
+    match = _CONTENT_RANGE.match(header or '')
+    if match is None:
+        raise UploadError("En-tête Content-Range attendu : bytes <début>-<fin>/<total>.")
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start or end >= size or (total != '*' and int(total) != size):
+        raise UploadError(f"Plage {start}-{end} invalide pour un fichier de {size} octets.")
+    return start, end - start + 1
+
+
+def write_range(session, stream, start, length):
+    """
+    Écrit `length` octets de `stream` à partir de `start` dans le fichier
+    partiel ; la progression est enregistrée même si la connexion est
+    coupée en cours d'envoi. Retourne le nouvel offset.
+    """
+    if session.is_expired():
+        raise UploadExpired("Session d'envoi expirée.")
+    if start != session.received:
+        raise UploadConflict(f"L'envoi doit reprendre à l'octet {session.received}.", offset=session.received)
+    if length > getattr(settings, 'DOCUMENT_UPLOAD_MAX_CHUNK', 16 * 1024 * 1024):
+        raise UploadTooLarge("Plage trop grande pour une seule requête.", offset=session.received)
+
+    written = 0
+    try:
+        with open(part_path(session), 'r+b') as part:
+            part.seek(start)
+            while written < length:
+                chunk = stream.read(min(CHUNK_SIZE, length - written))
+                if not chunk:
+                    break
+                part.write(chunk)
+                written += len(chunk)
+    finally:
+        # mise à jour conditionnelle : un envoi concurrent de la même plage ne compte qu'une fois
+        updated = UploadSession.objects.filter(pk=session.pk, received=start).update(
+            received=start + written, expires_at=expiry()
+        )
+    if not updated:
+        session.refresh_from_db(fields=['received'])
+        raise UploadConflict("Plage déjà reçue par une autre requête.", offset=session.received)
+    session.received = start + written
+    if written < length:
+        raise UploadError(f"Corps incomplet : {written} octet(s) reçu(s) sur {length}.", offset=session.received)
+    return session.received
+
+
+def file_digest(path):
+    hasher, size = hashlib.sha256(), 0
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def finalize(session):
+    """
+    Vérifie la taille et l'empreinte du fichier reçu puis le range dans un
+    blob partagé ; retourne le Document créé. Une empreinte différente de
+    celle annoncée met fin à la session.
+    """
+    if session.is_expired():
+        raise UploadExpired("Session d'envoi expirée.")
+    if session.received != session.size:
+        raise UploadConflict(
+            f"Envoi incomplet : {session.received} octet(s) reçu(s) sur {session.size}.", offset=session.received
+        )
+
+    path = part_path(session)
+    digest, size = file_digest(path)
+    if size != session.size:
+        session.delete()
+        raise UploadError(f"Fichier reçu de {size} octet(s) au lieu de {session.size} ; session annulée.")
+    if session.checksum and digest != session.checksum.lower():
+        session.delete()
+        raise UploadError("Empreinte SHA-256 différente de celle annoncée ; session annulée.")
+
+    with transaction.atomic():
+        # une seule finalisation par session
+        if not UploadSession.objects.select_for_update().filter(pk=session.pk).exists():
+            raise UploadConflict("Session déjà finalisée.")
+        blob = acquire_file(path, digest, size)
+        document = Document.objects.create(
+            candidate_id=session.candidate_id, document_type_id=session.document_type_id,
+            file=blob_storage.blob_name(digest), blob=blob, original_name=session.filename,
+        )
+        session.delete()
+    return document
+
+
+def remove_part(sender, instance, **kwargs):
+    """Receiver post_delete d'UploadSession (suppressions en cascade comprises)"""
+    try:
+        os.unlink(part_path(instance))
+    except FileNotFoundError:
+        pass
+
+
+def expire_sessions(now=None, chunk_size=500):
+    """Supprime un lot de sessions expirées et leurs fichiers partiels ; retourne leur nombre"""
+    now = now or timezone.now()
+    ids = list(UploadSession.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:chunk_size])
+    for session in UploadSession.objects.filter(pk__in=ids, expires_at__lte=now):
+        session.delete()
+    return len(ids)
@@ -1,7 +1,7 @@
 # recruitment_process/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CandidateViewSet, DocumentViewSet, DocumentTypeViewSet
+from .views import CandidateViewSet, DocumentViewSet, DocumentTypeViewSet, UploadSessionViewSet
 
 
 router = DefaultRouter()
@@ -9,6 +9,7 @@ router = DefaultRouter()
 router.register(r'candidates', CandidateViewSet, basename='candidate')
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'document-types', DocumentTypeViewSet, basename='document-type')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls))
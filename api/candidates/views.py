@@ -1,14 +1,25 @@
 # candidates/views.py
-from rest_framework import viewsets, status, permissions
+from rest_framework import mixins, viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 
-from .models import Candidate, Document, DocumentType
+from api.exports import CSVStreamRenderer, NDJSONStreamRenderer, streaming_export
+from api.http_cache import cached_response
+from api.pagination import KeysetPagination
+from recruitment_process.permissions import IsStaffOrRH
+
+from .exports import CANDIDATE_EXPORT_COLUMNS, candidate_export_rows
+from .imports import CandidateImporter, RejectList, count_rows, guess_format, read_rows
+from .models import Candidate, Document, DocumentType, UploadSession
+from .search import birthdate_range, candidate_index
 from .serializers import (
-    CandidateSerializer, CandidateCreateSerializer,
-    DocumentSerializer, DocumentTypeSerializer,
+    CandidateSerializer, CandidateCreateSerializer, CandidateSearchSerializer,
+    DocumentSerializer, DocumentTypeSerializer, UploadSessionSerializer,
 )
+from .uploads import UploadError, create_part, expiry, finalize, parse_content_range, write_range
 
 
 class CandidateViewSet(viewsets.ModelViewSet):
@@ -39,6 +50,90 @@ class CandidateViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(candidate)
         return Response(serializer.data)
     
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated, IsStaffOrRH],
+        pagination_class=KeysetPagination,
+    )
+    def search(self, request):
+        """
+        Recherche de profils (?q=&nationality=&min_age=&max_age=) : plein
+        texte sur spécialités et expérience, classée par pertinence (les plus
+        récents d'abord sans q), paginée par curseur. Avec q, `truncated`
+        indique que des correspondances plus anciennes n'ont pas été classées.
+        """
+        params = CandidateSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        
+        # filtres d'abord : les correspondances plein texte retenues sont prises parmi ces profils
+        queryset = Candidate.objects.filter(**birthdate_range(filters.get('min_age'), filters.get('max_age')))
+        if filters.get('nationality'):
+            queryset = queryset.filter(nationality=filters['nationality'])
+        if filters.get('q'):
+            truncated = candidate_index.truncated(queryset, filters['q'])
+            queryset = candidate_index.search(queryset, filters['q'])
+            queryset = candidate_index.rank(queryset, filters['q']).order_by('search_rank', '-id')
+        else:
+            queryset = queryset.order_by('-id')
+        
+        page = self.paginate_queryset(queryset.select_related('user'))
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        if filters.get('q'):
+            # seules les FULLTEXT_MAX_RESULTS correspondances les plus récentes sont classées
+            response.data['truncated'] = truncated
+        return response
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated, IsStaffOrRH],
+        renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer],
+    )
+    def export(self, request):
+        """Export complet des candidats (?format=csv|ndjson), streamé sans pagination"""
+        return streaming_export(
+            candidate_export_rows(self.get_queryset()),
+            CANDIDATE_EXPORT_COLUMNS,
+            request.accepted_renderer.format,
+            'candidats',
+        )
+    
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        permission_classes=[permissions.IsAuthenticated, IsStaffOrRH],
+        parser_classes=[MultiPartParser],
+    )
+    def import_file(self, request):
+        """
+        Import en masse d'un fichier CSV/NDJSON (champ `file`). Les comptes
+        créés sont sans mot de passe (réinitialisation) sauf `passwords=hash`.
+        Limité à CANDIDATE_IMPORT_MAX_ROWS lignes : au-delà, utiliser la
+        commande import_candidates.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Fichier requis (champ "file")'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        passwords = request.data.get('passwords', 'unusable')
+        if passwords not in ('hash', 'unusable'):
+            return Response({'error': 'passwords doit valoir "hash" ou "unusable"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        import_format = request.data.get('format') or guess_format(upload.name)
+        max_rows = getattr(settings, 'CANDIDATE_IMPORT_MAX_ROWS', 5000)
+        if count_rows(upload.file, import_format, max_rows) > max_rows:
+            return Response(
+                {'error': f'Fichier limité à {max_rows} lignes ; utiliser la commande import_candidates.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        
+        rejects = RejectList()
+        result = CandidateImporter(rejects=rejects, passwords=passwords).run(read_rows(upload.file, import_format))
+        return Response({**result, 'rejects': rejects.rows})
+    
     @action(detail=True, methods=['patch'])
     def update_profile(self, request, pk=None):
         """Mettre à jour le profil candidat"""
@@ -66,10 +161,67 @@ class DocumentViewSet(viewsets.ModelViewSet):
         serializer.save(candidate=candidate)
 
 
+class UploadSessionViewSet(mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Envoi reprenable d'un document : POST crée la session, chaque PATCH
+    écrit une plage (corps brut, en-tête Content-Range) à partir de
+    `offset`, GET donne l'offset où reprendre, POST complete/ vérifie
+    taille et SHA-256 puis crée le Document. DELETE abandonne l'envoi.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        candidate = get_object_or_404(Candidate, user=self.request.user)
+        return UploadSession.objects.filter(candidate=candidate)
+    
+    def create(self, request, *args, **kwargs):
+        candidate = get_object_or_404(Candidate, user=request.user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(candidate=candidate, expires_at=expiry())
+        create_part(session)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    def partial_update(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            start, length = parse_content_range(request.META.get('HTTP_CONTENT_RANGE'), session.size)
+            if int(request.META.get('CONTENT_LENGTH') or 0) != length:
+                raise UploadError("Content-Length doit correspondre à la plage envoyée.", offset=session.received)
+            # corps lu par morceaux, sans passer par les parsers (request.data)
+            offset = write_range(session, request, start, length)
+        except UploadError as e:
+            return Response({'error': str(e), 'offset': e.offset}, status=e.status)
+        
+        return Response({'offset': offset, 'size': session.size, 'complete': offset == session.size})
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Vérifier le fichier reçu et créer le document"""
+        session = self.get_object()
+        try:
+            document = finalize(session)
+        except UploadError as e:
+            return Response({'error': str(e), 'offset': e.offset}, status=e.status)
+        
+        return Response(DocumentSerializer(document, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED)
+
+
 class DocumentTypeViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = DocumentType.objects.all().order_by('name')
     serializer_class = DocumentTypeSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    
+    # données de référence : réponses mises en cache jusqu'à la prochaine modification
+    @cached_response(DocumentType, max_age=300)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_response(DocumentType, max_age=300)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 
@@ -0,0 +1,89 @@
+import datetime
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = "Résume le journal des requêtes lentes : empreintes les plus coûteuses en temps cumulé"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=getattr(settings, 'MONITORING_SLOW_QUERY_LOG', None),
+                            help="Journal JSONL (par défaut MONITORING_SLOW_QUERY_LOG)")
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--order', choices=['total', 'count', 'max'], default='total')
+        parser.add_argument('--since', type=parse_datetime,
+                            help="Entrées postérieures à cette date (AAAA-MM-JJTHH:MM, UTC)")
+        parser.add_argument('--plans', action='store_true', help="Afficher le dernier plan d'exécution")
+        parser.add_argument('--json', action='store_true', help="Sortie JSON")
+
+    def handle(self, *args, **options):
+        if not options['path']:
+            raise CommandError("Aucun journal : définir MONITORING_SLOW_QUERY_LOG ou --path")
+
+        groups = {}
+        try:
+            with open(options['path'], encoding='utf-8') as log:
+                for line in log:
+                    entry = json.loads(line)
+                    if options['since'] and parse_datetime(entry['time']) < self.aware(options['since']):
+                        continue
+                    self.add(groups, entry)
+        except FileNotFoundError:
+            raise CommandError(f"Journal introuvable : {options['path']}")
+
+        key = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms'}[options['order']]
+        top = sorted(groups.values(), key=lambda group: -group[key])[:options['top']]
+        for group in top:
+            group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+            group['total_ms'] = round(group['total_ms'], 2)
+            for name in ('routes', 'call_sites', 'serializer_fields'):
+                group[name] = [value for value, _ in group[name].most_common(3)]
+
+        if options['json']:
+            self.stdout.write(json.dumps(top, indent=2, ensure_ascii=False))
+            return
+
+        if not top:
+            self.stdout.write("Aucune requête lente")
+        for rank, group in enumerate(top, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{rank}. {group['fingerprint']}  total={group['total_ms']} ms  "
+                f"n={group['count']}  moy={group['avg_ms']} ms  max={group['max_ms']} ms"
+            ))
+            self.stdout.write(f"   {group['normalized'][:500]}")
+            for label, name in (('routes', 'routes'), ("points d'appel", 'call_sites'), ('champs', 'serializer_fields')):
+                if group[name]:
+                    self.stdout.write(f"   {label} : {', '.join(group[name])}")
+            if options['plans'] and group['plan']:
+                for plan_line in group['plan'].splitlines():
+                    self.stdout.write(f"     {plan_line}")
+
+    def add(self, groups, entry):
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'normalized': entry['normalized'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'routes': Counter(),
+                'call_sites': Counter(),
+                'serializer_fields': Counter(),
+                'plan': None,
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        for name, field in (('routes', 'route'), ('call_sites', 'call_site'), ('serializer_fields', 'serializer_field')):
+            if entry.get(field):
+                group[name][entry[field]] += 1
+        group['plan'] = entry.get('plan') or group['plan']
+
+    def aware(self, value):
+        return value if timezone.is_aware(value) else timezone.make_aware(value, datetime.timezone.utc)
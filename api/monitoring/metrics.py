@@ -0,0 +1,118 @@
+# monitoring/metrics.py
+import threading
+from bisect import bisect_left
+
+
+# bornes supérieures des histogrammes (la dernière case est "au-delà")
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]
+
+# signatures N+1 conservées par route
+MAX_SIGNATURES = 10
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def quantile(self, q):
+        """Borne supérieure de la case contenant le quantile q (None : au-delà de la dernière borne)"""
+        total = sum(self.counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.bounds + [None], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        labels = [f'<={bound}' for bound in self.bounds] + [f'>{self.bounds[-1]}']
+        return dict(zip(labels, self.counts))
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.sql_ms = 0.0
+        self.encode_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.n_plus_one = 0
+        self.signatures = {}
+        self.latency = Histogram(LATENCY_BUCKETS_MS)
+        self.query_counts = Histogram(QUERY_BUCKETS)
+
+    def record(self, sample):
+        self.count += 1
+        self.errors += sample.status >= 500
+        self.total_ms += sample.total_ms
+        self.sql_ms += sample.sql_ms
+        self.encode_ms += sample.encode_ms
+        self.queries += sample.queries
+        self.max_queries = max(self.max_queries, sample.queries)
+        self.latency.observe(sample.total_ms)
+        self.query_counts.observe(sample.queries)
+        if sample.duplicates:
+            self.n_plus_one += 1
+            for sql, count in sample.duplicates:
+                if sql in self.signatures or len(self.signatures) < MAX_SIGNATURES:
+                    self.signatures[sql] = max(self.signatures.get(sql, 0), count)
+
+    def as_dict(self):
+        count = self.count or 1
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / count, 2),
+            'p50_ms': self.latency.quantile(0.5),
+            'p95_ms': self.latency.quantile(0.95),
+            'avg_sql_ms': round(self.sql_ms / count, 2),
+            'avg_encode_ms': round(self.encode_ms / count, 2),
+            'avg_queries': round(self.queries / count, 2),
+            'max_queries': self.max_queries,
+            'n_plus_one': self.n_plus_one,
+            'n_plus_one_signatures': [
+                {'sql': sql, 'max_count': count}
+                for sql, count in sorted(self.signatures.items(), key=lambda item: -item[1])
+            ],
+            'latency_ms': self.latency.as_dict(),
+            'queries_histogram': self.query_counts.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Agrégats par route, en mémoire du process (un registre par worker :
+    interroger chaque worker ou les exporter vers un collecteur).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, sample):
+        with self._lock:
+            metrics = self._routes.get(sample.route)
+            if metrics is None:
+                metrics = self._routes[sample.route] = RouteMetrics()
+            metrics.record(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return {route: metrics.as_dict() for route, metrics in sorted(self._routes.items())}
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,154 @@
+# monitoring/middleware.py
+import contextvars
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import registry
+
+
+logger = logging.getLogger('monitoring')
+
+# mesures de la requête en cours (lues par le journal des requêtes lentes...)
+current_request = contextvars.ContextVar('monitoring_request', default=None)
+
+
+def monitoring_enabled():
+    return getattr(settings, 'MONITORING_ENABLED', True)
+
+
+class RequestStats:
+    """
+    execute_wrapper : compte et chronomètre les requêtes SQL de la requête
+    HTTP. Le SQL (paramètres à part) sert de signature : la même requête
+    répétée N fois est le symptôme d'un N+1.
+    """
+
+    def __init__(self):
+        self.route = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.signatures = {}
+        self.view_start = None
+        self.view_end = None
+        self.render_end = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.signatures[sql] = self.signatures.get(sql, 0) + 1
+
+    def duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.signatures.items() if count >= threshold]
+
+
+class Sample:
+    __slots__ = ('route', 'status', 'total_ms', 'sql_ms', 'encode_ms', 'queries', 'duplicates')
+
+    def __init__(self, route, status, total_ms, sql_ms, encode_ms, queries, duplicates):
+        self.route = route
+        self.status = status
+        self.total_ms = total_ms
+        self.sql_ms = sql_ms
+        self.encode_ms = encode_ms
+        self.queries = queries
+        self.duplicates = duplicates
+
+
+def route_name(request, view_func):
+    """ViewSet.action pour DRF (cardinalité bornée), sinon le nom de l'URL"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        return f"{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    match = request.resolver_match
+    return (match.view_name if match else None) or getattr(view_func, '__name__', 'vue')
+
+
+class RequestMetricsMiddleware:
+    """
+    Par requête : route, nombre et durée des requêtes SQL, temps de la vue
+    (serializer.data compris) et de l'encodage de la réponse par le
+    renderer (JSON), requêtes répétées (N+1). Les mesures
+    sont ajoutées à l'en-tête Server-Timing et agrégées par route dans
+    monitoring.metrics.registry (/api/monitoring/metrics/).
+
+    Coût : deux appels à perf_counter et une entrée de dict par requête SQL.
+    Les réponses streamées ne comptent pas le SQL exécuté pendant le stream.
+    """
+
+    def __init__(self, get_response):
+        if not monitoring_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'MONITORING_SERVER_TIMING', True)
+        self.threshold = getattr(settings, 'MONITORING_N_PLUS_ONE_THRESHOLD', 10)
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        total = time.perf_counter() - start
+
+        encode = stats.render_end - stats.view_end if stats.render_end and stats.view_end else 0.0
+        duplicates = stats.duplicates(self.threshold)
+        sample = Sample(
+            route=stats.route or 'non résolue',
+            status=response.status_code,
+            total_ms=total * 1000,
+            sql_ms=stats.sql_time * 1000,
+            encode_ms=encode * 1000,
+            queries=stats.queries,
+            duplicates=duplicates,
+        )
+        registry.record(sample)
+
+        if duplicates:
+            logger.warning(
+                "N+1 probable sur %s : %s", sample.route,
+                '; '.join(f'{count}x {sql[:200]}' for sql, count in duplicates),
+            )
+        if self.server_timing:
+            response['Server-Timing'] = self.server_timing_header(stats, sample)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = current_request.get()
+        if stats is not None:
+            stats.route = route_name(request, view_func)
+            stats.view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # appelé entre la vue et response.render() : seul l'encodage par le renderer est mesuré à part
+        stats = current_request.get()
+        if stats is not None:
+            stats.view_end = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self.rendered(stats))
+        return response
+
+    def rendered(self, stats):
+        stats.render_end = time.perf_counter()
+
+    def server_timing_header(self, stats, sample):
+        metrics = [f'db;dur={sample.sql_ms:.1f};desc="{sample.queries} SQL"']
+        if stats.view_start and stats.view_end:
+            metrics.append(f'view;dur={(stats.view_end - stats.view_start) * 1000:.1f}')
+        if stats.render_end:
+            metrics.append(f'encode;dur={sample.encode_ms:.1f}')
+        metrics.append(f'total;dur={sample.total_ms:.1f}')
+        return ', '.join(metrics)
@@ -0,0 +1,200 @@
+# monitoring/slow_queries.py
+import datetime
+import decimal
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+from .middleware import current_request
+
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+# un seul EXPLAIN par empreinte et par process sur cet intervalle
+EXPLAIN_INTERVAL = 3600
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL normalisé : littéraux et paramètres remplacés par ?, listes IN réduites"""
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDERS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint_id(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def redact(params):
+    """Garde nombres, booléens et None ; les autres valeurs (emails, textes...) sont masquées"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact_value(value) for key, value in params.items()}
+    return [_redact_value(value) for value in params]
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__}:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def call_site():
+    """
+    Première frame du projet (fichier:ligne fonction) et champ de
+    serializer DRF en cours de sérialisation quand la requête vient d'une
+    relation chargée paresseusement.
+    """
+    root = str(settings.BASE_DIR)
+    here = os.path.dirname(__file__)
+    site = field = None
+    frame = sys._getframe(2)
+    while frame is not None and (site is None or field is None):
+        code = frame.f_code
+        filename = code.co_filename
+        if field is None and code.co_name == 'to_representation' and 'rest_framework' in filename:
+            serializer_field = frame.f_locals.get('field')
+            if serializer_field is not None and getattr(serializer_field, 'field_name', None):
+                field = f"{type(frame.f_locals.get('self')).__name__}.{serializer_field.field_name}"
+        if (site is None and filename.startswith(root) and not filename.startswith(here)
+                and 'site-packages' not in filename):
+            site = f"{os.path.relpath(filename, root)}:{frame.f_lineno} {code.co_name}"
+        frame = frame.f_back
+    return site, field
+
+
+class SlowQueryLog:
+    """
+    execute_wrapper installé sur chaque connexion (monitoring.apps) :
+    journalise les requêtes au-delà de MONITORING_SLOW_QUERY_MS, avec leur
+    empreinte, la route et le point d'appel, les paramètres masqués et le
+    plan d'exécution (une ligne JSON par requête dans
+    MONITORING_SLOW_QUERY_LOG, résumée par la commande slow_query_report).
+    """
+
+    def __init__(self, threshold_ms, path=None, explain=True):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._explained = {}
+        self._local = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self._local, 'active', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self._local.active = True
+                try:
+                    self.record(context['connection'], sql, params, many, duration)
+                except Exception:
+                    logger.exception("Échec de l'enregistrement d'une requête lente")
+                finally:
+                    self._local.active = False
+
+    def record(self, connection, sql, params, many, duration):
+        normalized = fingerprint(sql)
+        key = fingerprint_id(normalized)
+        site, field = call_site()
+        stats = current_request.get()
+        entry = {
+            'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'fingerprint': key,
+            'normalized': normalized,
+            'sql': sql,
+            'params': None if many else redact(params),
+            'database': connection.alias,
+            'route': stats.route if stats else None,
+            'call_site': site,
+            'serializer_field': field,
+            'plan': self.plan(connection, sql, params, key) if not many else None,
+        }
+        logger.warning("Requête lente (%.1f ms) %s [%s] %s", entry['duration_ms'], key, entry['route'] or site, normalized[:300])
+        if self.path:
+            line = json.dumps(entry, ensure_ascii=False, default=str)
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as log:
+                    log.write(line + '\n')
+
+    def plan(self, connection, sql, params, key):
+        if not self.explain or sql.split(None, 1)[0].upper() not in ('SELECT', 'WITH'):
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(key, -EXPLAIN_INTERVAL) < EXPLAIN_INTERVAL:
+                return None
+            self._explained[key] = now
+        return explain(connection, sql, params)
+
+
+def explain(connection, sql, params):
+    """
+    Plan de la requête (EXPLAIN QUERY PLAN sous SQLite, EXPLAIN ailleurs),
+    exécuté sans repasser par les execute_wrappers ; dans une transaction,
+    un savepoint protège la transaction en cours d'un échec de l'EXPLAIN.
+    """
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    savepoint = connection.savepoint() if connection.in_atomic_block else None
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    except Exception as exc:
+        if savepoint:
+            connection.savepoint_rollback(savepoint)
+        return f'EXPLAIN impossible : {exc}'
+    finally:
+        cursor.close()
+    if savepoint:
+        connection.savepoint_commit(savepoint)
+    if connection.vendor == 'sqlite':
+        return '\n'.join(row[-1] for row in rows)
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+slow_query_log = None
+
+
+def install(sender, connection, **kwargs):
+    """Receiver connection_created : ajoute le journal aux wrappers de la connexion"""
+    global slow_query_log
+    threshold = getattr(settings, 'MONITORING_SLOW_QUERY_MS', None)
+    if threshold is None:
+        return
+    if slow_query_log is None:
+        slow_query_log = SlowQueryLog(
+            threshold,
+            path=getattr(settings, 'MONITORING_SLOW_QUERY_LOG', None),
+            explain=getattr(settings, 'MONITORING_SLOW_QUERY_EXPLAIN', True),
+        )
+    if slow_query_log not in connection.execute_wrappers:
+        # en tête : la connexion peut s'ouvrir dans un execute_wrapper() en cours,
+        # qui retirera le dernier élément de la liste à sa sortie
+        connection.execute_wrappers.insert(0, slow_query_log)
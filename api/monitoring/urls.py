@@ -0,0 +1,13 @@
+# monitoring/urls.py
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import MetricsViewSet
+
+
+router = DefaultRouter()
+
+router.register(r'monitoring/metrics', MetricsViewSet, basename='metrics')
+
+urlpatterns = [
+    path('', include(router.urls))
+]
@@ -0,0 +1,20 @@
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from recruitment_process.permissions import IsStaffOrRH
+
+from .metrics import registry
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """Agrégats par route mesurés par RequestMetricsMiddleware (process courant)"""
+    permission_classes = [permissions.IsAuthenticated, IsStaffOrRH]
+    
+    def list(self, request):
+        return Response(registry.snapshot())
+    
+    @action(detail=False, methods=['post'])
+    def reset(self, request):
+        registry.reset()
+        return Response({'status': 'Métriques réinitialisées'})
@@ -4,3 +4,28 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'positions'
+    
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from api.fulltext import install_indexes
+        from api.http_cache import versions_receiver, watch_model
+        from recruitment_process.models import Application
+        from . import payloads, search, stats  # noqa: F401 (search : enregistre l'index)
+        from .models import Department, Position
+        from .signals import applications_advanced, applications_imported
+        
+        watch_model(Position)
+        watch_model(Department)
+        # les passages au stage suivant et les imports écrivent les candidatures en masse
+        applications_advanced.connect(
+            versions_receiver(Application), weak=False, dispatch_uid='http_cache_applications_advanced'
+        )
+        applications_imported.connect(
+            versions_receiver(Application), weak=False, dispatch_uid='http_cache_applications_imported'
+        )
+        payloads.connect_signals()
+        # table plein texte et triggers, hors migrations
+        post_migrate.connect(install_indexes, sender=self, dispatch_uid='fulltext_positions')
+        
+        if stats.counters_enabled():
+            stats.connect_signals()
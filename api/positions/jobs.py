@@ -0,0 +1,122 @@
+# positions/jobs.py
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from recruitment_process.stages import stage_registry
+
+from .models import StageTransitionJob
+from .transitions import advance_position, StageTransitionError, TransitionInProgressError
+
+
+def check_no_active_job(position):
+    if position.transition_jobs.filter(status__in=StageTransitionJob.ACTIVE_STATUSES).exists():
+        raise TransitionInProgressError("Un passage au stage suivant est déjà en cours pour cette position.")
+
+
+def enqueue_transition(position, author, global_comment=''):
+    """Met en file d'attente le passage au stage suivant d'une position"""
+    current_stage = stage_registry.get(position.current_stage_id)
+    if not current_stage:
+        raise StageTransitionError("Cette position n'a pas de stage courant.")
+    if not current_stage.next_stage():
+        raise StageTransitionError("Aucun stage suivant disponible.")
+
+    try:
+        with transaction.atomic():
+            check_no_active_job(position)
+            return StageTransitionJob.objects.create(
+                position=position,
+                requested_by=author,
+                global_comment=global_comment,
+                from_stage=current_stage,
+                total=position.applications.filter(is_active=True).count(),
+            )
+    except IntegrityError:
+        # la contrainte unique a tranché une course entre deux requêtes
+        raise TransitionInProgressError("Un passage au stage suivant est déjà en cours pour cette position.")
+
+
+def claim_next_job():
+    """
+    Réserve le plus ancien job en attente. Le verrou de ligne (SKIP LOCKED)
+    évite que deux workers se bloquent ; l'UPDATE conditionnel garantit
+    qu'un seul d'entre eux gagne sur les backends sans verrouillage de ligne.
+    """
+    with transaction.atomic():
+        job = (
+            StageTransitionJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=StageTransitionJob.STATUS_PENDING)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = StageTransitionJob.objects.filter(
+            pk=job.pk, status=StageTransitionJob.STATUS_PENDING
+        ).update(status=StageTransitionJob.STATUS_RUNNING, started_at=now, updated_at=now)
+        if not claimed:
+            return None
+
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job, chunk_size=500):
+    """
+    Exécute un job réservé. La progression est enregistrée dans la
+    transaction de chaque lot : un job remis en attente reprend avec les
+    rejets déjà validés et le total compté à la mise en file.
+    """
+    jobs = StageTransitionJob.objects.filter(pk=job.pk)
+
+    def on_progress(total, processed, approved, rejected):
+        jobs.update(
+            total=total,
+            processed=processed,
+            approved_count=approved,
+            rejected_count=rejected,
+            updated_at=timezone.now(),
+        )
+
+    def on_complete(result):
+        # dans la transaction du changement de stage : un job terminé n'est jamais remis en attente
+        now = timezone.now()
+        jobs.update(
+            status=StageTransitionJob.STATUS_DONE,
+            next_stage=result['next_stage'],
+            finished_at=now,
+            updated_at=now,
+        )
+
+    try:
+        advance_position(
+            job.position,
+            job.requested_by,
+            job.global_comment,
+            chunk_size=chunk_size,
+            on_progress=on_progress,
+            expected_stage=job.from_stage,
+            on_complete=on_complete,
+            total=job.total,
+            rejected_count=job.rejected_count,
+        )
+    except Exception as e:
+        now = timezone.now()
+        jobs.update(status=StageTransitionJob.STATUS_FAILED, error=str(e), finished_at=now, updated_at=now)
+
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs(stale_after):
+    """Remet en attente les jobs dont le worker ne donne plus signe de vie"""
+    limit = timezone.now() - timedelta(seconds=stale_after)
+    return StageTransitionJob.objects.filter(
+        status=StageTransitionJob.STATUS_RUNNING,
+        updated_at__lt=limit,
+    ).update(status=StageTransitionJob.STATUS_PENDING, updated_at=timezone.now())
@@ -0,0 +1,72 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from authentication.models import User
+from candidates.models import Candidate
+from positions.models import Department, Position
+from positions.transitions import advance_position
+from recruitment_process.models import Application, RecruitmentStage
+
+
+class Command(BaseCommand):
+    help = "Mesure le nombre de requêtes et le temps du passage au stage suivant selon le nombre de candidatures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 5000, 20000],
+                            help="Nombres de candidatures à tester")
+        parser.add_argument('--global-comment', default='Benchmark',
+                            help="Commentaire global (vide pour ne pas commenter les approuvées)")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'candidatures':>12} {'requêtes':>9} {'temps (ms)':>11}")
+        for size in options['sizes']:
+            queries, elapsed = self.run_once(size, options['global_comment'])
+            self.stdout.write(f"{size:>12} {queries:>9} {elapsed * 1000:>11.1f}")
+
+    def run_once(self, size, global_comment):
+        """Construit un jeu de données jetable, mesure le passage puis annule tout"""
+        with transaction.atomic():
+            position, author = self.seed(size)
+
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                advance_position(position, author, global_comment)
+                elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return len(ctx.captured_queries), elapsed
+
+    def seed(self, size):
+        stages = RecruitmentStage.objects.bulk_create([
+            RecruitmentStage(name='Benchmark 1', order=-2),
+            RecruitmentStage(name='Benchmark 2', order=-1),
+        ])
+        author = User.objects.create(email='benchmark.rh@example.invalid', first_name='Bench', last_name='RH', group='RH')
+        department = Department.objects.create(name='Benchmark')
+        today = timezone.now().date()
+        position = Position.objects.create(
+            title='Benchmark', department=department, subjects='-', level='-', workload=1,
+            contract_type='CDD', start_date=today + timedelta(days=30),
+            application_deadline=today + timedelta(days=15),
+            current_stage=stages[0], created_by=author,
+        )
+
+        User.objects.bulk_create([
+            User(email=f'benchmark.{i}@example.invalid', first_name='Cand', last_name=str(i))
+            for i in range(size)
+        ])
+        users = User.objects.filter(email__startswith='benchmark.', group='Candidat')
+        Candidate.objects.bulk_create([Candidate(user=user) for user in users])
+        candidates = Candidate.objects.filter(user__email__startswith='benchmark.')
+        Application.objects.bulk_create([
+            Application(candidate=candidate, position=position, is_approved_current_stage=i % 2 == 0)
+            for i, candidate in enumerate(candidates)
+        ])
+
+        return position, author
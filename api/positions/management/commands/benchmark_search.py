@@ -0,0 +1,117 @@
+import gc
+import math
+import statistics
+import time
+from functools import reduce
+from operator import and_, or_
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from positions.models import Position
+from positions.search import position_index
+from recruitment_process.benchmarking import rolled_back
+from recruitment_process.datasets import DatasetGenerator
+
+
+# recherches typiques : termes seuls, préfixes, sans accents, combinaisons
+QUERIES = [
+    'chimie', 'mécanique', 'electronique', 'statist', 'éco', 'python',
+    'droit doctorat', 'philosophie lycée', 'anglais master tutorat',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la recherche plein texte des positions (?q= de /api/positions/) sur un jeu de données généré, "
+        "comparée à un filtre icontains, et échoue au-delà du budget de latence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--positions', type=int, default=100000)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--limit', type=int, default=50, help="Taille de la page de résultats")
+        parser.add_argument('--queries', help="Recherches à mesurer, séparées par des virgules")
+        parser.add_argument('--budget-ms', type=float, default=10.0, help="Médiane maximale de la requête de recherche (page classée)")
+        parser.add_argument('--existing', action='store_true',
+                            help="Utiliser les positions de la base au lieu d'en générer")
+        parser.add_argument('--no-baseline', action='store_true', help="Ne pas mesurer le filtre icontains")
+
+    def handle(self, *args, **options):
+        queries = options['queries'].split(',') if options['queries'] else QUERIES
+        failures = []
+        with rolled_back():
+            if not options['existing']:
+                start = time.perf_counter()
+                DatasetGenerator(
+                    candidates=0, positions=options['positions'], apps_per_position=0,
+                    comments_per_application=0, prefix='bench-search', workers=1,
+                ).run()
+                self.stdout.write(f"{options['positions']} positions générées en {time.perf_counter() - start:.1f} s")
+            total = Position.objects.count()
+            self.stdout.write(f"{total} positions indexées ({connection.vendor})")
+            self.stdout.write(
+                f"{'recherche':<26} {'trouvées':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'total p50':>10} {'icontains p50':>14}"
+            )
+
+            for query in queries:
+                timings = self.measure(lambda: self.search(query, options['limit']), options)
+                count_timings = self.measure(lambda: self.count(query), options)
+                matches = self.count(query)
+                baseline = None
+                if not options['no_baseline']:
+                    # le filtre naïf parcourt toute la table : quelques mesures suffisent
+                    baseline = self.measure(lambda: self.naive(query, options['limit']), {'warmup': 1, 'iterations': 3})
+                p50, p95 = statistics.median(timings), percentile(timings, 95)
+                self.stdout.write(
+                    f"{query:<26} {matches:>8} {p50:>9.2f} {p95:>9.2f} {statistics.median(count_timings):>10.2f} "
+                    f"{statistics.median(baseline) if baseline else float('nan'):>14.2f}"
+                )
+                if p50 > options['budget_ms']:
+                    failures.append(f"{query!r} : p50={p50:.2f} ms (budget {options['budget_ms']} ms)")
+
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} recherche(s) au-delà du budget")
+        self.stdout.write(self.style.SUCCESS("Budget respecté"))
+
+    def search(self, query, limit):
+        """Page d'ids classés de PositionViewSet.list avec ?q= (seule requête en mode ?cursor=)"""
+        queryset = position_index.rank(position_index.search(Position.objects.all(), query), query)
+        return list(queryset.order_by('search_rank', '-created_at', '-id').values_list('id', flat=True)[:limit])
+
+    def count(self, query):
+        """Total de la pagination par offset"""
+        return position_index.search(Position.objects.all(), query).count()
+
+    def naive(self, query, limit):
+        terms = query.split()
+        condition = reduce(and_, (
+            reduce(or_, (Q(**{f'{column}__icontains': term}) for column in position_index.columns))
+            for term in terms
+        ))
+        return list(Position.objects.filter(condition).order_by('-created_at', '-id').values_list('id', flat=True)[:limit])
+
+    def measure(self, func, options):
+        timings = []
+        for iteration in range(options['warmup'] + options['iterations']):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            if iteration >= options['warmup']:
+                timings.append(elapsed * 1000)
+        return timings
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+    return ordered[index]
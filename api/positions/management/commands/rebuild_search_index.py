@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from api import fulltext
+
+
+class Command(BaseCommand):
+    help = (
+        "Recrée les tables plein texte et leurs triggers puis réindexe tout "
+        "(après un changement de colonnes indexées ou une écriture hors triggers)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help="Modèles à réindexer (app.Modele), tous par défaut")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(fulltext.indexes)
+        unknown = [label for label in labels if label not in fulltext.indexes]
+        if unknown:
+            raise CommandError(f"Aucun index plein texte pour : {', '.join(unknown)} "
+                               f"(disponibles : {', '.join(fulltext.indexes)})")
+
+        for label in labels:
+            index = fulltext.indexes[label]
+            index.install(options['database'], rebuild=True)
+            count = index.model._default_manager.using(options['database']).count()
+            self.stdout.write(self.style.SUCCESS(f"{index.table} : {count} ligne(s) de {label} réindexée(s)"))
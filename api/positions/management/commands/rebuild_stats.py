@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from positions import stats
+
+
+class Command(BaseCommand):
+    help = "Reconstruit (ou vérifie avec --verify) les compteurs matérialisés du dashboard RH"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help="Comparer les compteurs stockés au calcul exact sans rien modifier")
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = stats.verify_counters()
+            for name, position_id, stored, expected in mismatches:
+                scope = f"position {position_id}" if position_id else "global"
+                self.stdout.write(f"{name} ({scope}) : stocké={stored} attendu={expected}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} compteur(s) incohérent(s), relancer rebuild_stats")
+            self.stdout.write(self.style.SUCCESS("Compteurs cohérents"))
+            return
+
+        counters = stats.rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"{len(counters)} compteur(s) reconstruit(s)"))
+        if not stats.counters_enabled():
+            self.stdout.write("STATS_COUNTERS_ENABLED est désactivé : les compteurs ne seront pas maintenus")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from positions.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Exécute les passages au stage suivant mis en file d'attente (next_stage?async=1)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Vider la file d'attente puis s'arrêter")
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help="Délai entre deux scrutations d'une file vide (secondes)")
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Nombre de candidatures rejetées par transaction")
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help="Remettre en attente les jobs en cours sans progression depuis N secondes")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(options['stale_after'])
+        if requeued:
+            self.stdout.write(f"{requeued} job(s) bloqué(s) remis en attente")
+
+        try:
+            while True:
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                self.stdout.write(f"Job #{job.pk} : position {job.position_id}")
+                job = run_job(job, chunk_size=options['chunk_size'])
+                if job.status == job.STATUS_DONE:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Job #{job.pk} terminé : {job.approved_count} approuvée(s), {job.rejected_count} rejetée(s)"
+                    ))
+                else:
+                    self.stdout.write(self.style.ERROR(f"Job #{job.pk} échoué : {job.error}"))
+        except KeyboardInterrupt:
+            self.stdout.write("Arrêt du worker")
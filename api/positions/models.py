@@ -1,7 +1,8 @@
 from django.db import models
 from django.utils import timezone
 
-from recruitment_process.models import RecruitmentStage
+from api.fulltext import SearchDocumentField
+from recruitment_process.stages import stage_registry
 from authentication.models import User
 
 
@@ -50,11 +51,25 @@ class Position(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='position_created_id_idx'),
+            # filtres de PositionViewSet, chacun suivi de l'ordre de la liste
+            models.Index(fields=['status', 'created_at', 'id'], name='position_status_created_idx'),
+            models.Index(fields=['department', 'created_at', 'id'], name='position_dept_created_idx'),
+            models.Index(fields=['contract_type', 'created_at', 'id'], name='position_contract_created_idx'),
+            # open_positions
+            models.Index(
+                fields=['application_deadline'],
+                condition=models.Q(status='ouverte'),
+                name='position_open_deadline_idx',
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         # a la creation, definir le premier stage comme stage courant
-        if not self.pk and not self.current_stage:
-            first_stage = RecruitmentStage.objects.filter(is_active=True).order_by('order').first()
+        if not self.pk and not self.current_stage_id:
+            stage_registry.reload()
+            first_stage = stage_registry.first()
             if first_stage:
                 self.current_stage = first_stage
         super().save(*args, **kwargs)
@@ -66,4 +81,113 @@ class Position(models.Model):
         return self.status == 'ouverte' and self.application_deadline >= timezone.now().date()
     
     def applications_count(self):
-        return self.applications.count()
\ No newline at end of file
+        return self.applications.count()
+
+class StageTransition(models.Model):
+    """Historique des passages d'une position au stage suivant"""
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name='stage_transitions')
+    from_stage = models.ForeignKey("recruitment_process.RecruitmentStage", on_delete=models.SET_NULL, null=True, related_name='+')
+    to_stage = models.ForeignKey("recruitment_process.RecruitmentStage", on_delete=models.SET_NULL, null=True, related_name='+')
+    approved_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    performed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"{self.position} : {self.from_stage} -> {self.to_stage}"
+
+class StageTransitionJob(models.Model):
+    """Passage au stage suivant exécuté en tâche de fond par run_transition_worker"""
+    STATUS_PENDING = 'en_attente'
+    STATUS_RUNNING = 'en_cours'
+    STATUS_DONE = 'terminee'
+    STATUS_FAILED = 'echouee'
+    
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminée'),
+        (STATUS_FAILED, 'Échouée'),
+    )
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+    
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name='transition_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='transition_jobs')
+    global_comment = models.TextField(blank=True)
+    # stage de la position à la mise en file : un job rejoué ne fait pas avancer la position deux fois
+    from_stage = models.ForeignKey("recruitment_process.RecruitmentStage", on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    next_stage = models.ForeignKey("recruitment_process.RecruitmentStage", on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # un seul passage en attente ou en cours par position
+            models.UniqueConstraint(
+                fields=['position'],
+                condition=models.Q(status__in=['en_attente', 'en_cours']),
+                name='unique_active_transition_job_per_position',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Passage #{self.pk} - {self.position} ({self.status})"
+    
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class StatsCounter(models.Model):
+    """
+    Compteur agrégé du dashboard RH, maintenu de façon incrémentale par les
+    signaux de positions/stats.py (position nulle pour les compteurs globaux).
+    """
+    name = models.CharField(max_length=50)
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, null=True, blank=True, related_name='stats_counters')
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name'],
+                condition=models.Q(position__isnull=True),
+                name='unique_global_stats_counter',
+            ),
+            models.UniqueConstraint(
+                fields=['name', 'position'],
+                condition=models.Q(position__isnull=False),
+                name='unique_position_stats_counter',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.position_id or 'global'}) = {self.value}"
+
+
+class PositionSearchEntry(models.Model):
+    """
+    Ligne de l'index plein texte des positions (positions/search.py) : table
+    FTS5 sous SQLite, tsvector sous PostgreSQL, créée et tenue à jour par
+    api.fulltext, hors migrations.
+    """
+    position = models.OneToOneField(
+        Position, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_entry',
+    )
+    document = SearchDocumentField()
+    
+    class Meta:
+        managed = False
+        db_table = 'positions_position_fts'
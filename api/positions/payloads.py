@@ -0,0 +1,82 @@
+# positions/payloads.py
+from api.payload_cache import PayloadCache
+
+
+# les deux sérialisations dépendent de la date du jour (is_open, compteurs "ouverts")
+position_payloads = PayloadCache('positions:position', daily=True)
+department_payloads = PayloadCache('positions:department', daily=True)
+
+
+def position_list_payloads(pks):
+    """Fragments PositionSerializer ; les manquants sont lus par PositionValuesSerializer"""
+    from .models import Position
+    from .serializers import PositionValuesSerializer
+
+    def load(missing):
+        reader = PositionValuesSerializer()
+        return {row['id']: reader.to_representation(row) for row in reader.values(Position.objects.filter(pk__in=missing))}
+
+    return position_payloads.get_many(pks, load)
+
+
+def department_list_payloads(pks, queryset):
+    from .serializers import DepartmentSerializer
+
+    def load(missing):
+        return {department.pk: dict(DepartmentSerializer(department).data) for department in queryset.filter(pk__in=missing)}
+
+    return department_payloads.get_many(pks, load)
+
+
+def position_changed(sender, instance, **kwargs):
+    position_payloads.invalidate(instance.pk)
+    # compteurs du département (l'ancien département n'est pas connu)
+    department_payloads.invalidate_all()
+
+
+def department_changed(sender, instance, **kwargs):
+    department_payloads.invalidate(instance.pk)
+    position_payloads.invalidate_all()  # department_name
+
+
+def application_changed(sender, instance, **kwargs):
+    position_payloads.invalidate(instance.position_id)  # applications_count
+    department_payloads.invalidate_all()
+
+
+def user_changed(sender, instance, created=False, **kwargs):
+    # created_by_name et head_name ; un nouvel utilisateur n'apparaît encore nulle part
+    if not created:
+        position_payloads.invalidate_all()
+        department_payloads.invalidate_all()
+
+
+def applications_advanced_handler(sender, position, **kwargs):
+    position_payloads.invalidate(position.pk)
+    department_payloads.invalidate(position.department_id)
+
+
+def applications_imported_handler(sender, counts, **kwargs):
+    position_payloads.invalidate(*counts)
+    department_payloads.invalidate_all()
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+    from authentication.models import User
+    from recruitment_process.models import Application
+    from .models import Department, Position
+    from .signals import applications_advanced, applications_imported
+
+    for model, receiver in (
+        (Position, position_changed),
+        (Department, department_changed),
+        (Application, application_changed),
+        (User, user_changed),
+    ):
+        uid = f'payloads_{model._meta.label_lower}'
+        post_save.connect(receiver, sender=model, dispatch_uid=f'{uid}_save')
+        post_delete.connect(receiver, sender=model, dispatch_uid=f'{uid}_delete')
+
+    applications_advanced.connect(applications_advanced_handler, dispatch_uid='payloads_applications_advanced')
+    applications_imported.connect(applications_imported_handler, dispatch_uid='payloads_applications_imported')
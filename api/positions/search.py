@@ -0,0 +1,12 @@
+# positions/search.py
+from api.fulltext import FullTextIndex, register
+
+
+# ?q= de PositionViewSet : le titre pèse le plus, puis les matières et le niveau
+position_index = register(FullTextIndex('positions.Position', [
+    ('title', 'A'),
+    ('subjects', 'B'),
+    ('level', 'C'),
+    ('description', 'D'),
+    ('requirements', 'D'),
+]))
@@ -1,9 +1,13 @@
 # positions/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.utils import timezone
 
-from .models import Department, Position
+from api.fast_serializers import MISSING, ValuesSerializer
+from recruitment_process.serializers import full_name
+
+from .models import Department, Position, StageTransitionJob
 
 
 User = get_user_model()
@@ -34,6 +38,23 @@ class PositionSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at', 'created_by']
 
 
+class PositionValuesSerializer(ValuesSerializer):
+    """Lecture rapide (.values()) de PositionSerializer, même JSON"""
+    serializer_class = PositionSerializer
+    columns = {
+        'department_name': 'department__name',
+        'created_by_name': full_name('created_by__'),
+        'applications_count': Count('applications'),
+    }
+    
+    def get_created_by_name(self, row):
+        return row['created_by_name'].strip() if row['created_by_name'] is not None else MISSING
+    
+    def get_is_open(self, row):
+        # Position.is_open, sur les colonnes déjà lues
+        return row['status'] == 'ouverte' and row['application_deadline'] >= timezone.now().date()
+
+
 class PositionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Position
@@ -57,4 +78,18 @@ class BulkStageUpdateSerializer(serializers.Serializer):
         required=False, 
         allow_blank=True, 
         help_text="Commentaire global appliqué aux candidatures approuvées"
-    )
\ No newline at end of file
+    )
+
+
+class StageTransitionJobSerializer(serializers.ModelSerializer):
+    """Progression d'un passage au stage suivant exécuté en tâche de fond"""
+    next_stage_name = serializers.CharField(source='next_stage.name', read_only=True, default=None)
+    
+    class Meta:
+        model = StageTransitionJob
+        fields = [
+            'id', 'position', 'status', 'total', 'processed',
+            'approved_count', 'rejected_count', 'next_stage', 'next_stage_name',
+            'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,13 @@
+# positions/signals.py
+from django.dispatch import Signal
+
+
+# Envoyé par positions.transitions dans la transaction de chaque lot de
+# candidatures traité par UPDATE ensembliste (post_save n'est pas émis).
+# Arguments : position, stage, approved_count, rejected_count
+applications_advanced = Signal()
+
+# Envoyé par candidates.imports dans la transaction de chaque lot importé
+# par bulk_create (post_save n'est pas émis).
+# Arguments : counts, {position_id: nombre de candidatures créées}
+applications_imported = Signal()
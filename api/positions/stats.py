@@ -0,0 +1,268 @@
+# positions/stats.py
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.signals import post_delete, post_init, post_save
+
+from recruitment_process.models import Application
+
+from .models import Position, StatsCounter
+from .signals import applications_advanced, applications_imported
+
+
+DASHBOARD_COUNTERS = [
+    'total_positions', 'open_positions', 'total_applications',
+    'active_applications', 'rejected_applications',
+]
+POSITION_COUNTERS = [
+    'total_applications', 'active_applications', 'approved_applications', 'rejected_applications',
+]
+
+
+def counters_enabled():
+    return getattr(settings, 'STATS_COUNTERS_ENABLED', False)
+
+
+# --- Calcul exact (une requête d'agrégation conditionnelle par endpoint) ---
+
+def compute_dashboard():
+    # les candidatures ont toujours une position : la jointure compte chacune une fois
+    return Position.objects.aggregate(
+        total_positions=Count('id', distinct=True),
+        open_positions=Count('id', filter=Q(status='ouverte'), distinct=True),
+        total_applications=Count('applications'),
+        active_applications=Count('applications', filter=Q(applications__is_active=True)),
+        rejected_applications=Count('applications', filter=Q(applications__is_active=False)),
+    )
+
+
+def position_aggregates():
+    return dict(
+        total_applications=Count('id'),
+        active_applications=Count('id', filter=Q(is_active=True)),
+        approved_applications=Count('id', filter=Q(is_active=True, is_approved_current_stage=True)),
+        rejected_applications=Count('id', filter=Q(is_active=False)),
+    )
+
+
+def compute_position_stats(position):
+    return Application.objects.filter(position=position).aggregate(**position_aggregates())
+
+
+# --- Lecture : compteurs matérialisés si activés, calcul exact sinon ---
+
+def get_dashboard():
+    if counters_enabled():
+        values = _read_counters(DASHBOARD_COUNTERS, position=None)
+        if values is not None:
+            return values
+    return compute_dashboard()
+
+
+def get_position_stats(position):
+    if counters_enabled():
+        values = _read_counters(POSITION_COUNTERS, position=position)
+        if values is not None:
+            return values
+    return compute_position_stats(position)
+
+
+def _read_counters(names, position):
+    rows = dict(
+        StatsCounter.objects
+        .filter(name__in=names, position=position)
+        .values_list('name', 'value')
+    )
+    # compteurs absents (pas encore reconstruits) : repli sur le calcul exact
+    if len(rows) != len(names):
+        return None
+    return {name: rows[name] for name in names}
+
+
+# --- Mise à jour incrémentale ---
+
+def bump(deltas):
+    """
+    Applique des deltas {(nom, position_id ou None): delta} en un seul UPDATE.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    match = Q()
+    whens = []
+    for (name, position_id), delta in deltas.items():
+        condition = Q(name=name, position_id=position_id) if position_id else Q(name=name, position__isnull=True)
+        match |= condition
+        whens.append(When(condition, then=Value(delta)))
+
+    StatsCounter.objects.filter(match).update(value=F('value') + Case(*whens, default=Value(0)))
+
+
+def _application_state(instance):
+    if instance.get_deferred_fields() & {'is_active', 'is_approved_current_stage', 'position_id'}:
+        return None
+    return (instance.position_id, instance.is_active, instance.is_approved_current_stage)
+
+
+def _application_deltas(state, sign, deltas):
+    position_id, is_active, is_approved = state
+    contributions = {
+        'total_applications': 1,
+        'active_applications': int(is_active),
+        'rejected_applications': int(not is_active),
+    }
+    for name, value in contributions.items():
+        deltas[(name, None)] = deltas.get((name, None), 0) + sign * value
+
+    contributions['approved_applications'] = int(is_active and is_approved)
+    for name, value in contributions.items():
+        deltas[(name, position_id)] = deltas.get((name, position_id), 0) + sign * value
+
+
+def _position_state(instance):
+    if 'status' in instance.get_deferred_fields():
+        return None
+    return (instance.status,)
+
+
+def _position_deltas(state, sign, deltas):
+    status, = state
+    deltas[('total_positions', None)] = deltas.get(('total_positions', None), 0) + sign
+    deltas[('open_positions', None)] = deltas.get(('open_positions', None), 0) + sign * int(status == 'ouverte')
+
+
+def track_application(sender, instance, **kwargs):
+    instance._stats_state = _application_state(instance) if instance.pk else None
+
+
+def application_saved(sender, instance, created, **kwargs):
+    old_state = getattr(instance, '_stats_state', None)
+    new_state = _application_state(instance)
+    if new_state is None or (not created and old_state is None):
+        return
+
+    deltas = {}
+    if old_state is not None:
+        _application_deltas(old_state, -1, deltas)
+    _application_deltas(new_state, 1, deltas)
+    bump(deltas)
+    instance._stats_state = new_state
+
+
+def application_deleted(sender, instance, **kwargs):
+    state = getattr(instance, '_stats_state', None) or _application_state(instance)
+    if state is not None:
+        deltas = {}
+        _application_deltas(state, -1, deltas)
+        bump(deltas)
+
+
+def track_position(sender, instance, **kwargs):
+    instance._stats_state = _position_state(instance) if instance.pk else None
+
+
+def position_saved(sender, instance, created, **kwargs):
+    old_state = getattr(instance, '_stats_state', None)
+    new_state = _position_state(instance)
+    if new_state is None or (not created and old_state is None):
+        return
+
+    if created:
+        # une nouvelle position n'a aucune candidature
+        StatsCounter.objects.bulk_create([
+            StatsCounter(name=name, position=instance) for name in POSITION_COUNTERS
+        ])
+
+    deltas = {}
+    if old_state is not None:
+        _position_deltas(old_state, -1, deltas)
+    _position_deltas(new_state, 1, deltas)
+    bump(deltas)
+    instance._stats_state = new_state
+
+
+def position_deleted(sender, instance, **kwargs):
+    state = getattr(instance, '_stats_state', None) or _position_state(instance)
+    if state is not None:
+        deltas = {}
+        _position_deltas(state, -1, deltas)
+        bump(deltas)
+
+
+def applications_advanced_handler(sender, position, approved_count, rejected_count, **kwargs):
+    # rejetées : actives -> rejetées ; approuvées : remises en attente
+    bump({
+        ('active_applications', None): -rejected_count,
+        ('rejected_applications', None): rejected_count,
+        ('active_applications', position.pk): -rejected_count,
+        ('rejected_applications', position.pk): rejected_count,
+        ('approved_applications', position.pk): -approved_count,
+    })
+
+
+def applications_imported_handler(sender, counts, **kwargs):
+    # candidatures importées : actives, en attente
+    deltas = {}
+    for position_id, count in counts.items():
+        for key in (('total_applications', None), ('active_applications', None)):
+            deltas[key] = deltas.get(key, 0) + count
+        deltas[('total_applications', position_id)] = count
+        deltas[('active_applications', position_id)] = count
+    bump(deltas)
+
+
+def connect_signals():
+    post_init.connect(track_application, sender=Application, dispatch_uid='stats_track_application')
+    post_save.connect(application_saved, sender=Application, dispatch_uid='stats_application_saved')
+    post_delete.connect(application_deleted, sender=Application, dispatch_uid='stats_application_deleted')
+    post_init.connect(track_position, sender=Position, dispatch_uid='stats_track_position')
+    post_save.connect(position_saved, sender=Position, dispatch_uid='stats_position_saved')
+    post_delete.connect(position_deleted, sender=Position, dispatch_uid='stats_position_deleted')
+    applications_advanced.connect(applications_advanced_handler, dispatch_uid='stats_applications_advanced')
+    applications_imported.connect(applications_imported_handler, dispatch_uid='stats_applications_imported')
+
+
+# --- Reconstruction ---
+
+def compute_all_counters():
+    """Retourne {(nom, position_id ou None): valeur} calculé depuis les tables"""
+    counters = {(name, None): value for name, value in compute_dashboard().items()}
+
+    rows = Application.objects.values('position_id').annotate(**position_aggregates()).order_by()
+    per_position = {row['position_id']: row for row in rows}
+    for position_id in Position.objects.values_list('id', flat=True):
+        row = per_position.get(position_id, {})
+        for name in POSITION_COUNTERS:
+            counters[(name, position_id)] = row.get(name, 0)
+
+    return counters
+
+
+def rebuild_counters():
+    with transaction.atomic():
+        counters = compute_all_counters()
+        StatsCounter.objects.all().delete()
+        StatsCounter.objects.bulk_create([
+            StatsCounter(name=name, position_id=position_id, value=value)
+            for (name, position_id), value in counters.items()
+        ], batch_size=1000)
+    return counters
+
+
+def verify_counters():
+    """Retourne la liste des écarts (nom, position_id, stocké, attendu)"""
+    expected = compute_all_counters()
+    stored = {
+        (name, position_id): value
+        for name, position_id, value in StatsCounter.objects.values_list('name', 'position_id', 'value')
+    }
+    return [
+        (name, position_id, stored.get((name, position_id)), value)
+        for (name, position_id), value in expected.items()
+        if stored.get((name, position_id)) != value
+    ] + [
+        (name, position_id, value, None)
+        for (name, position_id), value in stored.items()
+        if (name, position_id) not in expected
+    ]
@@ -0,0 +1,195 @@
+# positions/transitions.py
+from django.db import transaction
+from django.utils import timezone
+
+from recruitment_process.models import Application, Comment
+from recruitment_process.stages import stage_registry
+
+from .models import Position, StageTransition
+from .signals import applications_advanced
+
+
+REJECTION_REASON = "Non approuvée lors du passage au stage suivant"
+REJECTION_COMMENT = "Candidature automatiquement rejetée lors du passage au stage suivant"
+APPROVAL_COMMENT = "[Passage au stage suivant] {}"
+
+
+class StageTransitionError(Exception):
+    """Erreur métier empêchant le passage d'une position au stage suivant"""
+
+
+class TransitionInProgressError(StageTransitionError):
+    """Un passage au stage suivant est déjà en attente ou en cours pour cette position"""
+
+
+def advance_position(position, author, global_comment='', chunk_size=None, on_progress=None,
+                     expected_stage=None, on_complete=None, total=None, rejected_count=0):
+    """
+    Passe toutes les candidatures actives d'une position au stage suivant.
+
+    Les candidatures non approuvées sont rejetées et les approuvées remises
+    en attente avec deux UPDATE ensemblistes ; les commentaires d'audit sont
+    écrits en bulk_create. Le nombre de requêtes ne dépend donc pas du nombre
+    de candidatures.
+
+    Avec `chunk_size`, les rejets sont validés par lots de transactions
+    courtes et `on_progress(total=, processed=, approved=, rejected=)` est
+    appelé dans la transaction de chaque lot, ce qui permet d'enregistrer
+    la progression avec les rejets. Le passage reste rejouable après une
+    interruption : seules les approuvées et le stage de la position sont
+    traités dans la dernière transaction. Une reprise repart du `total`
+    et du `rejected_count` enregistrés, qui comptent les rejets déjà validés.
+
+    `expected_stage` (stage de départ connu à la mise en file) fait échouer
+    un passage rejoué alors que la position a déjà avancé ; `on_complete(result)`
+    est appelé dans la transaction qui change le stage de la position.
+    """
+    if chunk_size:
+        return _advance_in_chunks(position, author, global_comment, chunk_size, on_progress,
+                                  expected_stage, on_complete, total, rejected_count)
+
+    with transaction.atomic():
+        position, current_stage, next_stage = _lock_position(position, expected_stage=expected_stage)
+
+        active_applications = Application.objects.filter(position=position, is_active=True)
+        rows = list(active_applications.select_for_update().values_list('id', 'is_approved_current_stage'))
+        approved_ids = [pk for pk, is_approved in rows if is_approved]
+        rejected_ids = [pk for pk, is_approved in rows if not is_approved]
+
+        # les rejets d'abord : une fois remises à False, les approuvées seraient rejetées
+        _reject(active_applications.filter(is_approved_current_stage=False), rejected_ids, current_stage, author)
+        _promote(active_applications.filter(is_approved_current_stage=True), approved_ids, author, global_comment)
+        _move_position(position, current_stage, next_stage, author, len(approved_ids), len(rejected_ids))
+        _notify(position, current_stage, len(approved_ids), len(rejected_ids))
+        result = _result(position, current_stage, next_stage, len(approved_ids), len(rejected_ids))
+        if on_complete:
+            on_complete(result)
+
+    return result
+
+
+def _advance_in_chunks(position, author, global_comment, chunk_size, on_progress, expected_stage, on_complete,
+                       total, rejected_count):
+    with transaction.atomic():
+        position, current_stage, next_stage = _lock_position(position, expected_stage=expected_stage)
+        if total is None:
+            total = Application.objects.filter(position=position, is_active=True).count()
+
+    def report(approved_count):
+        if on_progress:
+            on_progress(
+                total=total,
+                processed=approved_count + rejected_count,
+                approved=approved_count,
+                rejected=rejected_count,
+            )
+
+    while True:
+        with transaction.atomic():
+            _lock_position(position, expected_stage=current_stage)
+            pending = Application.objects.filter(
+                position=position, is_active=True, is_approved_current_stage=False
+            )
+            ids = list(pending.select_for_update().values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            _reject(pending.filter(id__in=ids), ids, current_stage, author)
+            _notify(position, current_stage, 0, len(ids))
+            rejected_count += len(ids)
+            report(0)
+
+    with transaction.atomic():
+        position, _, _ = _lock_position(position, expected_stage=current_stage)
+        approved = Application.objects.filter(
+            position=position, is_active=True, is_approved_current_stage=True
+        )
+        approved_ids = list(approved.select_for_update().values_list('id', flat=True))
+        _promote(approved, approved_ids, author, global_comment)
+        _move_position(position, current_stage, next_stage, author, len(approved_ids), rejected_count)
+        _notify(position, current_stage, len(approved_ids), 0)
+        result = _result(position, current_stage, next_stage, len(approved_ids), rejected_count)
+        report(len(approved_ids))
+        if on_complete:
+            on_complete(result)
+
+    return result
+
+
+def _lock_position(position, expected_stage=None):
+    """Verrouille la position et retourne (position, stage courant, stage suivant)"""
+    position = Position.objects.select_for_update().get(pk=position.pk)
+
+    # liste lue en base : un stage désactivé sur un autre worker n'est jamais choisi
+    stage_registry.reload()
+    current_stage = stage_registry.get(position.current_stage_id)
+    if not current_stage:
+        raise StageTransitionError("Cette position n'a pas de stage courant.")
+    if expected_stage is not None and current_stage.pk != expected_stage.pk:
+        raise StageTransitionError("Le stage de la position a changé pendant le passage.")
+
+    next_stage = current_stage.next_stage()
+    if not next_stage:
+        raise StageTransitionError("Aucun stage suivant disponible.")
+
+    return position, current_stage, next_stage
+
+
+def _reject(applications, ids, current_stage, author):
+    now = timezone.now()
+    applications.update(
+        is_active=False,
+        rejection_reason=REJECTION_REASON,
+        rejection_stage=current_stage,
+        rejected_at=now,
+        updated_at=now,
+    )
+    Comment.objects.bulk_create([
+        Comment(application_id=pk, author=author, content=REJECTION_COMMENT)
+        for pk in ids
+    ])
+
+
+def _promote(applications, ids, author, global_comment):
+    applications.update(
+        is_approved_current_stage=False,  # Réinitialiser pour le nouveau stage
+        updated_at=timezone.now(),
+    )
+    if global_comment:
+        content = APPROVAL_COMMENT.format(global_comment)
+        Comment.objects.bulk_create([
+            Comment(application_id=pk, author=author, content=content)
+            for pk in ids
+        ])
+
+
+def _move_position(position, current_stage, next_stage, author, approved_count, rejected_count):
+    position.current_stage = next_stage
+    position.save(update_fields=['current_stage', 'updated_at'])
+    StageTransition.objects.create(
+        position=position,
+        from_stage=current_stage,
+        to_stage=next_stage,
+        approved_count=approved_count,
+        rejected_count=rejected_count,
+        performed_by=author,
+    )
+
+
+def _notify(position, stage, approved_count, rejected_count):
+    applications_advanced.send(
+        sender=Position,
+        position=position,
+        stage=stage,
+        approved_count=approved_count,
+        rejected_count=rejected_count,
+    )
+
+
+def _result(position, current_stage, next_stage, approved_count, rejected_count):
+    return {
+        'position': position,
+        'previous_stage': current_stage,
+        'next_stage': next_stage,
+        'approved_count': approved_count,
+        'rejected_count': rejected_count,
+    }
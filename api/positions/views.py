@@ -1,17 +1,29 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import transaction
+from rest_framework.reverse import reverse
 from django.db.models import Count, Q
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
+from api.http_cache import cached_response
+from authentication.models import User
 from recruitment_process.models import Application
+from recruitment_process.permissions import IsStaffOrRH
 
 from .models import Department, Position
-from .serializers import DepartmentSerializer, PositionSerializer, PositionCreateSerializer, BulkStageUpdateSerializer
+from .serializers import (
+    DepartmentSerializer, PositionSerializer, PositionCreateSerializer,
+    BulkStageUpdateSerializer, StageTransitionJobSerializer,
+)
+from .transitions import advance_position, StageTransitionError, TransitionInProgressError
+from .jobs import check_no_active_job, enqueue_transition
+from .payloads import department_list_payloads, department_payloads, position_list_payloads, position_payloads
+from .search import position_index
+from .stats import get_dashboard, get_position_stats
 
-from recruitment_process.serializers import ApplicationListSerializer, RecruitmentStageSerializer
-from recruitment_process.models import Comment
+from recruitment_process.serializers import ApplicationListValuesSerializer, RecruitmentStageSerializer
+from recruitment_process.stages import stage_registry
 
 
 class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
@@ -40,24 +52,24 @@ class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
             )
         ).order_by('name')
         
-        return queryset
+        # head_name : prefetch plutôt que select_related, qui alourdirait le GROUP BY des comptages
+        return queryset.prefetch_related('head')
+    
+    def list(self, request, *args, **kwargs):
+        # liste d'ids fraîche, données assemblées depuis le cache des fragments
+        rows = self.paginate_queryset(Department.objects.order_by('name').values('id', 'name'))
+        data = department_list_payloads([row['id'] for row in rows], self.get_queryset())
+        return self.get_paginated_response(data)
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsStaffOrRH])
+    def cache_stats(self, request):
+        """Succès/échecs du cache des fragments sérialisés (process courant)"""
+        return Response([position_payloads.stats(), department_payloads.stats()])
     
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
         """Statistiques globales RH"""
-        total_positions = Position.objects.count()
-        open_positions = Position.objects.filter(status='ouverte').count()
-        total_applications = Application.objects.count()
-        active_applications = Application.objects.filter(is_active=True).count()
-        rejected_applications = Application.objects.filter(is_active=False).count()
-        
-        return Response({
-            "total_positions": total_positions,
-            "open_positions": open_positions,
-            "total_applications": total_applications,
-            "active_applications": active_applications,
-            "rejected_applications": rejected_applications
-        })
+        return Response(get_dashboard())
 
 
 class PositionViewSet(viewsets.ModelViewSet):
@@ -65,14 +77,19 @@ class PositionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
-        queryset = Position.objects.select_related('department', 'created_by').annotate(
+        return self.filter_positions(self.base_queryset())
+    
+    def base_queryset(self):
+        return Position.objects.select_related('department', 'created_by').annotate(
             applications_count=Count('applications')
         )
-        
+    
+    def filter_positions(self, queryset, search=True):
         # Filtres
         status = self.request.query_params.get('status')
         department = self.request.query_params.get('department')
         contract_type = self.request.query_params.get('contract_type')
+        query = self.request.query_params.get('q')
         
         if status:
             queryset = queryset.filter(status=status)
@@ -81,7 +98,29 @@ class PositionViewSet(viewsets.ModelViewSet):
         if contract_type:
             queryset = queryset.filter(contract_type=contract_type)
         
-        return queryset
+        # en dernier : les correspondances retenues sont prises parmi les positions filtrées
+        if query and search:
+            queryset = position_index.search(queryset, query)
+        
+        return queryset.order_by('-created_at', '-id')
+    
+    @cached_response(Position, Department, User, Application, daily=True)
+    def list(self, request, *args, **kwargs):
+        # liste d'ids fraîche, données assemblées depuis le cache des fragments
+        queryset = self.filter_positions(Position.objects.all(), search=False)
+        query = request.query_params.get('q')
+        if query:
+            truncated = position_index.truncated(queryset, query)
+            queryset = position_index.search(queryset, query)
+            # les plus pertinentes d'abord ; search_rank sert aussi au curseur keyset
+            queryset = position_index.rank(queryset, query).order_by('search_rank', '-created_at', '-id')
+        rows = self.paginate_queryset(queryset.values('id', 'created_at', *queryset.query.annotations))
+        data = position_list_payloads([row['id'] for row in rows])
+        response = self.get_paginated_response(data)
+        if query:
+            # seules les FULLTEXT_MAX_RESULTS correspondances les plus récentes sont classées
+            response.data['truncated'] = truncated
+        return response
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -108,26 +147,41 @@ class PositionViewSet(viewsets.ModelViewSet):
     def applications(self, request, pk=None):
         """Lister les candidatures d'une position (paginated)"""
         position = self.get_object()
-        applications = position.applications.select_related(
-            'candidate__user', 
-            'position__current_stage'
-        ).prefetch_related('comments').order_by('-applied_at')
-
+        applications = position.applications.order_by('-applied_at', '-id')
         
-        page = self.paginate_queryset(applications)
-        serializer = ApplicationListSerializer(page, many=True, context={"request": request})
-        return self.get_paginated_response(serializer.data)
-    
+        # colonnes utiles seulement, même JSON qu'ApplicationListSerializer
+        reader = ApplicationListValuesSerializer()
+        page = self.paginate_queryset(reader.values(applications))
+        return self.get_paginated_response(reader.serialize(page))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsStaffOrRH])
+    def shortlist(self, request, pk=None):
+        """Candidats les plus proches de la position (?scope=applicants|pool, ?limit=)"""
+        from recruitment_process.matching import shortlist
+
+        position = self.get_object()
+        scope = request.query_params.get('scope', 'applicants')
+        if scope not in ('applicants', 'pool'):
+            return Response({'error': 'scope doit valoir applicants ou pool.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            return Response({'error': 'limit doit être un entier entre 1 et 100.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(shortlist(position, scope, limit))
+
     @action(detail=False, methods=['get'])
+    @cached_response(Position, Department, User, Application, daily=True)
     def open_positions(self, request):
         """Liste des positions ouvertes"""
         open_positions = Position.objects.filter(
             status='ouverte',
             application_deadline__gte=timezone.now().date()
-        ).select_related('department')
+        ).order_by('-created_at', '-id').values_list('id', flat=True)
         
-        serializer = self.get_serializer(open_positions, many=True)
-        return Response(serializer.data)
+        return Response(position_list_payloads(list(open_positions)))
         
     @action(detail=True, methods=['post'])
     def next_stage(self, request, pk=None):
@@ -138,93 +192,75 @@ class PositionViewSet(viewsets.ModelViewSet):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+        global_comment = serializer.validated_data.get('global_comment', '')
+        
+        # mode asynchrone : le passage est exécuté par run_transition_worker
+        if request.query_params.get('async') in ('1', 'true'):
+            try:
+                job = enqueue_transition(position, request.user, global_comment)
+            except TransitionInProgressError as e:
+                return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+            except StageTransitionError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            return Response({
+                'job_id': job.id,
+                'status': job.status,
+                'progress_url': reverse(
+                    'position-transition-job',
+                    kwargs={'pk': position.pk, 'job_id': job.id},
+                    request=request
+                ),
+            }, status=status.HTTP_202_ACCEPTED)
+        
         try:
-            with transaction.atomic():
-                current_stage = position.current_stage
-                if not current_stage:
-                    return Response(
-                        {'error': 'Cette position n\'a pas de stage courant.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                next_stage = current_stage.next_stage()
-                if not next_stage:
-                    return Response(
-                        {'error': 'Aucun stage suivant disponible.'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                # Récupérer les candidatures actives de cette position
-                active_applications = position.applications.filter(is_active=True)
-                
-                approved_count = 0
-                rejected_count = 0
-                
-                for application in active_applications:
-                    if application.is_approved_current_stage:
-                        # Candidature approuvée - elle passe au stage suivant
-                        application.is_approved_current_stage = False  # Réinitialiser pour le nouveau stage
-                        application.save()
-                        approved_count += 1
-                        
-                        # Pour un passage au stage suivant
-                        if serializer.validated_data.get('global_comment'):
-                            Comment.objects.create(
-                                application=application,
-                                author=request.user,
-                                content=f"[Passage au stage suivant] {serializer.validated_data['global_comment']}"
-                            )
-                    else:
-                        # Candidature non approuvée - rejet automatique
-                        application.is_active = False
-                        application.rejection_reason = "Non approuvée lors du passage au stage suivant"
-                        application.rejection_stage = current_stage
-                        application.save()
-                        rejected_count += 1
-                        
-                        Comment.objects.create(
-                            application=application,
-                            author=request.user,
-                            content="Candidature automatiquement rejetée lors du passage au stage suivant"
-                        )
-                
-                
-                # Mettre à jour le stage de la position
-                position.current_stage = next_stage
-                position.save()
-                
-                return Response({
-                    'message': f'{approved_count} candidature(s) passée(s) au stage suivant, {rejected_count} rejetée(s).',
-                    'next_stage': RecruitmentStageSerializer(next_stage).data,
-                    'approved_count': approved_count,
-                    'rejected_count': rejected_count
-                })
-                
+            check_no_active_job(position)
+            result = advance_position(position, request.user, global_comment)
+        except TransitionInProgressError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        except StageTransitionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        approved_count = result['approved_count']
+        rejected_count = result['rejected_count']
+        
+        return Response({
+            'message': f'{approved_count} candidature(s) passée(s) au stage suivant, {rejected_count} rejetée(s).',
+            'next_stage': RecruitmentStageSerializer(result['next_stage']).data,
+            'approved_count': approved_count,
+            'rejected_count': rejected_count
+        })
+    
+    @action(detail=True, methods=['get'], url_path=r'transition_jobs/(?P<job_id>[0-9]+)', url_name='transition-job')
+    def transition_job(self, request, pk=None, job_id=None):
+        """Progression d'un passage au stage suivant lancé en mode asynchrone"""
+        position = self.get_object()
+        job = get_object_or_404(position.transition_jobs.select_related('next_stage'), pk=job_id)
+        return Response(StageTransitionJobSerializer(job).data)
     
     @action(detail=True, methods=['get'])
     def stage_statistics(self, request, pk=None):
         """Statistiques des candidatures par stage pour cette position"""
         position = self.get_object()
-        current_stage = position.current_stage
+        current_stage = stage_registry.get(position.current_stage_id)
         
         if not current_stage:
             return Response({'error': 'Cette position n\'a pas de stage courant.'})
         
-        applications = position.applications.all()
+        counts = get_position_stats(position)
+        approved = counts['approved_applications']
         
-        stats = {
+        return Response({
             'position': position.title,
             'current_stage': RecruitmentStageSerializer(current_stage).data,
-            'total_active': applications.filter(is_active=True).count(),
-            'approved_current_stage': applications.filter(is_active=True, is_approved_current_stage=True).count(),
-            'pending_approval': applications.filter(is_active=True, is_approved_current_stage=False).count(),
-            'total_rejected': applications.filter(is_active=False).count(),
-            'can_proceed_to_next': applications.filter(is_active=True, is_approved_current_stage=True).count() > 0
-        }
-        
-        return Response(stats)
\ No newline at end of file
+            'total_active': counts['active_applications'],
+            'approved_current_stage': approved,
+            'pending_approval': counts['active_applications'] - approved,
+            'total_rejected': counts['rejected_applications'],
+            'can_proceed_to_next': approved > 0
+        })
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class DepartementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recruitment_process'
+    
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from api.http_cache import watch_model
+        from .models import Application, RecruitmentStage
+        from .matching import connect_signals
+        from .stages import invalidate_stage_registry
+        
+        watch_model(Application)
+        connect_signals()
+        post_save.connect(invalidate_stage_registry, sender=RecruitmentStage, dispatch_uid='stage_registry_save')
+        post_delete.connect(invalidate_stage_registry, sender=RecruitmentStage, dispatch_uid='stage_registry_delete')
@@ -0,0 +1,108 @@
+# recruitment_process/benchmarking.py
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from candidates.models import Candidate
+from positions.models import Department, Position
+from recruitment_process.models import Application, Comment, RecruitmentStage
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Exécute le bloc dans une transaction systématiquement annulée"""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+@contextmanager
+def test_client(user):
+    """APIClient authentifié, avec l'environnement de test Django (ALLOWED_HOSTS...)"""
+    setup_test_environment()
+    try:
+        client = APIClient()
+        client.force_authenticate(user)
+        yield client
+    finally:
+        teardown_test_environment()
+
+
+def seed_dataset(positions=100, applications=1000, comments=1000, prefix='bench', seed=0):
+    """
+    Crée un jeu de données préfixé (utilisateurs, positions, candidatures,
+    commentaires) en bulk_create. À utiliser dans rolled_back().
+    """
+    rng = random.Random(seed)
+    today = timezone.now().date()
+
+    stages = RecruitmentStage.objects.bulk_create([
+        RecruitmentStage(name=f'{prefix} {i}', order=-10 + i) for i in range(3)
+    ])
+    author = User.objects.create(
+        email=f'{prefix}.rh@example.invalid', first_name=prefix, last_name='RH', group='RH', is_staff=True
+    )
+    departments = Department.objects.bulk_create([Department(name=f'{prefix} {i}') for i in range(20)])
+
+    Position.objects.bulk_create([
+        Position(
+            title=f'{prefix} {i}', department=rng.choice(departments), subjects='-', level='-', workload=1,
+            contract_type=rng.choice(['vacataire', 'permanent', 'CDD']),
+            status=rng.choice(['ouverte', 'en_cours', 'pourvue', 'annulee']),
+            start_date=today + timedelta(days=rng.randint(-300, 300)),
+            application_deadline=today + timedelta(days=rng.randint(-300, 300)),
+            current_stage=rng.choice(stages), created_by=author,
+        )
+        for i in range(positions)
+    ], batch_size=1000)
+    position_list = list(Position.objects.filter(title__startswith=f'{prefix} ').only('id', 'department_id'))
+
+    candidate_count = max(applications // 4, 1)
+    User.objects.bulk_create([
+        User(email=f'{prefix}.{i}@example.invalid', first_name=prefix, last_name=str(i))
+        for i in range(candidate_count)
+    ], batch_size=1000)
+    Candidate.objects.bulk_create([
+        Candidate(user_id=user_id)
+        for user_id in User.objects.filter(email__startswith=f'{prefix}.', group='Candidat').values_list('id', flat=True)
+    ], batch_size=1000)
+    candidate_ids = list(Candidate.objects.filter(user__email__startswith=f'{prefix}.').values_list('id', flat=True))
+
+    pairs = set()
+    while len(pairs) < min(applications, len(candidate_ids) * len(position_list)):
+        pairs.add((rng.choice(candidate_ids), rng.choice(position_list).pk))
+    Application.objects.bulk_create([
+        Application(
+            candidate_id=candidate_id, position_id=position_id,
+            is_active=rng.random() < 0.7, is_approved_current_stage=rng.random() < 0.3,
+        )
+        for candidate_id, position_id in pairs
+    ], batch_size=1000)
+
+    application_ids = list(
+        Application.objects.filter(position__title__startswith=f'{prefix} ').values_list('id', flat=True)
+    )
+    Comment.objects.bulk_create([
+        Comment(application_id=rng.choice(application_ids), author=author, content='-')
+        for _ in range(comments)
+    ], batch_size=1000)
+
+    return {
+        'author': author,
+        'stages': stages,
+        'positions': position_list,
+        'application_ids': application_ids,
+    }
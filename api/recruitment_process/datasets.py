@@ -0,0 +1,402 @@
+# recruitment_process/datasets.py
+import datetime
+import math
+import random
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.processes import init_django
+from authentication.models import User
+from candidates.models import Candidate
+from positions.models import Department, Position, StageTransition
+
+from .models import Application, Comment, RecruitmentStage
+from .stages import stage_registry
+
+
+# mot de passe commun à tous les comptes générés (haché une seule fois)
+DATASET_PASSWORD = 'dataset'
+
+DEFAULT_STAGES = ['Présélection', 'Entretien', "Leçon d'essai", 'Décision']
+
+SUBJECTS = [
+    'Mathématiques', 'Physique', 'Chimie', 'Informatique', 'Biologie', 'Histoire', 'Géographie',
+    'Philosophie', 'Économie', 'Anglais', 'Espagnol', 'Allemand', 'Lettres modernes', 'Sciences de gestion',
+    'Électronique', 'Mécanique', 'Statistiques', 'Droit', 'Arts plastiques', 'Éducation physique',
+]
+SKILLS = [
+    'pédagogie différenciée', 'encadrement de projets', 'travaux pratiques', 'évaluation par compétences',
+    'tutorat', 'enseignement à distance', 'recherche', 'préparation aux concours', 'laboratoire',
+    'programmation Python', 'analyse de données', 'gestion de classe', 'conception de cours',
+    'accompagnement des étudiants', 'jury d\'examen', 'coordination pédagogique',
+]
+LEVELS = ['Licence', 'Master', 'Classes préparatoires', 'BTS', 'Lycée', 'Collège', 'Doctorat']
+FIRST_NAMES = [
+    'Marie', 'Pierre', 'Sophie', 'Thomas', 'Nadia', 'Olivier', 'Jean', 'Camille', 'Lucas', 'Emma',
+    'Hugo', 'Léa', 'Karim', 'Fatou', 'Mamadou', 'Aïcha', 'Julien', 'Chloé', 'Yanis', 'Inès',
+]
+LAST_NAMES = [
+    'Dupont', 'Martin', 'Garcia', 'Bernard', 'Lambert', 'Roux', 'Leroy', 'Diallo', 'Moreau', 'Petit',
+    'Durand', 'Lefebvre', 'Fournier', 'Ndiaye', 'Mercier', 'Benali', 'Girard', 'Faure', 'Traoré', 'Blanc',
+]
+NATIONALITIES = ['Française'] * 6 + ['Sénégalaise', 'Marocaine', 'Belge', 'Ivoirienne', 'Tunisienne', 'Canadienne']
+# répartition des statuts de position et stage courant le plus avancé associé
+POSITION_STATUSES = [('ouverte', 0.5, 0), ('en_cours', 0.25, None), ('pourvue', 0.2, None), ('annulee', 0.05, 0)]
+COMMENTS = [
+    'Profil intéressant, à revoir en entretien.', 'Dossier incomplet.', 'Très bonne leçon d\'essai.',
+    'Expérience insuffisante pour le niveau demandé.', 'À recontacter pour la prochaine session.',
+    'Bon contact avec le jury.', 'Spécialité proche du besoin du département.',
+]
+
+
+def chunk_rng(seed, kind, index):
+    """Générateur aléatoire d'un lot : identique quel que soit le nombre de processus"""
+    return random.Random(f'{seed}:{kind}:{index}')
+
+
+def poisson(rng, mean):
+    """Tirage selon une loi de Poisson (méthode de Knuth, pour de petites moyennes)"""
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def skewed_counts(total, size, skew, rng, cap):
+    """
+    Répartit `total` éléments sur `size` cases selon une loi de Zipf
+    d'exposant `skew` (0 : uniforme), rangs tirés au hasard : quelques
+    cases très chargées et une longue traîne. Chaque case est plafonnée à `cap`.
+    """
+    weights = [1 / (rank ** skew) for rank in range(1, size + 1)]
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    return [min(cap, round(weight * scale)) for weight in weights]
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Désactive auto_now_add sur ces champs pour conserver les dates générées"""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+# --- Lots générés dans les processus fils (tuples picklables, sans ORM) ---
+
+def _candidate_chunk(task):
+    seed, start, stop, today = task
+    rng = chunk_rng(seed, 'candidates', start)
+    rows = []
+    for _ in range(start, stop):
+        subjects = rng.sample(SUBJECTS, rng.randint(1, 3))
+        skills = rng.sample(SKILLS, rng.randint(2, 4))
+        years = rng.randint(0, 30)
+        rows.append((
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            rng.choice(NATIONALITIES),
+            today - datetime.timedelta(days=rng.randint(22 * 365, 65 * 365)),
+            f'0{rng.randint(600000000, 799999999)}',
+            f'{rng.randint(1, 200)} rue {rng.choice(LAST_NAMES)}',
+            ', '.join(subjects + skills),
+            f"{years} an(s) d'enseignement en {subjects[0].lower()} ({rng.choice(LEVELS)})",
+        ))
+    return rows
+
+
+def _application_chunk(task):
+    seed, index, count, candidates, current_stage, age_seconds, comments_mean, staff = task
+    rng = chunk_rng(seed, 'applications', index)
+    reject_rate = 0.1 + 0.2 * current_stage
+    rows = []
+    for candidate in rng.sample(range(candidates), count):
+        applied = rng.uniform(0, age_seconds)
+        rejection_stage = rng.randint(0, current_stage) if rng.random() < reject_rate else None
+        approved = rejection_stage is None and rng.random() < 0.3
+        comments = [
+            (rng.uniform(0, applied), rng.randrange(staff), rng.randrange(len(COMMENTS)))
+            for _ in range(poisson(rng, comments_mean))
+        ] if comments_mean else []
+        rows.append((candidate, applied, rejection_stage, approved, comments))
+    return rows
+
+
+class DatasetGenerator:
+    """
+    Jeu de données synthétique de taille réaliste, écrit en bulk_create par
+    lots (une transaction par lot) : personnel, départements, positions,
+    candidats, candidatures réparties selon une loi de Zipf, commentaires et
+    historique des passages de stage.
+
+    Le contenu est déterminé par `seed` (dates relatives au jour de
+    génération) ; les lots sont générés dans `workers` processus et écrits
+    dans l'ordre par le processus principal.
+    """
+
+    def __init__(self, candidates=10000, positions=200, apps_per_position=50, comments_per_application=0.5,
+                 departments=20, staff=20, skew=1.1, seed=0, workers=1, chunk_size=5000, prefix='dataset',
+                 log=None):
+        self.candidates = candidates
+        self.positions = positions
+        self.apps_per_position = apps_per_position
+        self.comments_per_application = comments_per_application
+        self.departments = departments
+        self.staff = staff
+        self.skew = skew
+        self.seed = seed
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.password = make_password(DATASET_PASSWORD)
+        self.result = {}
+
+    def exists(self):
+        return User.objects.filter(email__startswith=f'{self.prefix}.').exists()
+
+    def run(self):
+        executor = ProcessPoolExecutor(self.workers, initializer=init_django) if self.workers > 1 else None
+        self.map = (lambda func, tasks: executor.map(func, tasks)) if executor else map
+        try:
+            with explicit_timestamps(
+                Position._meta.get_field('created_at'),
+                Application._meta.get_field('applied_at'),
+                Comment._meta.get_field('created_at'),
+                StageTransition._meta.get_field('created_at'),
+            ):
+                self.stages = self.create_stages()
+                self.staff_users = self.create_staff()
+                self.department_list = self.create_departments()
+                self.position_list = self.create_positions()
+                self.candidate_ids = self.create_candidates()
+                self.create_applications()
+        finally:
+            if executor:
+                executor.shutdown()
+        return self.result
+
+    def create_stages(self):
+        stages = stage_registry.all()
+        if not stages:
+            stages = RecruitmentStage.objects.bulk_create([
+                RecruitmentStage(name=name, order=order) for order, name in enumerate(DEFAULT_STAGES)
+            ])
+            stage_registry.invalidate()
+        return stages
+
+    def create_staff(self):
+        rng = chunk_rng(self.seed, 'staff', 0)
+        groups = ['RH', 'ChefDeDepartement', 'ChefDeDepartement', 'RH', 'Direction']
+        users = User.objects.bulk_create([
+            User(
+                email=f'{self.prefix}.staff{i}@example.invalid',
+                first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                group=groups[i % len(groups)], is_staff=i == 0, password=self.password,
+            )
+            for i in range(max(self.staff, 1))
+        ])
+        self.result['staff'] = len(users)
+        return users
+
+    def create_departments(self):
+        heads = [user for user in self.staff_users if user.group == 'ChefDeDepartement'] or [None]
+        departments = Department.objects.bulk_create([
+            Department(
+                name=SUBJECTS[i % len(SUBJECTS)] + (f' {i // len(SUBJECTS) + 1}' if i >= len(SUBJECTS) else ''),
+                description=f'Département {self.prefix} {i}',
+                head=heads[i % len(heads)],
+            )
+            for i in range(max(self.departments, 1))
+        ])
+        self.result['departments'] = len(departments)
+        return departments
+
+    def create_positions(self):
+        rng = chunk_rng(self.seed, 'positions', 0)
+        today = self.now.date()
+        recruiters = [user for user in self.staff_users if user.group == 'RH'] or self.staff_users
+        statuses, weights = [status for status, _, _ in POSITION_STATUSES], [weight for _, weight, _ in POSITION_STATUSES]
+        max_stages = {status: stage for status, _, stage in POSITION_STATUSES}
+
+        positions, transitions = [], []
+        for i in range(self.positions):
+            index = rng.randrange(len(self.department_list))
+            department, subject = self.department_list[index], SUBJECTS[index % len(SUBJECTS)]
+            status = rng.choices(statuses, weights)[0]
+            max_stage = max_stages[status]
+            current = rng.randint(0, len(self.stages) - 1 if max_stage is None else max_stage)
+            created_at = self.now - datetime.timedelta(days=rng.uniform(current * 7 + 1, 720))
+            positions.append(Position(
+                title=f'Enseignant(e) {subject} - {rng.choice(LEVELS)}',
+                department=department,
+                subjects=', '.join([subject, *rng.sample(SUBJECTS, rng.randint(0, 2))]),
+                level=rng.choice(LEVELS),
+                workload=rng.choice([4, 8, 12, 16, 18, 20]),
+                contract_type=rng.choice(['vacataire', 'permanent', 'CDD']),
+                status=status,
+                start_date=today + datetime.timedelta(days=rng.randint(-120, 240)),
+                application_deadline=today + datetime.timedelta(days=rng.randint(-180, 90 if status == 'ouverte' else -1)),
+                description=f'Poste {self.prefix} {i} : enseignement en {subject.lower()}.',
+                requirements=', '.join(rng.sample(SKILLS, 3)),
+                current_stage=self.stages[current],
+                created_by=rng.choice(recruiters),
+                created_at=created_at,
+            ))
+            # passages successifs jusqu'au stage courant
+            age = (self.now - created_at).total_seconds()
+            moments = sorted(rng.uniform(age / 2, age) for _ in range(current))
+            transitions.append([
+                (step, created_at + datetime.timedelta(seconds=moment), rng.choice(recruiters))
+                for step, moment in enumerate(moments)
+            ])
+
+        with transaction.atomic():
+            positions = Position.objects.bulk_create(positions, batch_size=self.chunk_size)
+            StageTransition.objects.bulk_create([
+                StageTransition(
+                    position=position, from_stage=self.stages[step], to_stage=self.stages[step + 1],
+                    performed_by=author, created_at=created_at,
+                )
+                for position, steps in zip(positions, transitions)
+                for step, created_at, author in steps
+            ], batch_size=self.chunk_size)
+        self.result['positions'] = len(positions)
+        self.log(f'{len(positions)} position(s)')
+        return positions
+
+    def create_candidates(self):
+        today = self.now.date()
+        tasks = [
+            (self.seed, start, min(start + self.chunk_size, self.candidates), today)
+            for start in range(0, self.candidates, self.chunk_size)
+        ]
+        candidate_ids = []
+        for (_, start, _, _), rows in zip(tasks, self.map(_candidate_chunk, tasks)):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        email=f'{self.prefix}.{start + offset}@example.invalid',
+                        first_name=first_name, last_name=last_name, password=self.password,
+                    )
+                    for offset, (first_name, last_name, *_) in enumerate(rows)
+                ])
+                candidates = Candidate.objects.bulk_create([
+                    Candidate(
+                        user=user, nationality=nationality, birthdate=birthdate, phone=phone,
+                        address=address, specialties=specialties, experience=experience,
+                    )
+                    for user, (_, _, nationality, birthdate, phone, address, specialties, experience) in zip(users, rows)
+                ])
+            candidate_ids.extend(candidate.pk for candidate in candidates)
+            self.log(f'{len(candidate_ids)}/{self.candidates} candidat(s)')
+        self.result['candidates'] = len(candidate_ids)
+        return candidate_ids
+
+    def create_applications(self):
+        rng = chunk_rng(self.seed, 'distribution', 0)
+        counts = skewed_counts(
+            self.positions * self.apps_per_position, self.positions, self.skew, rng, cap=len(self.candidate_ids)
+        )
+        tasks = [
+            (
+                self.seed, index, count, len(self.candidate_ids),
+                self.stages.index(position.current_stage),
+                (self.now - position.created_at).total_seconds(),
+                self.comments_per_application, len(self.staff_users),
+            )
+            for index, (position, count) in enumerate(zip(self.position_list, counts))
+        ]
+
+        self.result.update(applications=0, comments=0, max_applications_per_position=max(counts, default=0))
+        buffer = []
+        for position, rows in zip(self.position_list, self.map(_application_chunk, tasks)):
+            buffer.extend((position, row) for row in rows)
+            if len(buffer) >= self.chunk_size:
+                self.write_applications(buffer)
+                buffer = []
+        if buffer:
+            self.write_applications(buffer)
+
+    def write_applications(self, buffer):
+        with transaction.atomic():
+            applications = Application.objects.bulk_create([
+                Application(
+                    candidate_id=self.candidate_ids[candidate], position=position,
+                    is_active=rejection_stage is None,
+                    is_approved_current_stage=approved,
+                    rejection_stage=None if rejection_stage is None else self.stages[rejection_stage],
+                    rejection_reason='' if rejection_stage is None else 'Profil ne correspondant pas au poste',
+                    rejected_at=None if rejection_stage is None else self.now,
+                    applied_at=self.now - datetime.timedelta(seconds=applied),
+                )
+                for position, (candidate, applied, rejection_stage, approved, _) in buffer
+            ])
+            comments = Comment.objects.bulk_create([
+                Comment(
+                    application=application, author=self.staff_users[author], content=COMMENTS[content],
+                    created_at=self.now - datetime.timedelta(seconds=moment),
+                )
+                for application, (_, (_, _, _, _, specs)) in zip(applications, buffer)
+                for moment, author, content in specs
+            ])
+        self.result['applications'] += len(applications)
+        self.result['comments'] += len(comments)
+        self.log(f"{self.result['applications']} candidature(s)")
+
+
+# --- Instantanés ---
+
+def _is_fixture(path):
+    return str(path).endswith(('.json', '.json.gz', '.json.bz2', '.json.xz'))
+
+
+def save_snapshot(path):
+    """
+    Copie la base dans `path` : copie SQLite cohérente (API backup) ou,
+    pour une extension .json[.gz], fixture dumpdata (tout backend).
+    """
+    if _is_fixture(path):
+        call_command('dumpdata', 'authentication', 'candidates', 'positions', 'recruitment_process',
+                     exclude=['contenttypes', 'auth.permission'], output=str(path), verbosity=0)
+        return
+    _require_sqlite()
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        connection.connection.backup(target)
+    finally:
+        target.close()
+
+
+def load_snapshot(path):
+    """Remplace le contenu de la base par l'instantané `path` (ou charge la fixture)"""
+    if _is_fixture(path):
+        call_command('loaddata', str(path), verbosity=0)
+    else:
+        _require_sqlite()
+        connection.ensure_connection()
+        source = sqlite3.connect(path)
+        try:
+            source.backup(connection.connection)
+        finally:
+            source.close()
+    stage_registry.invalidate()
+
+
+def _require_sqlite():
+    if connection.vendor != 'sqlite':
+        raise ValueError("Instantané binaire réservé à SQLite : utiliser une fixture .json(.gz)")
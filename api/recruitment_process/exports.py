@@ -0,0 +1,43 @@
+# recruitment_process/exports.py
+from django.db.models import F
+
+from api.exports import EXPORT_CHUNK_SIZE
+
+from .serializers import APPLICATION_STATUS, full_name
+from .stages import stage_registry
+
+
+APPLICATION_EXPORT_COLUMNS = [
+    'id', 'applied_at', 'status', 'current_stage', 'rejection_stage', 'rejection_reason',
+    'candidate_id', 'candidate_name', 'candidate_email', 'candidate_phone', 'candidate_nationality',
+    'candidate_birthdate', 'position_id', 'position_title', 'department', 'contract_type',
+]
+
+
+def application_export_rows(queryset):
+    """Lignes d'export des candidatures, lues par lots côté serveur"""
+    rows = queryset.values(
+        'id', 'applied_at', 'rejection_reason', 'candidate_id', 'position_id',
+        status=APPLICATION_STATUS,
+        stage_id=F('position__current_stage_id'),
+        rejected_at_stage_id=F('rejection_stage_id'),
+        candidate_name=full_name('candidate__user__'),
+        candidate_email=F('candidate__user__email'),
+        candidate_phone=F('candidate__phone'),
+        candidate_nationality=F('candidate__nationality'),
+        candidate_birthdate=F('candidate__birthdate'),
+        position_title=F('position__title'),
+        department=F('position__department__name'),
+        contract_type=F('position__contract_type'),
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for row in rows:
+        row['candidate_name'] = row['candidate_name'].strip()
+        row['current_stage'] = _stage_name(row.pop('stage_id'))
+        row['rejection_stage'] = _stage_name(row.pop('rejected_at_stage_id'))
+        yield row
+
+
+def _stage_name(stage_id):
+    stage = stage_registry.get(stage_id)
+    return stage.name if stage else None
@@ -0,0 +1,275 @@
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from analytics.rollups import build_funnel_rollups
+from authentication.models import User
+from candidates.models import Candidate
+from positions.models import Position
+from recruitment_process.benchmarking import rolled_back, test_client
+from recruitment_process.datasets import DatasetGenerator
+from recruitment_process.models import Application
+from recruitment_process.stages import stage_registry
+
+
+BUDGETS_PATH = Path(settings.BASE_DIR) / 'benchmarks' / 'endpoint_budgets.json'
+RESULTS_DIR = Path(settings.BASE_DIR) / 'benchmarks' / 'results'
+
+# jeu de données de référence des budgets de latence
+DATASET = {'candidates': 20000, 'positions': 200, 'apps_per_position': 50, 'comments_per_application': 0.5, 'seed': 0}
+
+# marge sur les latences mesurées avant d'échouer (les machines varient),
+# plus une marge absolue pour les endpoints de quelques millisecondes
+DEFAULT_TOLERANCE = 0.5
+NOISE_MS = 2
+
+
+def scenarios(fixtures):
+    """
+    (nom, utilisateur, méthode, url, corps, options) ; `cold` vide les caches
+    avant chaque requête, `mutates` l'exécute dans une transaction annulée.
+    """
+    position, hot, application = fixtures['position'], fixtures['hot_position'], fixtures['application']
+    rh, candidate = fixtures['rh'], fixtures['candidate']
+    return [
+        ('candidates', rh, 'get', '/api/candidates/?limit=50', None, {}),
+        ('candidates/me', candidate, 'get', '/api/candidates/me/', None, {}),
+        ('candidates/search', rh, 'get', '/api/candidates/search/?q=python&min_age=30&max_age=50&limit=50', None, {}),
+        ('positions', rh, 'get', '/api/positions/?limit=50', None, {'cold': True}),
+        ('positions (cache chaud)', rh, 'get', '/api/positions/?limit=50', None, {}),
+        ('positions/open_positions', rh, 'get', '/api/positions/open_positions/', None, {'cold': True}),
+        ('positions/{id}/applications', rh, 'get', f'/api/positions/{hot.pk}/applications/?limit=50', None, {}),
+        ('departments/dashboard', rh, 'get', '/api/departments/dashboard/', None, {}),
+        ('positions/{id}/stage_statistics', rh, 'get', f'/api/positions/{hot.pk}/stage_statistics/', None, {}),
+        ('positions/{id}/next_stage', rh, 'post', f'/api/positions/{hot.pk}/next_stage/',
+         {'global_comment': 'benchmark'}, {'mutates': True}),
+        ('departments', rh, 'get', '/api/departments/', None, {'cold': True}),
+        ('applications', rh, 'get', '/api/applications/?limit=50', None, {}),
+        ('applications ?cursor=', rh, 'get', '/api/applications/?limit=50&cursor=', None, {}),
+        ('applications/{id}', rh, 'get', f'/api/applications/{application.pk}/', None, {}),
+        ('applications/apply', candidate, 'post', '/api/applications/apply/',
+         {'position': position.pk}, {'mutates': True}),
+        ('applications/{id}/comments', rh, 'get', f'/api/applications/{application.pk}/comments/?limit=50', None, {}),
+        ('applications/{id}/comments (création)', rh, 'post', f'/api/applications/{application.pk}/comments/',
+         {'content': 'benchmark'}, {'mutates': True}),
+        ('analytics/funnel', rh, 'get', '/api/analytics/funnel/', None, {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure chaque endpoint (p50/p95, nombre et durée des requêtes SQL) sur un jeu de données généré, "
+        "compare aux budgets versionnés et échoue en cas de régression"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--existing', action='store_true',
+                            help="Utiliser les données de la base (generate_dataset --restore) au lieu d'en générer")
+        parser.add_argument('--only', help="Noms d'endpoints à mesurer, séparés par des virgules")
+        parser.add_argument('--budgets', default=str(BUDGETS_PATH))
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help="Dépassement relatif toléré sur les latences (0.5 : +50 %%)")
+        parser.add_argument('--update-budgets', action='store_true',
+                            help="Réécrire les budgets à partir de cette mesure")
+        parser.add_argument('--output', help="Fichier JSON des résultats (par défaut benchmarks/results/)")
+
+    def handle(self, *args, **options):
+        only = set(options['only'].split(',')) if options['only'] else None
+        dataset = None if options['existing'] else DATASET
+        budgets = None if options['update_budgets'] else self.load_budgets(Path(options['budgets']), dataset)
+
+        results, failures = {}, []
+        with rolled_back():
+            if not options['existing']:
+                DatasetGenerator(prefix='bench-endpoints', workers=1, **DATASET).run()
+            build_funnel_rollups(full=True)
+            fixtures = self.fixtures()
+
+            for name, user, method, url, body, flags in scenarios(fixtures):
+                if only and name not in only:
+                    continue
+                with test_client(user) as client:
+                    result = self.measure(client, method, url, body, flags, options)
+                    errors = self.check_budget(name, result, budgets, options['tolerance'])
+                    budget = budgets and budgets['endpoints'].get(name)
+                    if errors and budget and result['queries'] <= budget['queries']:
+                        # latence seule : une seconde mesure écarte le bruit de la machine
+                        retry = self.measure(client, method, url, body, flags, options)
+                        result = {metric: min(value, retry[metric]) for metric, value in result.items()}
+                        errors = self.check_budget(name, result, budgets, options['tolerance'])
+                results[name] = result
+                failures.extend(errors)
+                self.report(name, result)
+
+        run = {
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': dataset,
+            'iterations': options['iterations'],
+            'results': results,
+        }
+        self.write_results(run, options['output'])
+
+        if options['update_budgets']:
+            self.update_budgets(run, Path(options['budgets']))
+            return
+
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} dépassement(s) de budget")
+        self.stdout.write(self.style.SUCCESS("Budgets respectés"))
+
+    def fixtures(self):
+        stages = stage_registry.all()
+        if len(stages) < 2:
+            raise CommandError("Au moins deux stages actifs sont nécessaires")
+        positions = Position.objects.annotate(total=Count('applications')).order_by('-total', 'id')
+        hot = positions.filter(current_stage__in=stages[:-1]).first()
+        position = positions.filter(status='ouverte').last() or positions.last()
+        candidate = Candidate.objects.exclude(applications__position=position).select_related('user').first()
+        application = Application.objects.filter(position=hot).annotate(total=Count('comments')).order_by('-total').first()
+        rh = User.objects.filter(Q(is_staff=True) | Q(group='RH'), is_active=True).order_by('-is_staff', 'id').first()
+        if not (hot and candidate and application and rh):
+            raise CommandError("Jeu de données insuffisant (positions, candidatures, personnel RH)")
+        return {
+            'position': position, 'hot_position': hot, 'application': application,
+            'candidate': candidate.user, 'rh': rh,
+        }
+
+    def measure(self, client, method, url, body, flags, options):
+        timings, sql_times, query_counts = [], [], []
+        for iteration in range(options['warmup'] + options['iterations']):
+            if flags.get('cold'):
+                for cache in caches.all(initialized_only=True):
+                    cache.clear()
+                stage_registry.invalidate()
+            timer = QueryTimer()
+            # comme timeit : pas de passage du ramasse-miettes pendant la mesure
+            gc.collect()
+            gc.disable()
+            try:
+                with connection.execute_wrapper(timer):
+                    start = time.perf_counter()
+                    response = self.request(client, method, url, body, flags)
+                    elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            if response.status_code >= 400:
+                raise CommandError(f"{method.upper()} {url} : HTTP {response.status_code} {response.content[:200]!r}")
+            if iteration >= options['warmup']:
+                timings.append(elapsed * 1000)
+                sql_times.append(timer.duration * 1000)
+                query_counts.append(timer.count)
+
+        return {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'sql_ms': round(statistics.median(sql_times), 3),
+            'queries': max(query_counts),
+        }
+
+    def request(self, client, method, url, body, flags):
+        if not flags.get('mutates'):
+            return getattr(client, method)(url, body, format='json')
+        with rolled_back():
+            return getattr(client, method)(url, body, format='json')
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<42} p50={result['p50_ms']:>8.2f} ms  p95={result['p95_ms']:>8.2f} ms  "
+            f"SQL={result['sql_ms']:>7.2f} ms  requêtes={result['queries']}"
+        )
+
+    def write_results(self, run, output):
+        if output:
+            path = Path(output)
+        else:
+            RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            path = RESULTS_DIR / f"endpoints-{timezone.now().strftime('%Y%m%d-%H%M%S')}.json"
+        path.write_text(json.dumps(run, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        self.stdout.write(f"Résultats écrits dans {path}")
+
+    def update_budgets(self, run, path):
+        # budgets = mesure arrondie au-dessus ; le nombre de requêtes est exact
+        budgets = {
+            'dataset': run['dataset'],
+            'endpoints': {
+                name: {
+                    'queries': result['queries'],
+                    'p50_ms': math.ceil(result['p50_ms']),
+                    'p95_ms': math.ceil(result['p95_ms']),
+                    'sql_ms': math.ceil(result['sql_ms']),
+                }
+                for name, result in run['results'].items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(budgets, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f"Budgets écrits dans {path}"))
+
+    def load_budgets(self, path, dataset):
+        try:
+            budgets = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            raise CommandError(f"Budgets introuvables : {path} (créer avec --update-budgets)")
+
+        # les latences ne sont comparables que sur le jeu de données de référence
+        budgets['compare_latency'] = dataset == budgets.get('dataset')
+        if not budgets['compare_latency']:
+            self.stdout.write(self.style.WARNING("Jeu de données différent des budgets : seules les requêtes sont comparées"))
+        return budgets
+
+    def check_budget(self, name, result, budgets, tolerance):
+        if budgets is None:
+            return []
+        budget = budgets['endpoints'].get(name)
+        if budget is None:
+            return [f"{name} : pas de budget (relancer avec --update-budgets)"]
+
+        failures = []
+        if result['queries'] > budget['queries']:
+            failures.append(f"{name} : {result['queries']} requêtes SQL (budget {budget['queries']})")
+        if budgets['compare_latency']:
+            for metric in ('p50_ms', 'p95_ms', 'sql_ms'):
+                if result[metric] > budget[metric] * (1 + tolerance) + NOISE_MS:
+                    failures.append(f"{name} : {metric}={result[metric]:.2f} (budget {budget[metric]} +{tolerance:.0%})")
+        return failures
+
+
+class QueryTimer:
+    """execute_wrapper : nombre et durée cumulée des requêtes SQL (sans l'arrondi de connection.queries)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+    return ordered[index]
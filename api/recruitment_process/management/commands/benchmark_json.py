@@ -0,0 +1,83 @@
+import datetime
+import decimal
+import statistics
+import time
+import uuid
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from recruitment_process.benchmarking import rolled_back, seed_dataset
+from recruitment_process.models import Application, Comment
+from recruitment_process.serializers import ApplicationDetailSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare le rendu/parsing JSON de DRF et de FastJSONRenderer/FastJSONParser sur des pages de candidatures"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson n'est pas installé : FastJSONRenderer utilise l'encodeur DRF."))
+
+        with rolled_back():
+            seed_dataset(positions=20, applications=2000, comments=6000, prefix='json')
+            comments = Comment.objects.select_related('author').order_by('-created_at', '-id')
+            applications = (
+                Application.objects.filter(is_active=True)
+                .select_related('candidate__user', 'position')
+                .prefetch_related(Prefetch('comments', queryset=comments))
+                .order_by('applied_at', 'id')[:options['page_size']]
+            )
+            page = {'next': None, 'results': ApplicationDetailSerializer(applications, many=True).data}
+
+        # types émis hors serializers (statistiques, champs calculés)
+        extra = {
+            'date': datetime.date(2026, 1, 2),
+            'datetime': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'decimal': decimal.Decimal('12.50'),
+            'uuid': uuid.UUID(int=1),
+            'keys': {1: 'a', 2: 'b'},
+            'separator': 'a\u2028b\u2029c',
+        }
+
+        failures = []
+        self.stdout.write(f"{'cas':<28} {'DRF (ms)':>9} {'rapide (ms)':>12} {'gain':>6}")
+        for name, data in (('page ApplicationDetail', page), ('types particuliers', extra)):
+            drf_ms, expected = self.measure(lambda: JSONRenderer().render(data), options['repeat'])
+            fast_ms, content = self.measure(lambda: FastJSONRenderer().render(data), options['repeat'])
+            self.report(f'rendu : {name}', drf_ms, fast_ms)
+            if content != expected:
+                failures.append(f'rendu : {name}')
+
+        body = JSONRenderer().render(page)
+        drf_ms, expected = self.measure(lambda: self.parse(JSONParser(), body), options['repeat'])
+        fast_ms, parsed = self.measure(lambda: self.parse(FastJSONParser(), body), options['repeat'])
+        self.report('parsing : page', drf_ms, fast_ms)
+        if parsed != expected:
+            failures.append('parsing : page')
+
+        if failures:
+            raise CommandError(f"Résultat différent de DRF : {', '.join(failures)}")
+
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body))
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000, result
+
+    def report(self, name, drf_ms, fast_ms):
+        self.stdout.write(f"{name:<28} {drf_ms:>9.3f} {fast_ms:>12.3f} {drf_ms / fast_ms:>5.1f}x")
@@ -0,0 +1,89 @@
+import gc
+import math
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from positions.models import Position
+from recruitment_process.benchmarking import rolled_back
+from recruitment_process.datasets import DatasetGenerator
+from recruitment_process.matching import POSITION_FIELDS, MatchingIndex
+from recruitment_process.models import Application
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le score de l'index de matching (shortlist des positions) sur un jeu de données généré : "
+        "tous les profils (pool) et les candidats d'une position (applicants), avec un budget de latence"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=100000)
+        parser.add_argument('--positions', type=int, default=50)
+        parser.add_argument('--apps-per-position', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=20, help="K meilleurs profils")
+        parser.add_argument('--iterations', type=int, default=5, help="Mesures par position")
+        parser.add_argument('--budget-ms', type=float, default=10.0, help="Médiane maximale du score du pool")
+
+    def handle(self, *args, **options):
+        with rolled_back(), tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            DatasetGenerator(
+                candidates=options['candidates'], positions=options['positions'],
+                apps_per_position=options['apps_per_position'], comments_per_application=0,
+                prefix='bench-matching', workers=1,
+            ).run()
+            self.stdout.write(f"Jeu de données généré en {time.perf_counter() - start:.1f} s")
+
+            start = time.perf_counter()
+            path = os.path.join(directory, 'matching_index.bin')
+            MatchingIndex.build().save(path)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            index = MatchingIndex.load(path)
+            self.stdout.write(
+                f"Index : {len(index.candidate_ids)} profils, {len(index.terms)} termes, {len(index.rows)} poids, "
+                f"construit en {build:.1f} s, chargé en {(time.perf_counter() - start) * 1000:.1f} ms "
+                f"({os.path.getsize(path) / 1024:.0f} Ko, moteur {index.engine})"
+            )
+
+            timings = {'pool': [], 'applicants': []}
+            for position in Position.objects.all():
+                query = index.vectorize([getattr(position, name) for name, _ in POSITION_FIELDS], POSITION_FIELDS)
+                applicants = set(Application.objects.filter(position=position, is_active=True)
+                                 .values_list('candidate_id', flat=True))
+                timings['pool'] += self.measure(lambda: index.top(query, options['limit']), options['iterations'])
+                timings['applicants'] += self.measure(
+                    lambda: index.top(query, options['limit'], applicants), options['iterations']
+                )
+
+        self.stdout.write(f"{'périmètre':<12} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+        for scope, values in timings.items():
+            self.stdout.write(f"{scope:<12} {statistics.median(values):>9.2f} {percentile(values, 95):>9.2f}")
+
+        p50 = statistics.median(timings['pool'])
+        if p50 > options['budget_ms']:
+            raise CommandError(f"Score du pool : p50={p50:.2f} ms (budget {options['budget_ms']} ms)")
+        self.stdout.write(self.style.SUCCESS("Budget respecté"))
+
+    def measure(self, func, iterations):
+        timings = []
+        for _ in range(iterations):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                gc.enable()
+        return timings
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+    return ordered[index]
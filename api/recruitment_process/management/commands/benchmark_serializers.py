@@ -0,0 +1,109 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Prefetch
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from positions.models import Position
+from positions.serializers import PositionSerializer, PositionValuesSerializer
+from recruitment_process.benchmarking import rolled_back, seed_dataset
+from recruitment_process.models import Application, Comment
+from recruitment_process.serializers import (
+    ApplicationDetailSerializer,
+    ApplicationDetailValuesSerializer,
+    ApplicationListSerializer,
+    ApplicationListValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare les serializers DRF et la lecture .values() des listes (temps, requêtes, JSON identique)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        failures = []
+
+        with rolled_back():
+            data = seed_dataset(positions=50, applications=5000, comments=10000, prefix='serial')
+            # cas limites : auteurs supprimés, position sans stage
+            Comment.objects.filter(pk__in=Comment.objects.order_by('id').values('id')[:200]).update(author=None)
+            Position.objects.filter(pk=data['positions'][1].pk).update(current_stage=None)
+
+            self.stdout.write(f"{'liste':<34} {'serializer (ms)':>16} {'values (ms)':>12} {'requêtes':>10} {'gain':>6}")
+            for name, drf, fast in self.cases(page_size):
+                drf_ms, drf_queries, drf_json = self.measure(drf, options['repeat'])
+                fast_ms, fast_queries, fast_json = self.measure(fast, options['repeat'])
+                self.stdout.write(
+                    f"{name:<34} {drf_ms:>16.2f} {fast_ms:>12.2f} {f'{drf_queries}→{fast_queries}':>10} {drf_ms / fast_ms:>5.1f}x"
+                )
+                if drf_json != fast_json:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"JSON différent pour : {', '.join(failures)}")
+
+    def cases(self, page_size):
+        position = Position.objects.annotate(n=Count('applications')).order_by('-n').first()
+        today = timezone.now().date()
+
+        def position_applications_drf():
+            applications = position.applications.select_related('candidate__user', 'position').order_by('-applied_at', '-id')
+            return ApplicationListSerializer(applications[:page_size], many=True).data
+
+        def position_applications_fast():
+            reader = ApplicationListValuesSerializer()
+            return reader.serialize(reader.values(position.applications.order_by('-applied_at', '-id'))[:page_size])
+
+        def applications_drf():
+            comments = Comment.objects.select_related('author').order_by('-created_at', '-id')
+            applications = (
+                Application.objects.filter(is_active=True)
+                .select_related('candidate__user', 'position')
+                .prefetch_related(Prefetch('comments', queryset=comments))
+                .order_by('applied_at', 'id')
+            )
+            return ApplicationDetailSerializer(applications[:page_size], many=True).data
+
+        def applications_fast():
+            reader = ApplicationDetailValuesSerializer()
+            rows = reader.values(Application.objects.filter(is_active=True).order_by('applied_at', 'id'))[:page_size]
+            return reader.serialize(rows)
+
+        def open_positions_drf():
+            positions = (
+                Position.objects.filter(status='ouverte', application_deadline__gte=today)
+                .select_related('department', 'created_by')
+                .annotate(applications_count=Count('applications'))
+                .order_by('-created_at', '-id')
+            )
+            return PositionSerializer(positions, many=True).data
+
+        def open_positions_fast():
+            reader = PositionValuesSerializer()
+            positions = Position.objects.filter(status='ouverte', application_deadline__gte=today).order_by('-created_at', '-id')
+            return reader.serialize(reader.values(positions))
+
+        return [
+            ('positions/{id}/applications', position_applications_drf, position_applications_fast),
+            ('applications', applications_drf, applications_fast),
+            ('positions/open_positions', open_positions_drf, open_positions_fast),
+        ]
+
+    def measure(self, build, repeat):
+        """Médiane du temps requêtes + sérialisation + rendu JSON"""
+        renderer = JSONRenderer()
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                content = renderer.render(build())
+                timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000, len(queries), content
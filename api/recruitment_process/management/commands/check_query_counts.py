@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recruitment_process.benchmarking import rolled_back, seed_dataset, test_client
+
+
+class Command(BaseCommand):
+    help = "Vérifie que le nombre de requêtes SQL des listes ne dépend pas de la taille de page (N+1)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', default='1,10,50,100', help="Tailles de page, séparées par des virgules")
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        failures = []
+
+        with rolled_back():
+            data = seed_dataset(positions=20, applications=1000, comments=3000, prefix='counts')
+            position = data['positions'][0]
+            application_id = data['application_ids'][0]
+
+            endpoints = [
+                ('applications', '/api/applications/'),
+                ('applications ?comments_limit=2', '/api/applications/?comments_limit=2'),
+                ('applications ?cursor=', '/api/applications/?cursor='),
+                ('positions', '/api/positions/'),
+                ('positions/{id}/applications', f'/api/positions/{position.pk}/applications/'),
+                ('applications/{id}/comments', f'/api/applications/{application_id}/comments/'),
+                ('candidates', '/api/candidates/'),
+            ]
+
+            with test_client(data['author']) as client:
+                for name, url in endpoints:
+                    counts = [self.count_queries(client, url, size) for size in page_sizes]
+                    ok = len(set(counts)) == 1
+                    details = ', '.join(f'{size}→{count}' for size, count in zip(page_sizes, counts))
+                    self.stdout.write(f"{'OK ' if ok else 'ÉCHEC'} {name} ({details})")
+                    if not ok:
+                        failures.append(name)
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint(s) dont le nombre de requêtes croît avec la page : {', '.join(failures)}")
+
+    def count_queries(self, client, url, page_size):
+        url = f"{url}{'&' if '?' in url else '?'}limit={page_size}"
+        client.get(f'{url}&warmup=1')  # chauffe (registre des stages...) sans remplir le cache de cette URL
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} : HTTP {response.status_code}")
+        return len(queries)
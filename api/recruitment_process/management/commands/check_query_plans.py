@@ -0,0 +1,80 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from positions.models import Position
+from positions.views import PositionViewSet
+from recruitment_process.benchmarking import rolled_back, seed_dataset
+from recruitment_process.models import Application
+from recruitment_process.views import ApplicationViewSet, CommentViewSet
+
+
+class Command(BaseCommand):
+    help = "Vérifie sur un jeu de données jetable que les requêtes des endpoints critiques utilisent un index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--positions', type=int, default=2000)
+        parser.add_argument('--applications', type=int, default=20000)
+        parser.add_argument('--verbose-plans', action='store_true', help="Afficher les plans complets")
+
+    def handle(self, *args, **options):
+        failures = []
+        with rolled_back():
+            data = seed_dataset(options['positions'], options['applications'], options['applications'], prefix='plans')
+            position = data['positions'][0]
+            application = Application.objects.get(pk=data['application_ids'][0])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            for name, table, queryset in self.hot_queries(position, application):
+                plan = str(queryset.explain())
+                ok = self.uses_index(plan, table)
+                self.stdout.write(f"{'OK ' if ok else 'ÉCHEC'} {name}")
+                if options['verbose_plans'] or not ok:
+                    self.stdout.write(f"    {plan}")
+                if not ok:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"{len(failures)} requête(s) sans index : {', '.join(failures)}")
+
+    def hot_queries(self, position, application):
+        applications = 'recruitment_process_application'
+        positions = 'positions_position'
+        today = timezone.now().date()
+
+        return [
+            ("applications (actives)", applications,
+             self.view_queryset(ApplicationViewSet)),
+            ("applications ?position=&status=approved", applications,
+             self.view_queryset(ApplicationViewSet, {'position': position.pk, 'status': 'approved'})),
+            ("applications ?position=&status=pending", applications,
+             self.view_queryset(ApplicationViewSet, {'position': position.pk, 'status': 'pending'})),
+            ("positions/{id}/applications", applications,
+             position.applications.order_by('-applied_at', '-id')),
+            ("positions ?status=ouverte", positions,
+             self.view_queryset(PositionViewSet, {'status': 'ouverte'})),
+            ("positions ?department=", positions,
+             self.view_queryset(PositionViewSet, {'department': position.department_id})),
+            ("positions ?contract_type=", positions,
+             self.view_queryset(PositionViewSet, {'contract_type': 'vacataire'})),
+            ("positions/open_positions", positions,
+             Position.objects.filter(status='ouverte', application_deadline__gte=today)),
+            ("applications/{id}/comments", 'recruitment_process_comment',
+             self.view_queryset(CommentViewSet, kwargs={'application_pk': application.pk})),
+        ]
+
+    def view_queryset(self, viewset_class, params=None, kwargs=None):
+        request = Request(APIRequestFactory().get('/', params or {}))
+        view = viewset_class(request=request, kwargs=kwargs or {}, action='list', format_kwarg=None)
+        return view.get_queryset()
+
+    def uses_index(self, plan, table):
+        if connection.vendor == 'postgresql':
+            return not re.search(rf'Seq Scan on {table}\b', plan)
+        # SQLite : "SCAN <table>" sans "USING ... INDEX" est un parcours complet de la table
+        return not re.search(rf'SCAN {table}(?! USING)(\s|$)', plan)
@@ -0,0 +1,88 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from positions import stats
+from recruitment_process.datasets import DATASET_PASSWORD, DatasetGenerator, load_snapshot, save_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique de taille production (déterministe pour un --seed donné) "
+        "et peut l'enregistrer en instantané réutilisable par les benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=10000)
+        parser.add_argument('--positions', type=int, default=200)
+        parser.add_argument('--apps-per-position', type=int, default=50,
+                            help="Nombre moyen de candidatures par position")
+        parser.add_argument('--comments-per-application', type=float, default=0.5,
+                            help="Nombre moyen de commentaires par candidature")
+        parser.add_argument('--departments', type=int, default=20)
+        parser.add_argument('--staff', type=int, default=20)
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help="Exposant de Zipf de la répartition des candidatures (0 : uniforme)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Processus générant les lots en parallèle")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='dataset',
+                            help="Préfixe des emails générés (un préfixe par jeu de données)")
+        parser.add_argument('--snapshot',
+                            help="Enregistrer la base après génération (fichier SQLite, ou fixture .json[.gz])")
+        parser.add_argument('--restore',
+                            help="Restaurer un instantané au lieu de générer")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            start = time.perf_counter()
+            try:
+                load_snapshot(options['restore'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.rebuild_counters()
+            self.stdout.write(self.style.SUCCESS(
+                f"Instantané {options['restore']} restauré en {time.perf_counter() - start:.1f} s"
+            ))
+            return
+
+        generator = DatasetGenerator(
+            candidates=options['candidates'],
+            positions=options['positions'],
+            apps_per_position=options['apps_per_position'],
+            comments_per_application=options['comments_per_application'],
+            departments=options['departments'],
+            staff=options['staff'],
+            skew=options['skew'],
+            seed=options['seed'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            prefix=options['prefix'],
+            log=lambda message: self.stdout.write(f'  {message}') if options['verbosity'] > 1 else None,
+        )
+        if generator.exists():
+            raise CommandError(f"Des comptes {options['prefix']}.* existent déjà : choisir un autre --prefix")
+
+        start = time.perf_counter()
+        result = generator.run()
+        self.rebuild_counters()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(", ".join(f"{name}={value}" for name, value in result.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"Jeu de données généré en {elapsed:.1f} s (mot de passe des comptes : {DATASET_PASSWORD!r})"
+        ))
+
+        if options['snapshot']:
+            try:
+                save_snapshot(options['snapshot'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Instantané enregistré dans {options['snapshot']}"))
+
+    def rebuild_counters(self):
+        # bulk_create n'émet pas post_save : compteurs recalculés depuis les tables
+        if stats.counters_enabled():
+            stats.rebuild_counters()
@@ -0,0 +1,25 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from recruitment_process.matching import index_path, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit l'index TF-IDF des profils candidats (shortlist des positions) : vocabulaire et IDF "
+        "recalculés, journal des profils modifiés purgé"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Fichier de l'index (MATCHING_INDEX_PATH par défaut)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or index_path()
+        start = time.perf_counter()
+        index = rebuild_index(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(index.candidate_ids)} profil(s), {len(index.terms)} terme(s), {len(index.rows)} poids "
+            f"en {time.perf_counter() - start:.1f} s -> {path} ({os.path.getsize(path) / 1024:.0f} Ko)"
+        ))
@@ -0,0 +1,519 @@
+# recruitment_process/matching.py
+import array
+import bisect
+import datetime
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Max
+
+try:
+    import numpy
+except ImportError:  # dépendance optionnelle : pip install numpy (extra "matching")
+    numpy = None
+
+
+logger = logging.getLogger('recruitment_process.matching')
+
+INDEX_VERSION = 1
+
+# champs comparés et poids de leurs termes
+CANDIDATE_FIELDS = (('specialties', 2.0), ('experience', 1.0))
+POSITION_FIELDS = (('subjects', 2.0), ('requirements', 1.0), ('level', 1.0))
+
+STOP_WORDS = frozenset('''
+    au aux avec ce ces dans de des du elle en et eux il je la le les leur lui ma mais me meme mes moi mon ne
+    nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous
+    an ans est sont etre plus tres chez comme dont
+'''.split())
+
+# mots d'au moins deux lettres (les nombres sont ignorés)
+_WORD = re.compile(r'[^\W\d_]{2,}')
+
+# types des segments binaires du fichier d'index (array / numpy)
+_DTYPES = {'q': '<i8', 'i': '<i4', 'f': '<f4'}
+
+
+def fold(text):
+    """Minuscules sans accents"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(fold(text)) if word not in STOP_WORDS]
+
+
+def term_frequencies(values, fields):
+    """Fréquences sous-linéaires (1 + log n) pondérées par champ"""
+    frequencies = defaultdict(float)
+    for value, (_, weight) in zip(values, fields):
+        for term, count in Counter(tokenize(value)).items():
+            frequencies[term] += weight * (1 + math.log(count))
+    return frequencies
+
+
+class MatchingIndex:
+    """
+    Index TF-IDF des profils candidats (spécialités, expérience), comparé
+    par similarité cosinus au texte d'une position (matières, prérequis,
+    niveau).
+
+    Les vecteurs normalisés sont rangés par terme (CSC : indptr, rows,
+    weights) dans des tableaux compacts, persistés dans un fichier binaire
+    (MATCHING_INDEX_PATH). Le score de tous les candidats est un seul
+    produit matrice creuse × vecteur de la position : un bincount NumPy
+    quand numpy est installé, sinon une accumulation sur les listes des
+    termes de la position. Les K meilleurs sont choisis par argpartition
+    ou par un tas.
+
+    Entre deux reconstructions (rebuild_matching_index), les profils
+    modifiés (ProfileChange) ou créés sont revectorisés à la volée avec le
+    vocabulaire et les IDF de l'index : leurs anciennes lignes sont
+    masquées et leurs vecteurs tenus à part.
+    """
+
+    def __init__(self, terms, idf, candidate_ids, indptr, rows, weights, last_change=0, built_at=None):
+        self.terms = terms
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.idf = idf
+        self.candidate_ids = candidate_ids
+        self.indptr = indptr
+        self.rows = rows
+        self.weights = weights
+        self.last_change = last_change
+        self.built_at = built_at
+        self.max_candidate = int(candidate_ids[-1]) if len(candidate_ids) else 0
+        # mises à jour depuis la construction
+        self.overrides = {}
+        self.removed = set()
+        self._removed_rows = None
+        self.mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        return 'numpy' if numpy is not None and not isinstance(self.rows, array.array) else 'python'
+
+    def __len__(self):
+        return len(self.candidate_ids) - len(self.removed) + len(self.overrides)
+
+    # --- Construction ---
+
+    @classmethod
+    def build(cls, chunk_size=5000):
+        """Vectorise tous les profils candidats (deux passes sur des tableaux compacts)"""
+        from candidates.models import Candidate
+        from .models import ProfileChange
+
+        # changements antérieurs à la lecture : couverts par cet index
+        last_change = ProfileChange.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        vocabulary, document_frequency = {}, array.array('q')
+        candidate_ids, document_ptr = array.array('q'), array.array('q', [0])
+        document_terms, document_tf = array.array('i'), array.array('f')
+        fields = [name for name, _ in CANDIDATE_FIELDS]
+        rows = Candidate.objects.order_by('pk').values_list('pk', *fields)
+        for candidate_id, *values in rows.iterator(chunk_size=chunk_size):
+            for term, frequency in term_frequencies(values, CANDIDATE_FIELDS).items():
+                column = vocabulary.get(term)
+                if column is None:
+                    column = vocabulary[term] = len(vocabulary)
+                    document_frequency.append(0)
+                document_frequency[column] += 1
+                document_terms.append(column)
+                document_tf.append(frequency)
+            candidate_ids.append(candidate_id)
+            document_ptr.append(len(document_terms))
+
+        documents = len(candidate_ids)
+        idf = array.array('f', (math.log((1 + documents) / (1 + df)) + 1 for df in document_frequency))
+
+        # transposition par terme (tri par comptage), poids normalisés par document
+        indptr = array.array('q', [0]) * (len(vocabulary) + 1)
+        for column, df in enumerate(document_frequency):
+            indptr[column + 1] = indptr[column] + df
+        cursor = array.array('q', indptr[:-1])
+        index_rows = array.array('i', [0]) * len(document_terms)
+        index_weights = array.array('f', [0.0]) * len(document_terms)
+        for row in range(documents):
+            start, end = document_ptr[row], document_ptr[row + 1]
+            weights = [document_tf[i] * idf[document_terms[i]] for i in range(start, end)]
+            norm = math.sqrt(sum(weight * weight for weight in weights)) or 1.0
+            for i, weight in zip(range(start, end), weights):
+                column = document_terms[i]
+                index_rows[cursor[column]] = row
+                index_weights[cursor[column]] = weight / norm
+                cursor[column] += 1
+
+        terms = sorted(vocabulary, key=vocabulary.get)
+        return cls(
+            terms, idf, candidate_ids, indptr, index_rows, index_weights, last_change,
+            datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        )._with_engine()
+
+    def _with_engine(self):
+        if numpy is not None:
+            self.candidate_ids, self.indptr, self.rows, self.weights, self.idf = (
+                numpy.asarray(values, dtype=_DTYPES[values.typecode]) if isinstance(values, array.array) else values
+                for values in (self.candidate_ids, self.indptr, self.rows, self.weights, self.idf)
+            )
+        return self
+
+    # --- Fichier ---
+
+    def save(self, path):
+        """Écriture atomique : en-tête JSON puis segments binaires alignés"""
+        segments = {
+            'candidate_ids': ('q', self.candidate_ids),
+            'indptr': ('q', self.indptr),
+            'rows': ('i', self.rows),
+            'weights': ('f', self.weights),
+            'idf': ('f', self.idf),
+        }
+        layout, offset, blobs = {}, 0, []
+        for name, (typecode, values) in segments.items():
+            data = _to_bytes(values, typecode)
+            padding = -offset % 8
+            blobs.append(b'\0' * padding + data)
+            offset += padding
+            layout[name] = [typecode, offset, len(data) // array.array(typecode).itemsize]
+            offset += len(data)
+        header = json.dumps({
+            'version': INDEX_VERSION,
+            'terms': self.terms,
+            'last_change': self.last_change,
+            'built_at': self.built_at,
+            'segments': layout,
+        }, ensure_ascii=False).encode('utf-8')
+
+        directory = os.path.dirname(os.fspath(path)) or '.'
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.matching-')
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                output.write(len(header).to_bytes(8, 'little'))
+                output.write(header)
+                for blob in blobs:
+                    output.write(blob)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as source:
+            data = source.read()
+        size = int.from_bytes(data[:8], 'little')
+        header = json.loads(data[8:8 + size])
+        if header['version'] != INDEX_VERSION:
+            raise ValueError(f"Version d'index {header['version']} (attendue {INDEX_VERSION})")
+        start = 8 + size
+        segments = {
+            name: _from_bytes(data, typecode, start + offset, count)
+            for name, (typecode, offset, count) in header['segments'].items()
+        }
+        index = cls(
+            header['terms'], segments['idf'], segments['candidate_ids'], segments['indptr'],
+            segments['rows'], segments['weights'], header['last_change'], header['built_at'],
+        )
+        index.mtime = os.path.getmtime(path)
+        return index
+
+    # --- Mises à jour ---
+
+    def sync(self):
+        """Revectorise les profils modifiés ou créés depuis la construction (ou le dernier sync)"""
+        from candidates.models import Candidate
+        from .models import ProfileChange
+
+        with self._lock:
+            changes = list(ProfileChange.objects.filter(pk__gt=self.last_change).values_list('pk', 'candidate_id'))
+            changed = {candidate_id for _, candidate_id in changes}
+            fields = [name for name, _ in CANDIDATE_FIELDS]
+            found = {
+                candidate_id: values
+                for candidate_id, *values in Candidate.objects.filter(
+                    pk__in=changed
+                ).values_list('pk', *fields).iterator()
+            } if changed else {}
+            for candidate_id, *values in Candidate.objects.filter(pk__gt=self.max_candidate).values_list('pk', *fields):
+                found[candidate_id] = values
+                changed.add(candidate_id)
+
+            for candidate_id in changed:
+                row = self.row(candidate_id)
+                if row is not None:
+                    self.removed.add(row)
+                if candidate_id in found:
+                    self.overrides[candidate_id] = self.vectorize(found[candidate_id], CANDIDATE_FIELDS)
+                else:
+                    self.overrides.pop(candidate_id, None)  # supprimé
+            if changes:
+                self.last_change = changes[-1][0]
+            if found:
+                self.max_candidate = max(self.max_candidate, max(found))
+            self._removed_rows = None
+        return len(changed)
+
+    def row(self, candidate_id):
+        position = bisect.bisect_left(self.candidate_ids, candidate_id)
+        if position < len(self.candidate_ids) and self.candidate_ids[position] == candidate_id:
+            return position
+        return None
+
+    # --- Score ---
+
+    def vectorize(self, values, fields):
+        """Vecteur normalisé {colonne: poids} ; les termes hors vocabulaire sont ignorés"""
+        vector = {}
+        for term, frequency in term_frequencies(values, fields).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                vector[column] = frequency * float(self.idf[column])
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {column: weight / norm for column, weight in vector.items()}
+
+    def top(self, query, k=20, candidate_ids=None):
+        """
+        (candidate_id, score) des `k` profils les plus proches du vecteur
+        `query`, parmi `candidate_ids` si donné ; scores nuls exclus.
+        """
+        allowed = None if candidate_ids is None else set(candidate_ids)
+        if self.engine == 'numpy':
+            results = self._top_numpy(query, k, allowed)
+        else:
+            results = self._top_python(query, k, allowed)
+
+        for candidate_id, vector in self.overrides.items():
+            if allowed is None or candidate_id in allowed:
+                score = sum(weight * vector.get(column, 0.0) for column, weight in query.items())
+                if score > 0:
+                    results.append((candidate_id, score))
+        return heapq.nlargest(k, results, key=itemgetter(1))
+
+    def _top_python(self, query, k, allowed):
+        indptr, rows, weights = self.indptr, self.rows, self.weights
+        if allowed is not None and len(allowed) * 16 < sum(indptr[column + 1] - indptr[column] for column in query):
+            return self._top_rows(query, k, allowed)
+
+        scores = defaultdict(float)
+        for column, query_weight in query.items():
+            start, end = indptr[column], indptr[column + 1]
+            for row, weight in zip(rows[start:end], weights[start:end]):
+                scores[row] += weight * query_weight
+        candidate_ids, removed = self.candidate_ids, self.removed
+        results = (
+            (candidate_ids[row], score) for row, score in scores.items()
+            if row not in removed and (allowed is None or candidate_ids[row] in allowed)
+        )
+        return heapq.nlargest(k, results, key=itemgetter(1))
+
+    def _top_rows(self, query, k, allowed):
+        """Peu de candidats : recherche de chaque ligne dans les listes (triées) des termes"""
+        indptr, rows, weights = self.indptr, self.rows, self.weights
+        results = []
+        for candidate_id in allowed:
+            row = self.row(candidate_id)
+            if row is None or row in self.removed:
+                continue
+            score = 0.0
+            for column, query_weight in query.items():
+                start, end = indptr[column], indptr[column + 1]
+                position = bisect.bisect_left(rows, row, start, end)
+                if position < end and rows[position] == row:
+                    score += weights[position] * query_weight
+            if score > 0:
+                results.append((candidate_id, score))
+        return heapq.nlargest(k, results, key=itemgetter(1))
+
+    def _top_numpy(self, query, k, allowed):
+        if not query:
+            return []
+        columns = numpy.fromiter(query, dtype=numpy.int64, count=len(query))
+        query_weights = numpy.fromiter(query.values(), dtype=numpy.float32, count=len(query))
+        starts, ends = self.indptr[columns], self.indptr[columns + 1]
+        lengths = ends - starts
+        if allowed is not None:
+            wanted = numpy.fromiter(allowed, dtype=numpy.int64, count=len(allowed))
+            rows = numpy.searchsorted(self.candidate_ids, wanted)
+            rows = rows[rows < len(self.candidate_ids)]
+            rows = rows[numpy.isin(self.candidate_ids[rows], wanted)]
+        if allowed is not None and len(rows) * 16 < lengths.sum():
+            # peu de candidats : recherche de leurs lignes dans les listes (triées) des termes
+            scores = numpy.zeros(len(rows))
+            for start, end, query_weight in zip(starts, ends, query_weights):
+                found = numpy.searchsorted(self.rows[start:end], rows)
+                hits = found < end - start
+                hits[hits] = self.rows[start + found[hits]] == rows[hits]
+                scores[hits] += self.weights[start + found[hits]] * query_weight
+            candidates = scores
+        else:
+            positions = numpy.concatenate([numpy.arange(start, end) for start, end in zip(starts, ends)])
+            # produit matrice creuse (candidats × termes) × vecteur de la position
+            scores = numpy.bincount(
+                self.rows[positions],
+                weights=self.weights[positions] * numpy.repeat(query_weights, lengths),
+                minlength=len(self.candidate_ids),
+            )
+            if allowed is None:
+                rows = numpy.flatnonzero(scores)
+            candidates = scores[rows]
+        if self.removed:
+            if self._removed_rows is None:
+                self._removed_rows = numpy.fromiter(self.removed, dtype=numpy.int64, count=len(self.removed))
+            candidates[numpy.isin(rows, self._removed_rows)] = 0.0
+        if not len(rows):
+            return []
+        if len(rows) > k:
+            best = numpy.argpartition(-candidates, k)[:k]
+            rows, candidates = rows[best], candidates[best]
+        return [
+            (int(self.candidate_ids[row]), float(score))
+            for row, score in zip(rows, candidates) if score > 0
+        ]
+
+    def explain(self, query, vector, limit=5):
+        """Termes communs les plus contributifs"""
+        contributions = [(self.terms[column], weight * vector[column]) for column, weight in query.items() if column in vector]
+        return [term for term, _ in heapq.nlargest(limit, contributions, key=itemgetter(1))]
+
+
+def _to_bytes(values, typecode):
+    if isinstance(values, array.array):
+        if sys.byteorder != 'little':
+            values = array.array(typecode, values)
+            values.byteswap()
+        return values.tobytes()
+    return numpy.ascontiguousarray(values, dtype=_DTYPES[typecode]).tobytes()
+
+
+def _from_bytes(data, typecode, offset, count):
+    if numpy is not None:
+        return numpy.frombuffer(data, dtype=_DTYPES[typecode], count=count, offset=offset)
+    values = array.array(typecode)
+    values.frombytes(data[offset:offset + count * values.itemsize])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+# --- Index du process ---
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def index_path():
+    return getattr(settings, 'MATCHING_INDEX_PATH', os.path.join(settings.BASE_DIR, 'data', 'matching_index.bin'))
+
+
+def rebuild_index(path=None):
+    """Reconstruit et enregistre l'index, puis purge le journal des changements qu'il couvre"""
+    from .models import ProfileChange
+
+    path = path or index_path()
+    index = MatchingIndex.build()
+    index.save(path)
+    ProfileChange.objects.filter(pk__lte=index.last_change).delete()
+    return index
+
+
+def get_index():
+    """Index du process, rechargé si le fichier a été reconstruit, construit s'il manque"""
+    global _index
+    path = index_path()
+    with _index_lock:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if _index is None or _index.mtime != mtime:
+            try:
+                _index = MatchingIndex.load(path) if mtime is not None else None
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("Index de matching illisible (%s), reconstruction", exc)
+                _index = None
+            if _index is None:
+                logger.warning("Construction de l'index de matching (%s)", path)
+                rebuild_index(path)
+                _index = MatchingIndex.load(path)
+    _index.sync()
+    return _index
+
+
+# --- Shortlist ---
+
+def shortlist(position, scope='applicants', limit=20):
+    """
+    Candidats les plus proches de `position` : ses candidats actifs
+    (`applicants`) ou tous les profils (`pool`).
+    """
+    from candidates.models import Candidate
+    from .models import Application
+
+    index = get_index()
+    query = index.vectorize([getattr(position, name) for name, _ in POSITION_FIELDS], POSITION_FIELDS)
+
+    applications = None
+    if scope == 'applicants':
+        applications = dict(
+            Application.objects.filter(position=position, is_active=True).values_list('candidate_id', 'id')
+        )
+    ranked = index.top(query, limit, applications)
+
+    fields = [name for name, _ in CANDIDATE_FIELDS]
+    profiles = Candidate.objects.select_related('user').in_bulk([candidate_id for candidate_id, _ in ranked])
+    results = []
+    for candidate_id, score in ranked:
+        candidate = profiles.get(candidate_id)
+        if candidate is None:
+            continue  # supprimé depuis le dernier sync
+        vector = index.vectorize([getattr(candidate, name) for name in fields], CANDIDATE_FIELDS)
+        results.append({
+            'candidate_id': candidate_id,
+            'application_id': applications.get(candidate_id) if applications is not None else None,
+            'score': round(score, 4),
+            'full_name': candidate.user.get_full_name(),
+            'email': candidate.user.email,
+            'specialties': candidate.specialties,
+            'matched_terms': index.explain(query, vector),
+        })
+    return {'position': position.pk, 'scope': scope, 'engine': index.engine, 'indexed': len(index), 'results': results}
+
+
+# --- Journal des profils modifiés ---
+
+def candidate_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    # les créations sont repérées par leur id, supérieur au dernier indexé
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & {name for name, _ in CANDIDATE_FIELDS}:
+        return
+    from .models import ProfileChange
+    ProfileChange.objects.create(candidate_id=instance.pk)
+
+
+def candidate_deleted(sender, instance, **kwargs):
+    from .models import ProfileChange
+    ProfileChange.objects.create(candidate_id=instance.pk)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+    from candidates.models import Candidate
+
+    post_save.connect(candidate_changed, sender=Candidate, dispatch_uid='matching_candidate_save')
+    post_delete.connect(candidate_deleted, sender=Candidate, dispatch_uid='matching_candidate_delete')
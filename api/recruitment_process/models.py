@@ -16,13 +16,8 @@ class RecruitmentStage(models.Model):
         return self.name
     
     def next_stage(self):
-        try:
-            return RecruitmentStage.objects.filter(
-                order__gt=self.order, 
-                is_active=True
-            ).order_by('order').first()
-        except RecruitmentStage.DoesNotExist:
-            return None
+        from .stages import stage_registry
+        return stage_registry.next(self)
 
 
 class Application(models.Model):
@@ -32,11 +27,30 @@ class Application(models.Model):
     is_approved_current_stage = models.BooleanField(default=False)
     rejection_reason = models.TextField(blank=True)
     rejection_stage = models.ForeignKey(RecruitmentStage, on_delete=models.SET_NULL, null=True, blank=True, related_name='rejected_applications')
+    # date du rejet : updated_at bouge à chaque sauvegarde (agrégats du funnel, analytics/rollups.py)
+    rejected_at = models.DateTimeField(null=True, blank=True)
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['candidate', 'position']
+        indexes = [
+            # pagination keyset sur (applied_at, id)
+            models.Index(fields=['applied_at', 'id'], name='application_applied_id_idx'),
+            models.Index(fields=['position', 'applied_at', 'id'], name='application_pos_applied_idx'),
+            # filtres de ApplicationViewSet et du passage de stage, limités aux candidatures actives
+            # (les booléens sont dans la condition : SQLite ne sait pas les utiliser comme colonne d'index)
+            models.Index(
+                fields=['position', 'applied_at', 'id'],
+                condition=models.Q(is_active=True),
+                name='application_active_pos_idx',
+            ),
+            models.Index(
+                fields=['applied_at', 'id'],
+                condition=models.Q(is_active=True),
+                name='application_active_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.candidate} - {self.position}"
@@ -44,7 +58,8 @@ class Application(models.Model):
     @property
     def current_stage(self):
         """Retourne le stage courant de la position"""
-        return self.position.current_stage
+        from .stages import stage_registry
+        return stage_registry.get(self.position.current_stage_id)
     
     def get_status_display(self):
         if not self.is_active:
@@ -72,6 +87,16 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['application', 'created_at', 'id'], name='comment_app_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"Commentaire par {self.author} sur {self.application}"
+
+
+class ProfileChange(models.Model):
+    """Journal des profils candidats modifiés, appliqué à l'index de matching (matching.MatchingIndex.sync)"""
+    candidate_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -1,6 +1,8 @@
 # core/permissions.py
 from rest_framework import permissions
 
+from authentication.roles import get_roles
+
 class IsNotCandidate(permissions.BasePermission):
     """
     Permission qui permet seulement aux utilisateurs qui ne sont pas des candidats.
@@ -11,26 +13,28 @@ class IsNotCandidate(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Vérifier si l'utilisateur a un profil candidat
-        from candidates.models import Candidate
-        return not Candidate.objects.filter(user=request.user).exists()
+        # Vérifier si l'utilisateur a un profil candidat (résolu une fois par requête)
+        return not get_roles(request).is_candidate
 
 class IsHR(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='RH').exists()
+        return get_roles(request).in_group('RH')
 
 class IsDepartmentHead(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='ChefDeDepartement').exists()
+        return get_roles(request).in_group('ChefDeDepartement')
 
 class IsDirector(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='Direction').exists()
+        return get_roles(request).in_group('Direction')
 
 class IsRH(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.group == 'RH'
+        return request.user.is_authenticated and get_roles(request).group == 'RH'
 
 class IsStaffOrRH(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and (request.user.is_staff or request.user.group == 'RH')
+        if not request.user.is_authenticated:
+            return False
+        roles = get_roles(request)
+        return roles.is_staff or roles.group == 'RH'
@@ -1,7 +1,12 @@
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Case, CharField, F, Value, When, Window
+from django.db.models.functions import Concat, RowNumber
+
+from api.fast_serializers import MISSING, ValuesSerializer
 from .models import Application, Comment, RecruitmentStage
+from .stages import stage_registry
 
 
 class RecruitmentStageSerializer(serializers.ModelSerializer):
@@ -40,7 +45,7 @@ class ApplicationListSerializer(serializers.ModelSerializer):
     phone = serializers.CharField(source='candidate.phone', read_only=True)
     nationality = serializers.CharField(source='candidate.nationality', read_only=True)
     position_title = serializers.CharField(source='position.title', read_only=True)
-    current_stage_name = serializers.CharField(source='position.current_stage.name', read_only=True)
+    current_stage_name = serializers.CharField(source='current_stage.name', read_only=True)
     status = serializers.SerializerMethodField()
     
     class Meta:
@@ -65,6 +70,14 @@ class ApplicationListSerializer(serializers.ModelSerializer):
         return 'pending'
 
 
+class CommentListSerializer(serializers.ListSerializer):
+    def get_attribute(self, instance):
+        # ?comments_limit= : Prefetch découpé, rangé dans latest_comments (ApplicationViewSet.get_comments_prefetch)
+        if hasattr(instance, 'latest_comments'):
+            return instance.latest_comments
+        return super().get_attribute(instance)
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source="author.get_full_name", read_only=True)
     author_email = serializers.EmailField(source="author.email", read_only=True)
@@ -73,6 +86,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ["id", "content", "author_name", "author_email", "created_at"]
         read_only_fields = ["author_name", "author_email", "created_at"]
+        list_serializer_class = CommentListSerializer
 
 
 class ApplicationDetailSerializer(serializers.ModelSerializer):
@@ -110,4 +124,85 @@ class ApplicationDetailSerializer(serializers.ModelSerializer):
             return 'rejected'
         elif obj.is_approved_current_stage:
             return 'approved'
-        return 'pending'
\ No newline at end of file
+        return 'pending'
+
+
+# Lecture rapide (.values()) des listes, même JSON que les serializers ci-dessus
+
+def full_name(prefix):
+    """first_name + ' ' + last_name en SQL ; get_full_name() retire les blancs en Python"""
+    return Concat(f'{prefix}first_name', Value(' '), f'{prefix}last_name', output_field=CharField())
+
+
+APPLICATION_STATUS = Case(
+    When(is_active=False, then=Value('rejected')),
+    When(is_approved_current_stage=True, then=Value('approved')),
+    default=Value('pending'),
+    output_field=CharField(),
+)
+
+
+class ApplicationValuesMixin:
+    def get_full_name(self, row):
+        return row['full_name'].strip()
+    
+    def get_current_stage_name(self, row):
+        stage = stage_registry.get(row['current_stage_name'])
+        return stage.name if stage else MISSING
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+    columns = {
+        'author_name': full_name('author__'),
+        'author_email': 'author__email',
+    }
+    extra = ('application_id',)
+    
+    def get_author_name(self, row):
+        # auteur supprimé (SET_NULL) : champs omis, comme author.get_full_name
+        return row['author_name'].strip() if row['author_email'] is not None else MISSING
+    
+    def get_author_email(self, row):
+        return row['author_email'] if row['author_email'] is not None else MISSING
+
+
+class ApplicationListValuesSerializer(ApplicationValuesMixin, ValuesSerializer):
+    serializer_class = ApplicationListSerializer
+    columns = {
+        'full_name': full_name('candidate__user__'),
+        'email': 'candidate__user__email',
+        'phone': 'candidate__phone',
+        'nationality': 'candidate__nationality',
+        'position_title': 'position__title',
+        'current_stage_name': 'position__current_stage_id',  # nom lu dans le registre des stages
+        'status': APPLICATION_STATUS,
+    }
+
+
+class ApplicationDetailValuesSerializer(ApplicationValuesMixin, ValuesSerializer):
+    serializer_class = ApplicationDetailSerializer
+    columns = dict(
+        ApplicationListValuesSerializer.columns,
+        birthdate='candidate__birthdate',
+        specialties='candidate__specialties',
+    )
+    deferred = ('comments',)
+    
+    def serialize(self, rows, comments_limit=None):
+        """`comments_limit` : seulement les N commentaires les plus récents par candidature"""
+        data = super().serialize(rows)
+        comments_queryset = Comment.objects.filter(application_id__in=[item['id'] for item in data])
+        if comments_limit is not None:
+            # lignes .values(), sans Prefetch : rang par candidature, comme Django pour un Prefetch découpé
+            comments_queryset = comments_queryset.annotate(
+                rank=Window(RowNumber(), partition_by=F('application_id'), order_by=[F('created_at').desc(), F('id').desc()])
+            ).filter(rank__lte=comments_limit)
+        
+        comments = {}
+        reader = CommentValuesSerializer()
+        for row in reader.values(comments_queryset.order_by('-created_at', '-id')):
+            comments.setdefault(row['application_id'], []).append(reader.to_representation(row))
+        for item in data:
+            item['comments'] = comments.get(item['id'], [])
+        return data
@@ -0,0 +1,96 @@
+# recruitment_process/stages.py
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+VERSION_CACHE_KEY = 'recruitment_process:stages:version'
+
+# durée de vie de la version en cache : délai maximal de propagation d'une
+# modification des stages aux autres workers quand le cache est local au process
+VERSION_CACHE_TIMEOUT = 30
+
+
+class StageRegistry:
+    """
+    Liste ordonnée des RecruitmentStage gardée en mémoire du process.
+
+    Elle est chargée à la première lecture puis rechargée quand la version
+    stockée dans le cache Django change : les signaux post_save/post_delete
+    de RecruitmentStage publient une nouvelle version, ce qui prévient
+    aussitôt les autres workers si le cache est partagé (Redis, Memcached...),
+    sinon à l'expiration de leur entrée (VERSION_CACHE_TIMEOUT secondes).
+    Les écritures qui dépendent de la liste (passage au stage suivant,
+    création de position) appellent reload() pour lire l'état en base.
+    Les instances retournées sont partagées et ne doivent pas être modifiées.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_id = {}
+        self._active = []
+        self._orders = []
+
+    def _load(self, force=False):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            # première lecture, entrée expirée ou évincée : publier une version
+            cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=VERSION_CACHE_TIMEOUT)
+            version = cache.get(VERSION_CACHE_KEY)
+
+        if force or version != self._version:
+            with self._lock:
+                from .models import RecruitmentStage
+
+                stages = list(RecruitmentStage.objects.order_by('order', 'id'))
+                self._by_id = {stage.pk: stage for stage in stages}
+                self._active = [stage for stage in stages if stage.is_active]
+                self._orders = [stage.order for stage in self._active]
+                self._version = version
+
+    def all(self):
+        """Stages actifs, dans l'ordre du processus"""
+        self._load()
+        return list(self._active)
+
+    def get(self, pk):
+        if pk is None:
+            return None
+        self._load()
+        return self._by_id.get(pk)
+
+    def first(self):
+        self._load()
+        return self._active[0] if self._active else None
+
+    def next(self, stage):
+        """Premier stage actif d'ordre strictement supérieur"""
+        self._load()
+        index = bisect_right(self._orders, stage.order)
+        return self._active[index] if index < len(self._active) else None
+
+    def previous(self, stage):
+        """Dernier stage actif d'ordre strictement inférieur"""
+        self._load()
+        index = bisect_left(self._orders, stage.order)
+        return self._active[index - 1] if index > 0 else None
+
+    def reload(self):
+        """Relit les stages en base, quelle que soit la version en cache"""
+        self._load(force=True)
+
+    def invalidate(self):
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=VERSION_CACHE_TIMEOUT)
+        self._version = None
+
+
+stage_registry = StageRegistry()
+
+
+def invalidate_stage_registry(sender, **kwargs):
+    # après le commit, pour qu'aucun worker ne recharge l'ancien état sous la nouvelle version
+    transaction.on_commit(stage_registry.invalidate)
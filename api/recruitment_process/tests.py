@@ -1,3 +1,69 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from candidates.models import Candidate
+from positions.models import Department, Position
+
+from .models import Application, Comment, RecruitmentStage
+
+
+class ApplicationCommentsLimitTests(TestCase):
+    """`?comments_limit=N` : N commentaires les plus récents par candidature, sans requête par candidature"""
+
+    @classmethod
+    def setUpTestData(cls):
+        RecruitmentStage.objects.create(name='Dossier', order=1)
+        cls.rh = User.objects.create_user(
+            email='rh@example.com', first_name='Marie', last_name='RH', password='pw', group='RH', is_staff=True
+        )
+        today = timezone.now().date()
+        position = Position.objects.create(
+            title='Professeur', department=Department.objects.create(name='Mathématiques'), subjects='maths',
+            level='Master', workload=10, contract_type='CDD', start_date=today + timedelta(days=30),
+            application_deadline=today + timedelta(days=15), created_by=cls.rh,
+        )
+        cls.applications = []
+        for i in range(3):
+            user = User.objects.create_user(email=f'candidat{i}@example.com', first_name=f'C{i}', last_name='T', password='pw')
+            candidate = Candidate.objects.create(user=user, nationality='FR', specialties='analyse', experience='lycée')
+            application = Application.objects.create(candidate=candidate, position=position)
+            for j in range(4):
+                Comment.objects.create(application=application, author=cls.rh, content=f'{i}-{j}')
+            cls.applications.append(application)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.rh)
+
+    def test_retrieve_keeps_latest_comments(self):
+        application = self.applications[0]
+        # candidature, puis commentaires et auteurs en une requête
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/applications/{application.pk}/?comments_limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([comment['content'] for comment in response.data['comments']], ['0-3', '0-2'])
+
+    def test_list_keeps_latest_comments(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/applications/?comments_limit=1&limit=10')
+        self.assertEqual(response.status_code, 200)
+        contents = {item['id']: [comment['content'] for comment in item['comments']] for item in response.data['results']}
+        self.assertEqual(contents, {application.pk: [f'{i}-3'] for i, application in enumerate(self.applications)})
+
+    def test_without_limit_returns_all_comments(self):
+        response = self.client.get(f'/api/applications/{self.applications[1].pk}/')
+        self.assertEqual(len(response.data['comments']), 4)
+
 
-# Create your tests here.
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_an_index(self):
+        # check_query_plans lève CommandError dès qu'une requête parcourt toute sa table
+        output = StringIO()
+        call_command('check_query_plans', positions=200, applications=2000, stdout=output)
+        self.assertNotIn('ÉCHEC', output.getvalue())
@@ -2,16 +2,21 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
 
 from .models import Application, RecruitmentStage, Comment
 from positions.models import Position
 from .serializers import (
     ApplicationDetailSerializer,
+    ApplicationDetailValuesSerializer,
     ApplicationCreateSerializer,
     RecruitmentStageSerializer,
     CommentSerializer,
 )
-from .permissions import IsNotCandidate
+from .exports import APPLICATION_EXPORT_COLUMNS, application_export_rows
+from .permissions import IsNotCandidate, IsStaffOrRH
+from api.exports import CSVStreamRenderer, NDJSONStreamRenderer, streaming_export
 
 
 class RecruitmentStageViewSet(viewsets.ReadOnlyModelViewSet):
@@ -26,11 +31,11 @@ class CommentViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsNotCandidate]
     
     def get_queryset(self):
-        application_id = self.request.query_params.get("application")
+        application_id = self.kwargs.get("application_pk") or self.request.query_params.get("application")
         qs = Comment.objects.select_related("application", "author")
         if application_id:
             qs = qs.filter(application_id=application_id)
-        return qs.order_by("-created_at")
+        return qs.order_by("-created_at", "-id")
     
     def perform_create(self, serializer):
         application_id = self.kwargs.get("application_pk")  # vient du nested router
@@ -49,9 +54,14 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         status_filter = self.request.query_params.get('status')
         
         queryset = Application.objects.select_related(
-            'candidate__user', 'position', 'position__current_stage'
+            'candidate__user', 'position'
         )
         
+        # la liste passe par list() ; approve/reject/reactivate ajoutent un
+        # commentaire avant de sérialiser : un cache préchargé y serait périmé
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(self.get_comments_prefetch())
+        
         if position_id:
             queryset = queryset.filter(position_id=position_id)
         
@@ -65,7 +75,46 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         else:
             queryset = queryset.filter(is_active=True)
         
-        return queryset
+        # ordre total, requis par la pagination keyset (?cursor=)
+        return queryset.order_by('applied_at', 'id')
+    
+    def list(self, request, *args, **kwargs):
+        """Lecture rapide : colonnes utiles via .values(), même JSON qu'ApplicationDetailSerializer"""
+        reader = ApplicationDetailValuesSerializer()
+        rows = self.paginate_queryset(reader.values(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(reader.serialize(rows, self.get_comments_limit()))
+    
+    def get_comments_limit(self):
+        """`?comments_limit=N` ne garde que les N commentaires les plus récents par candidature"""
+        try:
+            limit = int(self.request.query_params.get('comments_limit', ''))
+        except ValueError:
+            return None
+        return limit if limit >= 0 else None
+    
+    def get_comments_prefetch(self):
+        """Commentaires et auteurs en une requête pour toute la page"""
+        comments = Comment.objects.select_related('author').order_by('-created_at', '-id')
+        limit = self.get_comments_limit()
+        if limit is None:
+            return Prefetch('comments', queryset=comments)
+        # Django n'accepte un Prefetch découpé qu'avec to_attr (lu par CommentListSerializer)
+        return Prefetch('comments', queryset=comments[:limit], to_attr='latest_comments')
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAuthenticated, IsStaffOrRH],
+        renderer_classes=[CSVStreamRenderer, NDJSONStreamRenderer],
+    )
+    def export(self, request):
+        """Export complet (?format=csv|ndjson), mêmes filtres que la liste, streamé sans pagination"""
+        return streaming_export(
+            application_export_rows(self.get_queryset()),
+            APPLICATION_EXPORT_COLUMNS,
+            request.accepted_renderer.format,
+            'candidatures',
+        )
     
     @action(detail=False, methods=["post"], url_path="apply")
     def apply(self, request):
@@ -135,6 +184,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 application.is_approved_current_stage = False
                 application.rejection_reason = rejection_reason
                 application.rejection_stage = application.current_stage
+                application.rejected_at = timezone.now()
                 application.save()
                 
                 Comment.objects.create(
@@ -166,6 +216,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 application.is_approved_current_stage = False 
                 application.rejection_reason = ''
                 application.rejection_stage = None
+                application.rejected_at = None
                 application.save()
                 
                 Comment.objects.create(